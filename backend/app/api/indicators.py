@@ -25,20 +25,35 @@ async def list_indicators():
     return _load_config()
 
 
+@router.get("/metrics")
+async def get_fetch_metrics():
+    """지표 수집 스레드 풀 대기열/대기 시간 및 캐시 지표"""
+    return {
+        "executor": data_service.executor.stats(),
+        "cache": data_service.cache.stats(),
+    }
+
+
+@router.get("/health")
+async def get_source_health():
+    """소스별 서킷 브레이커 상태 (closed/open/half_open, 연속 실패 횟수, 마지막 오류)"""
+    return data_service.source_health()
+
+
 @router.get("/{indicator_id}/live")
 async def get_live_data(indicator_id: str):
-    """특정 지표의 실시간 데이터 조회"""
+    """특정 지표의 실시간 데이터 조회 (캐시 값 즉시 반환, 오래된 값은 백그라운드 갱신)"""
     configs = _load_config()
     valid_ids = [c["id"] for c in configs]
     if indicator_id not in valid_ids:
         raise HTTPException(status_code=404, detail=f"지표 '{indicator_id}'를 찾을 수 없습니다")
-    data = await data_service.fetch_all_indicators([indicator_id])
+    data = await data_service.fetch_live([indicator_id])
     return data.get(indicator_id, {"error": "데이터를 가져올 수 없습니다"})
 
 
 @router.post("/live")
 async def get_multiple_live_data(indicator_ids: list[str]):
-    """여러 지표의 실시간 데이터 일괄 조회"""
+    """여러 지표의 실시간 데이터 일괄 조회 (캐시 값 즉시 반환, 오래된 값은 백그라운드 갱신)"""
     if len(indicator_ids) > 20:
         raise HTTPException(status_code=400, detail="한 번에 최대 20개의 지표만 조회할 수 있습니다")
-    return await data_service.fetch_all_indicators(indicator_ids)
+    return await data_service.fetch_live(indicator_ids)
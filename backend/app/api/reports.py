@@ -1,13 +1,17 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from pydantic import BaseModel
 from typing import Optional
 
-from ..core.database import get_db
+from ..core.database import AsyncSessionLocal, get_db
 from ..models.report import Report
 from ..models.user import User
-from ..services.report_service import generate_user_report
+from ..models.report_job import ReportJob
+from ..services.job_queue import report_job_queue
+from ..services.report_service import stream_user_report
 from .auth import get_current_user
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -26,6 +30,40 @@ class ReportResponse(BaseModel):
         from_attributes = True
 
 
+def _to_response(report: Report) -> ReportResponse:
+    return ReportResponse(
+        id=report.id,
+        title=report.title,
+        summary=report.summary,
+        level=report.level.value,
+        indicators_used=report.indicators_used or [],
+        is_read=report.is_read,
+        created_at=report.created_at.isoformat(),
+    )
+
+
+class ReportJobResponse(BaseModel):
+    id: str
+    status: str
+    report_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: str
+
+
+def _to_job_response(job: ReportJob) -> ReportJobResponse:
+    return ReportJobResponse(
+        id=job.id,
+        status=job.status.value,
+        report_id=job.report_id,
+        error=job.error,
+        created_at=job.created_at.isoformat(),
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.get("/", response_model=list[ReportResponse])
 async def list_reports(
     skip: int = 0,
@@ -42,18 +80,7 @@ async def list_reports(
         .limit(limit)
     )
     reports = result.scalars().all()
-    return [
-        ReportResponse(
-            id=r.id,
-            title=r.title,
-            summary=r.summary,
-            level=r.level.value,
-            indicators_used=r.indicators_used or [],
-            is_read=r.is_read,
-            created_at=r.created_at.isoformat(),
-        )
-        for r in reports
-    ]
+    return [_to_response(r) for r in reports]
 
 
 @router.get("/{report_id}/html", response_class=None)
@@ -92,15 +119,7 @@ async def get_report(
     report = result.scalar_one_or_none()
     if not report:
         raise HTTPException(status_code=404, detail="리포트를 찾을 수 없습니다")
-    return ReportResponse(
-        id=report.id,
-        title=report.title,
-        summary=report.summary,
-        level=report.level.value,
-        indicators_used=report.indicators_used or [],
-        is_read=report.is_read,
-        created_at=report.created_at.isoformat(),
-    )
+    return _to_response(report)
 
 
 @router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -120,19 +139,60 @@ async def delete_report(
     await db.commit()
 
 
-@router.post("/generate", status_code=status.HTTP_201_CREATED, response_model=ReportResponse)
+@router.post("/generate", status_code=status.HTTP_202_ACCEPTED, response_model=ReportJobResponse)
 async def generate_report_now(
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """즉시 리포트 생성 (온디맨드)"""
-    report = await generate_user_report(current_user, db)
-    return ReportResponse(
-        id=report.id,
-        title=report.title,
-        summary=report.summary,
-        level=report.level.value,
-        indicators_used=report.indicators_used or [],
-        is_read=report.is_read,
-        created_at=report.created_at.isoformat(),
+    """
+    즉시 리포트 생성 (온디맨드)
+    작업을 큐에 등록하고 바로 반환합니다. 진행 상황은 GET /reports/jobs/{job_id}로 조회합니다.
+    이미 대기/실행 중인 작업이 있으면 새로 만들지 않고 기존 작업을 반환합니다.
+    """
+    job = await report_job_queue.enqueue(current_user.id)
+    return _to_job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+):
+    """리포트 생성 작업 상태 조회"""
+    job = await report_job_queue.get(job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다")
+    return _to_job_response(job)
+
+
+@router.post("/generate/stream")
+async def generate_report_stream(
+    current_user: User = Depends(get_current_user),
+):
+    """
+    즉시 리포트 생성 (SSE 스트리밍)
+    이벤트: summary (요약 문장) → section (섹션별) → done (저장된 리포트 메타데이터)
+    실패 시 error 이벤트를 보내고 스트림을 종료합니다.
+    """
+    user_id = current_user.id
+
+    async def _events():
+        # 응답 본문은 의존성 정리(get_db 세션 종료) 이후에 실행되므로 스트림 전용 세션을 엽니다
+        try:
+            async with AsyncSessionLocal() as db:
+                user = await db.get(User, user_id)
+                if user is None:
+                    raise ValueError(f"user {user_id} not found")
+                async for event, payload in stream_user_report(user, db):
+                    if event == "report":
+                        yield _sse("done", _to_response(payload).model_dump())
+                    else:
+                        yield _sse(event, payload)
+        except Exception as e:
+            print(f"[REPORT] Streaming generation failed for user {user_id}: {e}")
+            yield _sse("error", {"detail": "리포트 생성 중 오류가 발생했습니다"})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -6,6 +6,9 @@ from typing import Optional, Any
 
 from ..core.database import get_db
 from ..models.user import User, ReportLevel, ReportFrequency
+from ..services.push_service import (
+    count_push_subscriptions, remove_push_subscriptions, upsert_push_subscription,
+)
 from .auth import get_current_user
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -19,6 +22,7 @@ class SettingsUpdate(BaseModel):
 
 class PushSubscriptionUpdate(BaseModel):
     subscription: Optional[dict[str, Any]] = None  # None = 구독 해제
+    endpoint: Optional[str] = None  # 해제 시 이 기기만 해제 (없으면 모든 기기)
     enabled: bool = True
 
 
@@ -62,15 +66,26 @@ async def update_push_subscription(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Web Push 구독 정보 저장/해제"""
+    """
+    Web Push 구독 등록/해제 (기기별).
+    같은 endpoint는 갱신(upsert)하므로 다른 기기의 구독은 유지됩니다.
+    """
     if data.subscription is None:
-        current_user.push_subscription = None
-        current_user.push_enabled = False
+        await remove_push_subscriptions(db, current_user, data.endpoint)
     else:
-        current_user.push_subscription = data.subscription
+        if not data.subscription.get("endpoint"):
+            raise HTTPException(status_code=400, detail="구독 정보에 endpoint가 없습니다")
+        await upsert_push_subscription(db, current_user, data.subscription)
         current_user.push_enabled = data.enabled
+    devices = await count_push_subscriptions(db, current_user.id)
+    if devices == 0:
+        current_user.push_enabled = False
     await db.commit()
-    return {"message": "푸시 설정이 업데이트되었습니다", "push_enabled": current_user.push_enabled}
+    return {
+        "message": "푸시 설정이 업데이트되었습니다",
+        "push_enabled": current_user.push_enabled,
+        "devices": devices,
+    }
 
 
 @router.get("/vapid-public-key", response_model=VapidKeyResponse)
@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     # API Keys
     ANTHROPIC_API_KEY: str = ""  # 런타임에 필수, 임포트 시엔 optional
     FRED_API_KEY: str = ""  # optional - public data도 있음
+    ECOS_API_KEY: str = ""  # optional - 한국은행 ECOS (기준금리, 국고채 금리 등)
+    KOSIS_API_KEY: str = ""  # optional - 통계청 KOSIS (실업률 등)
+    ECOS_API_BASE: str = "https://ecos.bok.or.kr/api"
+    KOSIS_API_BASE: str = "https://kosis.kr/openapi"
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./mesa.db"
@@ -21,9 +25,66 @@ class Settings(BaseSettings):
     VAPID_PRIVATE_KEY: str = ""
     VAPID_PUBLIC_KEY: str = ""
     VAPID_CLAIMS_EMAIL: str = "admin@mesa.local"
+    # Web Push 일괄 전송: 동시 전송 수 / 연결 풀 크기 / 요청 제한 시간 / 푸시 서비스 보관 시간(TTL 헤더)
+    PUSH_MAX_CONCURRENCY: int = 100
+    PUSH_MAX_CONNECTIONS: int = 100
+    PUSH_MAX_CONCURRENCY_PER_ORIGIN: int = 50  # 푸시 서비스(origin)별 동시 전송 수
+    PUSH_TIMEOUT_SECONDS: float = 10.0
+    PUSH_TTL_SECONDS: int = 24 * 60 * 60
+    PUSH_URGENCY: str = "normal"  # Urgency 헤더: very-low | low | normal | high
+    PUSH_PREPARE_WORKERS: int = 4  # 페이로드 암호화/VAPID 서명 전용 스레드 수
+    # 푸시 outbox 디스패처: 한 번에 꺼낼 건수 / 대기 폴링 간격 / 최대 시도 횟수 / 재시도 기본 간격 (base * 2^(시도-1))
+    PUSH_OUTBOX_BATCH_SIZE: int = 500
+    PUSH_OUTBOX_POLL_SECONDS: float = 5.0
+    PUSH_OUTBOX_MAX_ATTEMPTS: int = 5
+    PUSH_RETRY_BASE_SECONDS: float = 30.0
+    # 일시 실패한 기기를 새 알림에서 제외하는 기간: base * 2^(연속 실패한 알림 수-1), 최대 max (초)
+    # outbox 재시도(PUSH_RETRY_BASE_SECONDS)와 별개이며, 같은 알림의 재시도 실패는 한 번만 센다
+    PUSH_BACKOFF_BASE_SECONDS: float = 15 * 60
+    PUSH_BACKOFF_MAX_SECONDS: float = 7 * 24 * 60 * 60
+
+    # Indicator cache
+    INDICATOR_CACHE_MAX_ENTRIES: int = 256
+    # TTL이 지난 값을 실시간 API에서 즉시 반환하고 백그라운드 갱신할 수 있는 최대 초과 시간(초)
+    INDICATOR_MAX_STALE_SECONDS: float = 24 * 60 * 60
+    # 지표 시계열 로컬 저장소 (SQLite 파일, 빈 값이면 비활성화)
+    INDICATOR_STORE_PATH: str = "./indicator_store.db"
+
+    # 공개 API 공용 HTTP 클라이언트 (연결 풀/keep-alive/재시도)
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF_SECONDS: float = 0.5
+
+    # 블로킹 지표 수집(yfinance) 전용 스레드 풀과 소스별 동시 실행 수
+    FETCH_EXECUTOR_WORKERS: int = 8
+    YFINANCE_MAX_CONCURRENCY: int = 2
+    # FRED API 동시 요청 수 (비동기 클라이언트)
+    FRED_MAX_CONCURRENCY: int = 4
+    # 소스별 서킷 브레이커: 연속 실패 임계값 / 차단 유지 시간 / 소스 일괄 수집 제한 시간
+    CIRCUIT_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_COOLDOWN_SECONDS: float = 60.0
+    SOURCE_FETCH_TIMEOUT_SECONDS: float = 30.0
+
+    # 리포트 스케줄 몇 분 전에 지표를 미리 갱신할지 (0이면 비활성화, 일간 지표 캐시 TTL 1시간보다 짧게)
+    REPORT_PREWARM_LEAD_MINUTES: int = 15
+
+    # Report batch (스케줄 배치 동시 실행)
+    REPORT_BATCH_CONCURRENCY: int = 8
+    REPORT_USER_TIMEOUT_SECONDS: float = 300.0
+
+    # On-demand report jobs (온디맨드 생성 작업 큐)
+    REPORT_JOB_WORKERS: int = 4
+    REPORT_JOB_BACKEND: str = "memory"  # "memory" | "sql"
 
     # Claude Model
     CLAUDE_MODEL: str = "claude-sonnet-4-6"
+    # 스케줄 배치 AI 모드: "realtime" (즉시 호출) | "batch" (Message Batches)
+    REPORT_AI_MODE: str = "realtime"
+    AI_BATCH_POLL_INTERVAL_SECONDS: float = 30.0
+    AI_BATCH_MAX_WAIT_SECONDS: float = 3600.0
 
     class Config:
         env_file = ".env"
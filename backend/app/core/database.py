@@ -1,10 +1,20 @@
+import json
+
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .config import settings
 from ..models.base import Base
+from ..models.push_subscription import PushSubscription, endpoint_origin
 
 engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+# create_all은 기존 테이블에 컬럼을 추가하지 않으므로, 이후 추가된 nullable 컬럼은 여기서 보충
+# (테이블, 컬럼, DDL 타입)
+ADDED_COLUMNS = [
+    ("reports", "ai_usage", "JSON"),
+]
+
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
@@ -14,3 +24,53 @@ async def get_db() -> AsyncSession:
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(import_legacy_push_subscriptions)
+
+
+def add_missing_columns(conn) -> int:
+    """ADDED_COLUMNS 중 기존 테이블에 없는 컬럼만 ALTER TABLE로 추가 (여러 번 실행해도 안전)"""
+    inspector = inspect(conn)
+    added = 0
+    for table, column, ddl_type in ADDED_COLUMNS:
+        if column in {c["name"] for c in inspector.get_columns(table)}:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+        print(f"[DB] Added column {table}.{column}")
+        added += 1
+    return added
+
+
+def import_legacy_push_subscriptions(conn) -> int:
+    """
+    이전 스키마의 users.push_subscription(사용자당 단일 구독)을 push_subscriptions로 이전.
+    컬럼이 없으면 아무것도 하지 않고, 이전한 값은 NULL로 비워 다시 옮기지 않습니다.
+    """
+    columns = {c["name"] for c in inspect(conn).get_columns("users")}
+    if "push_subscription" not in columns:
+        return 0
+
+    rows = conn.execute(
+        text("SELECT id, push_subscription FROM users WHERE push_subscription IS NOT NULL")
+    ).all()
+    table = PushSubscription.__table__
+    existing = set(conn.execute(table.select().with_only_columns(table.c.endpoint)).scalars())
+    imported = 0
+    for user_id, raw in rows:
+        subscription = json.loads(raw) if isinstance(raw, str) else raw
+        endpoint = (subscription or {}).get("endpoint")
+        if not endpoint or endpoint in existing:
+            continue
+        conn.execute(table.insert().values(
+            user_id=user_id,
+            endpoint=endpoint,
+            origin=endpoint_origin(endpoint),
+            keys=subscription.get("keys"),
+            failure_count=0,
+        ))
+        existing.add(endpoint)
+        imported += 1
+    conn.execute(text("UPDATE users SET push_subscription = NULL WHERE push_subscription IS NOT NULL"))
+    if imported:
+        print(f"[DB] Imported {imported} legacy push subscriptions")
+    return imported
@@ -1,3 +1,6 @@
 from .base import Base
 from .user import User, ReportLevel, ReportFrequency
 from .report import Report
+from .report_job import ReportJob, ReportJobStatus
+from .push_outbox import PushOutbox, PushOutboxStatus
+from .push_subscription import PushSubscription, endpoint_origin
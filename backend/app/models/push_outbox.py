@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, JSON, Enum, DateTime
+import enum
+from .base import Base, TimestampMixin
+
+
+class PushOutboxStatus(str, enum.Enum):
+    PENDING = "pending"    # 전송 대기 (재시도 포함)
+    SENDING = "sending"    # 디스패처가 가져가 전송 중
+    SENT = "sent"
+    FAILED = "failed"      # 구독 만료 또는 재시도 소진
+    EXPIRED = "expired"    # TTL 안에 전송하지 못함
+
+
+class PushOutbox(Base, TimestampMixin):
+    """리포트와 같은 커밋으로 기록되는 푸시 알림 outbox (디스패처가 비동기로 전송)"""
+    __tablename__ = "push_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="SET NULL"), nullable=True)
+
+    subscription = Column(JSON, nullable=False)  # 기록 시점의 PushSubscription JSON
+    payload = Column(JSON, nullable=False)       # 알림 페이로드 (title/body/url/icon)
+    urgency = Column(String(16), nullable=False, default="normal")  # Urgency 헤더
+
+    status = Column(Enum(PushOutboxStatus), default=PushOutboxStatus.PENDING, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False)  # 기록 시각 + TTL, 남은 시간을 TTL 헤더로 전송
+    last_status_code = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, DateTime, Index
+from sqlalchemy.orm import relationship
+from urllib.parse import urlparse
+from .base import Base, TimestampMixin
+
+
+def endpoint_origin(endpoint: str) -> str:
+    """구독 endpoint의 푸시 서비스 origin (scheme://host[:port])"""
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class PushSubscription(Base, TimestampMixin):
+    """기기(브라우저)별 Web Push 구독. 한 사용자가 여러 기기를 등록할 수 있습니다."""
+    __tablename__ = "push_subscriptions"
+    __table_args__ = (
+        Index("ix_push_subscriptions_user_origin", "user_id", "origin"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    endpoint = Column(String, unique=True, nullable=False)  # 기기 식별자 (푸시 서비스 URL)
+    origin = Column(String(255), nullable=False, index=True)  # 푸시 서비스 origin (FCM/Mozilla/Apple 등)
+    keys = Column(JSON, nullable=True)  # p256dh / auth
+
+    failure_count = Column(Integer, default=0, nullable=False)  # 연속 일시 실패 횟수
+    retry_after = Column(DateTime, nullable=True)  # 백오프 중이면 이 시각(UTC) 전까지 전송 생략
+
+    user = relationship("User", back_populates="push_subscriptions")
+
+    def as_subscription(self) -> dict:
+        """브라우저 PushSubscription JSON 형식"""
+        return {"endpoint": self.endpoint, "keys": self.keys or {}}
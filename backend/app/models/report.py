@@ -17,6 +17,7 @@ class Report(Base, TimestampMixin):
     level = Column(Enum(ReportLevel), nullable=False)
     indicators_used = Column(JSON, default=list)  # 사용된 지표 id 목록
     raw_data = Column(JSON, nullable=True)        # 수집된 원본 데이터
+    ai_usage = Column(JSON, nullable=True)        # Claude 토큰 사용량 (캐시/비캐시 입력 토큰 포함)
 
     is_read = Column(Boolean, default=False)
 
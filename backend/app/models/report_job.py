@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, Enum
+import enum
+from .base import Base, TimestampMixin
+
+
+class ReportJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ReportJob(Base, TimestampMixin):
+    __tablename__ = "report_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(Enum(ReportJobStatus), default=ReportJobStatus.QUEUED, nullable=False)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="SET NULL"), nullable=True)
+    error = Column(Text, nullable=True)
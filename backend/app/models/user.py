@@ -29,8 +29,10 @@ class User(Base, TimestampMixin):
     report_frequency = Column(Enum(ReportFrequency), default=ReportFrequency.WEEKLY, nullable=False)
     selected_indicators = Column(JSON, default=list)  # indicator id 목록
 
-    # Web Push 구독 정보
-    push_subscription = Column(JSON, nullable=True)  # PushSubscription JSON
+    # Web Push 수신 여부 (기기별 구독은 push_subscriptions)
     push_enabled = Column(Boolean, default=False)
 
     reports = relationship("Report", back_populates="user")
+    push_subscriptions = relationship(
+        "PushSubscription", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
@@ -2,11 +2,22 @@
 AI 인사이트 생성 서비스
 Claude API를 통해 경제 데이터를 분석하고 레벨별 인사이트를 생성합니다.
 """
-from typing import Any
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 from anthropic import AsyncAnthropic
 from ..core.config import settings
 from ..models.user import ReportLevel
 
+logger = logging.getLogger(__name__)
+
 client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
 
 LEVEL_SYSTEM_PROMPTS = {
@@ -39,42 +50,494 @@ LEVEL_LABELS = {
 }
 
 
+class ReportParseError(ValueError):
+    """Claude 응답에서 JSON을 추출하지 못한 경우"""
+
+    def __init__(self, text: str):
+        super().__init__("failed to parse report JSON")
+        self.text = text
+
+
+class AIResultCache:
+    """
+    프롬프트 해시 기준 AI 결과 캐시 (content-addressed, LRU).
+    같은 키의 동시 요청은 진행 중인 한 번의 호출로 합쳐집니다 (single-flight).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self._max_entries = max_entries
+        self._results: OrderedDict[str, dict] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_create(self, key: str, factory: Callable[[], Awaitable[dict]]) -> dict:
+        if key in self._results:
+            self._results.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._results[key])
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            self.coalesced += 1
+        # 한 요청자가 취소돼도 다른 대기자를 위해 호출은 계속 진행
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _on_done(self, key: str, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.put(key, task.result())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._results
+
+    def put(self, key: str, value: dict) -> None:
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self._max_entries:
+            self._results.popitem(last=False)
+
+    def get(self, key: str) -> Optional[dict]:
+        """완료된 결과만 조회 (진행 중인 호출은 기다리지 않음)"""
+        if key not in self._results:
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(self._results[key])
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._results),
+        }
+
+
+ai_result_cache = AIResultCache()
+
+
+def _cache_key(level: ReportLevel, shared_block: str, system_prompt: str, instructions: str) -> str:
+    digest = hashlib.sha256()
+    for part in (level.value, shared_block, system_prompt, instructions):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def _message_params(shared_block: str, system_prompt: str, instructions: str) -> dict[str, Any]:
+    """
+    Messages API 요청 파라미터.
+    실행(배치) 전체가 공유하는 블록(공통 작성 지침 + 실행 시점의 전체 지표 데이터)을 맨 앞에 두고
+    여기에만 캐시 구간을 지정합니다. 레벨별 시스템 프롬프트와 사용자별 지표 선택은 그 뒤에 붙여
+    레벨·선택 지표가 달라도 같은 실행의 요청들이 캐시된 prefix를 재사용합니다.
+    (레벨 프롬프트만으로는 최소 캐시 길이에 못 미쳐 캐시되지 않음)
+    """
+    return {
+        "model": settings.CLAUDE_MODEL,
+        "max_tokens": 4096,
+        "system": [
+            {"type": "text", "text": shared_block, "cache_control": _EPHEMERAL},
+            {"type": "text", "text": system_prompt},
+        ],
+        "messages": [{
+            "role": "user",
+            "content": [{"type": "text", "text": instructions}],
+        }],
+    }
+
+
+def _usage_dict(usage: Any) -> dict[str, int]:
+    """응답 usage에서 캐시/비캐시 입력 토큰 수 추출"""
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+
+
+class BatchBackend(ABC):
+    """
+    Message Batches 백엔드 인터페이스.
+    테스트에서는 로컬 가짜 구현으로 교체할 수 있습니다 (set_batch_backend).
+    """
+
+    @abstractmethod
+    async def submit(self, requests: list[dict[str, Any]]) -> str:
+        """요청 목록({"custom_id", "params"})을 배치로 제출하고 batch id 반환"""
+
+    @abstractmethod
+    async def is_done(self, batch_id: str) -> bool:
+        """배치 처리가 끝났는지 여부"""
+
+    @abstractmethod
+    async def results(self, batch_id: str) -> dict[str, Optional[str]]:
+        """custom_id → 응답 텍스트 (실패/만료/취소된 요청은 None)"""
+
+    @abstractmethod
+    async def cancel(self, batch_id: str) -> None:
+        """처리 중인 배치 취소 (아직 처리되지 않은 요청은 과금되지 않음)"""
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API 구현"""
+
+    def __init__(self, anthropic_client: AsyncAnthropic):
+        self._batches = anthropic_client.beta.messages.batches
+
+    async def submit(self, requests: list[dict[str, Any]]) -> str:
+        batch = await self._batches.create(requests=requests)
+        return batch.id
+
+    async def is_done(self, batch_id: str) -> bool:
+        batch = await self._batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def cancel(self, batch_id: str) -> None:
+        await self._batches.cancel(batch_id)
+
+    async def results(self, batch_id: str) -> dict[str, Optional[str]]:
+        texts: dict[str, Optional[str]] = {}
+        async for entry in await self._batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                texts[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                texts[entry.custom_id] = None
+        return texts
+
+
+_batch_backend: Optional[BatchBackend] = None
+
+
+def get_batch_backend() -> BatchBackend:
+    global _batch_backend
+    if _batch_backend is None:
+        _batch_backend = AnthropicBatchBackend(client)
+    return _batch_backend
+
+
+def set_batch_backend(backend: Optional[BatchBackend]) -> None:
+    """배치 백엔드 교체 (None이면 기본 Anthropic 백엔드로 복원)"""
+    global _batch_backend
+    _batch_backend = backend
+
+
+async def prefetch_reports_batch(
+    items: list[tuple[dict[str, Any], ReportLevel]],
+    indicator_configs: list[dict],
+    shared_data: Optional[dict[str, Any]] = None,
+    report_date: Optional[date] = None,
+    backend: Optional[BatchBackend] = None,
+    poll_interval: Optional[float] = None,
+    max_wait: Optional[float] = None,
+    results: Optional[dict[str, dict]] = None,
+) -> int:
+    """
+    (지표 데이터, 레벨) 목록의 리포트를 Message Batches로 한 번에 생성.
+    results(실행 단위 dict)가 주어지면 프롬프트 키 → 파싱 결과를 여기에 담고, 없으면 ai_result_cache에 적재합니다.
+    배치 실행은 results를 generate_report(batch_results=...)까지 넘겨야 합니다.
+    (공용 LRU 캐시는 크기가 제한되어 있어 프롬프트가 많으면 읽기 전에 밀려남)
+    실패한 항목은 담지 않아 generate_report에서 실시간 호출로 대체됩니다.
+
+    Returns: 적재된 결과 수
+    """
+    store: Any = ai_result_cache if results is None else results
+    requests: dict[str, dict[str, Any]] = {}
+    for indicator_data, level in items:
+        prompt = _build_prompt(indicator_data, level, indicator_configs, shared_data, report_date)
+        key = _cache_key(level, *prompt)
+        if key in requests or key in store:
+            continue
+        requests[key] = {
+            "custom_id": key,
+            "params": _message_params(*prompt),
+        }
+
+    if not requests:
+        return 0
+
+    backend = backend or get_batch_backend()
+    poll_interval = settings.AI_BATCH_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+    max_wait = settings.AI_BATCH_MAX_WAIT_SECONDS if max_wait is None else max_wait
+
+    batch_id = await backend.submit(list(requests.values()))
+    logger.info("Submitted batch %s with %d requests", batch_id, len(requests))
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait
+    while not await backend.is_done(batch_id):
+        if loop.time() >= deadline:
+            # 결과를 쓰지 않을 배치가 계속 과금되지 않도록 취소 (남은 항목은 실시간 호출로 대체)
+            logger.warning("Batch %s did not finish within %ss, cancelling", batch_id, max_wait)
+            try:
+                await backend.cancel(batch_id)
+            except Exception:
+                logger.exception("Failed to cancel batch %s", batch_id)
+            return 0
+        await asyncio.sleep(poll_interval)
+
+    seeded = 0
+    for key, text in (await backend.results(batch_id)).items():
+        if key not in requests or text is None:
+            continue
+        try:
+            parsed = _parse_report_json(text)
+        except ReportParseError:
+            continue
+        if results is None:
+            ai_result_cache.put(key, parsed)
+        else:
+            results[key] = parsed
+        seeded += 1
+    return seeded
+
+
 async def generate_report(
     indicator_data: dict[str, Any],
     level: ReportLevel,
     indicator_configs: list[dict],
+    shared_data: Optional[dict[str, Any]] = None,
+    report_date: Optional[date] = None,
+    batch_results: Optional[dict[str, dict]] = None,
 ) -> dict[str, str]:
     """
     경제 데이터를 분석하여 HTML 리포트 생성
-    Returns: {"title": ..., "summary": ..., "html_content": ...}
+    shared_data는 같은 실행의 모든 리포트가 공유하는 전체 지표 데이터(배치 스냅샷)로, 프롬프트 캐시 구간이 됩니다.
+    없으면 indicator_data를 그대로 사용합니다.
+    report_date는 프롬프트와 제목에 쓰는 리포트 기준일로, 배치 실행은 실행 단위로 고정한 날짜를 넘깁니다.
+    (없으면 오늘 날짜. 자정을 넘겨 끝나는 배치에서 prefetch와 사용자별 생성의 캐시 키가 어긋나지 않도록)
+    같은 프롬프트(데이터·레벨·날짜)는 ai_result_cache를 통해 Claude를 한 번만 호출합니다.
+    batch_results는 prefetch_reports_batch가 채운 실행 단위 결과로, 키가 있으면 Claude를 호출하지 않습니다.
+    Returns: {"title": ..., "summary": ..., "html_content": ..., "usage": ...}
+    usage는 이 요청이 직접 호출한 경우의 토큰 사용량이며, 캐시/합류로 처리되면
+    모든 값이 0이고 "deduplicated"가 True입니다.
+    """
+    prompt = _build_prompt(indicator_data, level, indicator_configs, shared_data, report_date)
+    usage: Optional[dict[str, int]] = None
+
+    async def _call_claude() -> dict:
+        nonlocal usage
+        response = await client.messages.create(**_message_params(*prompt))
+        usage = _usage_dict(response.usage)
+        return _parse_report_json(response.content[0].text)
+
+    key = _cache_key(level, *prompt)
+    if batch_results is not None and key in batch_results:
+        parsed = copy.deepcopy(batch_results[key])
+    else:
+        try:
+            parsed = await ai_result_cache.get_or_create(key, _call_claude)
+        except ReportParseError as e:
+            parsed = _fallback_report(e.text, report_date)
+
+    return _finalize_report(parsed, level, indicator_data, indicator_configs, usage, report_date)
+
+
+async def stream_report(
+    indicator_data: dict[str, Any],
+    level: ReportLevel,
+    indicator_configs: list[dict],
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    스트리밍 API로 리포트를 생성하며 파싱되는 즉시 이벤트를 내보냅니다.
+
+    Yields: ("summary", {"line", "text"}), ("section", {"index", "title", "content"}),
+            마지막으로 ("complete", generate_report와 같은 형식의 결과)
+    캐시에 같은 입력의 결과가 있으면 Claude 호출 없이 바로 이벤트를 내보냅니다.
     """
-    system_prompt = LEVEL_SYSTEM_PROMPTS[level]
-    level_label = LEVEL_LABELS[level]
+    prompt = _build_prompt(indicator_data, level, indicator_configs)
+    key = _cache_key(level, *prompt)
+    usage: Optional[dict[str, int]] = None
+
+    parsed = ai_result_cache.get(key)
+    if parsed is not None:
+        for event in _report_events(parsed):
+            yield event
+    else:
+        parser = PartialReportParser()
+        async with client.messages.stream(**_message_params(*prompt)) as stream:
+            async for text in stream.text_stream:
+                for event in parser.feed(text):
+                    yield event
+            final_message = await stream.get_final_message()
+        usage = _usage_dict(final_message.usage)
+        try:
+            parsed = _parse_report_json(parser.buffer)
+            ai_result_cache.put(key, parsed)
+        except ReportParseError as e:
+            parsed = _fallback_report(e.text)
+
+    yield "complete", _finalize_report(parsed, level, indicator_data, indicator_configs, usage)
+
+
+class PartialReportParser:
+    """
+    스트리밍 중인 리포트 JSON에서 완성된 요약 문장과 섹션을 점진적으로 추출.
+    feed()에 텍스트 조각을 넣으면 새로 완성된 항목의 이벤트 목록을 반환합니다.
+    """
+
+    _SUMMARY_KEYS = ("summary_line1", "summary_line2", "summary_line3")
+    _SUMMARY_PATTERNS = {
+        key: re.compile(rf'"{key}"\s*:\s*"((?:[^"\\]|\\.)*)"') for key in _SUMMARY_KEYS
+    }
+    _SECTIONS_PATTERN = re.compile(r'"sections"\s*:\s*\[')
+
+    def __init__(self):
+        self.buffer = ""
+        self._emitted_summaries: set[str] = set()
+        self._section_count = 0
+        self._sections_done = False
+        # sections 배열 스캔 상태
+        self._scan_pos: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = 0
+
+    def feed(self, text: str) -> list[tuple[str, dict[str, Any]]]:
+        self.buffer += text
+        events: list[tuple[str, dict[str, Any]]] = []
+
+        for line_no, key in enumerate(self._SUMMARY_KEYS, start=1):
+            if key in self._emitted_summaries:
+                continue
+            match = self._SUMMARY_PATTERNS[key].search(self.buffer)
+            if match:
+                self._emitted_summaries.add(key)
+                events.append(("summary", {"line": line_no, "text": json.loads(f'"{match.group(1)}"')}))
+
+        if self._scan_pos is None:
+            match = self._SECTIONS_PATTERN.search(self.buffer)
+            if match:
+                self._scan_pos = match.end()
+        if self._scan_pos is not None and not self._sections_done:
+            events.extend(self._scan_sections())
+        return events
+
+    def _scan_sections(self) -> list[tuple[str, dict[str, Any]]]:
+        events = []
+        buf = self.buffer
+        pos = self._scan_pos
+        while pos < len(buf):
+            c = buf[pos]
+            pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                if self._depth == 0:
+                    self._object_start = pos - 1
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        section = json.loads(buf[self._object_start:pos])
+                    except ValueError:
+                        continue
+                    events.append(("section", {
+                        "index": self._section_count,
+                        "title": section.get("title", ""),
+                        "content": section.get("content", ""),
+                    }))
+                    self._section_count += 1
+            elif c == "]" and self._depth == 0:
+                self._sections_done = True
+                break
+        self._scan_pos = pos
+        return events
+
+
+def _report_events(parsed: dict) -> list[tuple[str, dict[str, Any]]]:
+    """완성된 리포트 dict를 스트리밍과 같은 이벤트 순서로 변환"""
+    events: list[tuple[str, dict[str, Any]]] = []
+    for line_no in (1, 2, 3):
+        events.append(("summary", {"line": line_no, "text": parsed.get(f"summary_line{line_no}", "")}))
+    for index, section in enumerate(parsed.get("sections", [])):
+        events.append(("section", {
+            "index": index,
+            "title": section.get("title", ""),
+            "content": section.get("content", ""),
+        }))
+    return events
+
+
+def _fallback_report(text: str, report_date: Optional[date] = None) -> dict:
+    return {
+        "title": f"{_today(report_date)} 경제 리포트",
+        "summary_line1": "데이터 파싱 오류가 발생했습니다.",
+        "summary_line2": "",
+        "summary_line3": "",
+        "sections": [{"title": "원문", "content": text}],
+    }
+
+
+def _finalize_report(
+    parsed: dict,
+    level: ReportLevel,
+    indicator_data: dict[str, Any],
+    indicator_configs: list[dict],
+    usage: Optional[dict[str, int]],
+    report_date: Optional[date] = None,
+) -> dict[str, Any]:
+    """파싱된 리포트를 요약 문자열과 HTML로 변환"""
+    summary = "\n".join([
+        parsed.get("summary_line1", ""),
+        parsed.get("summary_line2", ""),
+        parsed.get("summary_line3", ""),
+    ])
 
-    # 데이터 포맷팅
-    data_text = _format_data_for_prompt(indicator_data, indicator_configs)
+    from .template_renderer import render_report_html
+    html_content = render_report_html(parsed, level, indicator_data, indicator_configs)
 
-    user_prompt = f"""다음은 오늘({_today()}) 수집된 경제 지표 데이터입니다.
+    return {
+        "title": parsed.get("title", f"{_today(report_date)} 경제 리포트"),
+        "summary": summary,
+        "html_content": html_content,
+        "usage": usage if usage is not None else {**_usage_dict(None), "deduplicated": True},
+    }
 
-{data_text}
 
-위 데이터를 분석하여 [{level_label}] 수준의 경제 리포트를 작성하세요.
+# 실행 전체가 공유하는 작성 지침 (캐시 구간 앞부분)
+SHARED_INSTRUCTIONS = """당신은 MESA의 경제 리포트 작성자입니다.
+아래 지표 데이터는 이번 실행의 모든 리포트가 함께 사용하는 원본이며, 리포트마다 독자 수준과 분석 대상 지표가 따로 지정됩니다.
+지정된 지표를 중심으로 분석하되, 해석에 필요하면 다른 지표도 근거로 인용할 수 있습니다.
 
 ## 출력 형식 (JSON)
 다음 형식으로 정확히 응답하세요:
 
-{{
+{
   "title": "리포트 제목 (날짜 포함, 예: 2026년 2월 경제 동향 분석)",
   "summary_line1": "첫 번째 요약 문장 (가장 중요한 메시지)",
   "summary_line2": "두 번째 요약 문장 (핵심 지표 상황)",
   "summary_line3": "세 번째 요약 문장 (투자/생활 시사점)",
   "sections": [
-    {{
+    {
       "title": "섹션 제목",
       "content": "섹션 내용 (HTML 태그 사용 가능: <strong>, <em>, <ul>, <li>, <p>)"
-    }}
+    }
   ]
-}}
+}
 
 ## 필수 섹션
 1. 거시경제 현황 요약
@@ -84,54 +547,64 @@ async def generate_report(
 
 두괄식으로 summary를 가장 중요하게 작성하세요."""
 
-    response = await client.messages.create(
-        model=settings.CLAUDE_MODEL,
-        max_tokens=4096,
-        system=system_prompt,
-        messages=[{"role": "user", "content": user_prompt}],
+
+def _build_prompt(
+    indicator_data: dict[str, Any],
+    level: ReportLevel,
+    indicator_configs: list[dict],
+    shared_data: Optional[dict[str, Any]] = None,
+    report_date: Optional[date] = None,
+) -> tuple[str, str, str]:
+    """
+    (공유 블록, 레벨 시스템 프롬프트, 사용자별 지시문) 구성.
+    공유 블록은 작성 지침과 실행 전체의 지표 데이터로만 만들어 레벨/사용자와 무관하게 같습니다.
+    """
+    shared_text = _format_data_for_prompt(shared_data or indicator_data, indicator_configs)
+    shared_block = f"""{SHARED_INSTRUCTIONS}
+
+## 지표 데이터
+다음은 {_today(report_date)} 기준으로 수집된 경제 지표 데이터입니다.
+
+{shared_text}"""
+
+    config_map = {c["id"]: c for c in indicator_configs}
+    selected = "\n".join(
+        f"- {config_map.get(i, {}).get('name_ko', i)}" for i in _ordered_ids(indicator_data, indicator_configs)
     )
+    instructions = f"""다음 지표를 중심으로 [{LEVEL_LABELS[level]}] 수준의 경제 리포트를 작성하세요.
+
+{selected}"""
+    return shared_block, LEVEL_SYSTEM_PROMPTS[level], instructions
+
 
-    import json
-    text = response.content[0].text
-    # JSON 추출
+def _parse_report_json(text: str) -> dict:
+    """Claude 응답 텍스트에서 JSON 객체 추출"""
     try:
         start = text.find("{")
         end = text.rfind("}") + 1
-        parsed = json.loads(text[start:end])
+        return json.loads(text[start:end])
     except Exception:
-        parsed = {
-            "title": f"{_today()} 경제 리포트",
-            "summary_line1": "데이터 파싱 오류가 발생했습니다.",
-            "summary_line2": "",
-            "summary_line3": "",
-            "sections": [{"title": "원문", "content": text}],
-        }
-
-    summary = "\n".join([
-        parsed.get("summary_line1", ""),
-        parsed.get("summary_line2", ""),
-        parsed.get("summary_line3", ""),
-    ])
+        raise ReportParseError(text)
 
-    from .template_renderer import render_report_html
-    html_content = render_report_html(parsed, level, indicator_data, indicator_configs)
 
-    return {
-        "title": parsed.get("title", f"{_today()} 경제 리포트"),
-        "summary": summary,
-        "html_content": html_content,
-    }
+def _today(report_date: Optional[date] = None) -> str:
+    return (report_date or date.today()).strftime("%Y년 %m월 %d일")
 
 
-def _today() -> str:
-    from datetime import date
-    return date.today().strftime("%Y년 %m월 %d일")
+def _ordered_ids(indicator_data: dict, configs: list[dict]) -> list[str]:
+    """
+    지표 id를 설정 파일 순서로 정렬 (설정에 없는 id는 뒤에 id 순).
+    사용자가 고른 순서와 무관하게 같은 지표 집합이면 프롬프트와 캐시 키가 같아집니다.
+    """
+    position = {c["id"]: i for i, c in enumerate(configs)}
+    return sorted(indicator_data, key=lambda ind_id: (position.get(ind_id, len(position)), ind_id))
 
 
 def _format_data_for_prompt(indicator_data: dict, configs: list[dict]) -> str:
     lines = []
     config_map = {c["id"]: c for c in configs}
-    for ind_id, data in indicator_data.items():
+    for ind_id in _ordered_ids(indicator_data, configs):
+        data = indicator_data[ind_id]
         cfg = config_map.get(ind_id, {})
         name = cfg.get("name_ko", ind_id)
         value = data.get("value")
@@ -0,0 +1,113 @@
+"""
+소스별 서킷 브레이커
+상위 API(Yahoo, FRED 등) 장애 시 매 요청마다 타임아웃을 기다리지 않도록
+연속 실패가 임계값에 도달하면 일정 시간(cooldown) 동안 해당 소스 요청을 즉시 실패시킵니다.
+
+상태: closed(정상) → open(차단) → cooldown 경과 후 half_open(시험 요청 1회) → 성공 시 closed / 실패 시 open
+"""
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from ..core.config import settings
+from .http_client import UpstreamError, public_error
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(UpstreamError):
+    """차단 중인 소스로의 요청"""
+
+    def __init__(self, source: str, retry_after: float):
+        super().__init__(source, reason=f"circuit open (retry in {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """소스 하나의 실패 횟수/상태 추적"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_FAILURE_THRESHOLD
+        self.cooldown = settings.CIRCUIT_COOLDOWN_SECONDS if cooldown is None else cooldown
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0          # 연속 실패 횟수
+        self._opened_at = 0.0
+        self._probing = False       # half_open 시험 요청 진행 중
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[datetime] = None
+        self.last_success_at: Optional[datetime] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """차단 해제(half_open)까지 남은 시간 (초)"""
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """요청 허용 여부 (half_open에서는 시험 요청 하나만 통과)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._state = HALF_OPEN
+            self._probing = True
+            return True
+        self.total_rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != CLOSED:
+            print(f"[CIRCUIT] {self.name} recovered, closing circuit")
+        self._state = CLOSED
+        self._failures = 0
+        self._probing = False
+        self.last_success_at = datetime.now()
+
+    def record_failure(self, error: BaseException) -> None:
+        self._failures += 1
+        self.total_failures += 1
+        # 헬스 체크로 공개되므로 원본 예외 메시지 대신 정제된 설명만 보관
+        self.last_error = public_error(error)
+        self.last_failure_at = datetime.now()
+        # half_open 시험 요청 실패 또는 연속 실패 임계값 도달 시 차단
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._state != OPEN or self._probing:
+                print(f"[CIRCUIT] {self.name} open for {self.cooldown:.0f}s after {self._failures} failures: {self.last_error}")
+            self._state = OPEN
+            self._opened_at = self._clock()
+        self._probing = False
+
+    def abort(self) -> None:
+        """결과 없이 끝난 요청(취소 등) - half_open 시험 요청 자리만 반납"""
+        self._probing = False
+
+    def snapshot(self) -> dict[str, Any]:
+        """헬스 체크용 상태"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "last_error": self.last_error,
+            "last_failure_at": self.last_failure_at.isoformat() if self.last_failure_at else None,
+            "last_success_at": self.last_success_at.isoformat() if self.last_success_at else None,
+        }
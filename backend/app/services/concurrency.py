@@ -0,0 +1,28 @@
+"""
+이벤트 루프별 동시 실행 제한
+asyncio.Semaphore는 처음 사용한 이벤트 루프에 묶이므로, 모듈 싱글턴이 여러 루프
+(테스트, 스케줄러 작업의 asyncio.run 등)에서 쓰일 때 루프가 바뀌면 세마포어를 새로 만듭니다.
+"""
+import asyncio
+from typing import Hashable, Optional
+
+
+class LoopSemaphores:
+    """키(소스 이름 등)별 세마포어를 현재 실행 중인 이벤트 루프 기준으로 보관"""
+
+    def __init__(self):
+        self._semaphores: dict[Hashable, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self, key: Hashable, limit: Optional[int]) -> Optional[asyncio.Semaphore]:
+        """key의 세마포어 (limit이 없거나 0이면 제한 없음으로 None)"""
+        if not limit:
+            return None
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(limit)
+        return semaphore
@@ -1,163 +1,362 @@
 """
 경제 지표 데이터 수집 서비스
 FRED API, yfinance, 공개 API를 통해 실시간 경제 데이터를 수집합니다.
+소스별 수집 방식은 sources.py의 어댑터가 담당합니다.
 """
 import asyncio
-from datetime import datetime, timedelta
-from typing import Any
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Optional
 import httpx
-import pandas as pd
 
-try:
-    import yfinance as yf
-    HAS_YFINANCE = True
-except ImportError:
-    HAS_YFINANCE = False
+from ..core.config import settings
+from .circuit_breaker import CLOSED, CircuitBreaker, CircuitOpenError
+from .fetch_executor import FetchExecutor
+from .fred_client import FredClient
+from .http_client import UpstreamError, build_http_client, public_error
+from .indicator_store import ObservationStore
+from .sources import SourceRegistry, build_registry
 
-try:
-    from fredapi import Fred
-    HAS_FRED = True
-except ImportError:
-    HAS_FRED = False
 
-from ..core.config import settings
+_CONFIG_PATH = Path(__file__).parent.parent / "data" / "indicators_config.json"
+
+# update_frequency별 캐시 TTL (초)
+# 원천 데이터 갱신 주기보다 충분히 짧게 잡아 새 관측치를 놓치지 않도록 한다
+UPDATE_FREQUENCY_TTL = {
+    "daily": 60 * 60,           # 1시간
+    "weekly": 6 * 60 * 60,      # 6시간
+    "monthly": 12 * 60 * 60,    # 12시간
+    "quarterly": 24 * 60 * 60,  # 24시간
+    "event": 60 * 60,           # 이벤트성 (금통위 등) - 1시간
+}
+DEFAULT_CACHE_TTL = 60 * 60
+
+
+def _load_indicator_configs() -> list[dict]:
+    """indicators_config.json의 지표 목록 로드"""
+    if not _CONFIG_PATH.exists():
+        return []
+    raw = json.loads(_CONFIG_PATH.read_text())
+    if isinstance(raw, dict):
+        return raw.get("indicators", [])
+    return raw
+
+
+def _build_ttl_map(configs: list[dict]) -> dict[str, float]:
+    """지표 id → TTL(초) 매핑 생성"""
+    return {
+        c["id"]: UPDATE_FREQUENCY_TTL.get(c.get("update_frequency", ""), DEFAULT_CACHE_TTL)
+        for c in configs
+        if "id" in c
+    }
+
+
+class IndicatorCache:
+    """
+    지표 id 기준 TTL + LRU 캐시.
+    모든 사용자가 공유하며, 성공적으로 수집된 관측치만 저장합니다.
+    """
+
+    def __init__(
+        self,
+        ttl_map: dict[str, float],
+        max_entries: int = 256,
+        default_ttl: float = DEFAULT_CACHE_TTL,
+        max_stale: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_map = ttl_map
+        self._default_ttl = default_ttl
+        self._max_stale = max_stale
+        self._max_entries = max_entries
+        self._clock = clock
+        # 지표 id → (저장 시각, 값)
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, indicator_id: str) -> float:
+        return self._ttl_map.get(indicator_id, self._default_ttl)
+
+    def get(self, indicator_id: str) -> Optional[dict[str, Any]]:
+        """유효한 캐시 값 반환 (없거나 TTL이 지나면 None)"""
+        peeked = self.peek(indicator_id)
+        if peeked is None or peeked[1] >= self.ttl_for(indicator_id):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return peeked[0]
+
+    def peek(self, indicator_id: str) -> Optional[tuple[dict[str, Any], float]]:
+        """
+        TTL이 지났더라도 max_stale 이내면 (값, 경과 초) 반환 (stale-while-revalidate용).
+        hit/miss 카운터는 건드리지 않습니다.
+        """
+        entry = self._entries.get(indicator_id)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        age = self._clock() - stored_at
+        if age >= self.ttl_for(indicator_id) + self._max_stale:
+            del self._entries[indicator_id]
+            return None
+        self._entries.move_to_end(indicator_id)
+        return dict(value), age
+
+    def set(self, indicator_id: str, value: dict[str, Any]) -> None:
+        self._entries[indicator_id] = (self._clock(), dict(value))
+        self._entries.move_to_end(indicator_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, indicator_id: Optional[str] = None) -> None:
+        """특정 지표 또는 전체 캐시 무효화"""
+        if indicator_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(indicator_id, None)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class IndicatorSnapshot:
+    """
+    배치 실행 시점에 한 번 수집한 지표 데이터의 불변 스냅샷.
+    사용자별로는 view()로 필요한 지표만 잘라 사본을 전달합니다.
+    """
+
+    def __init__(self, data: dict[str, Any]):
+        self._data = MappingProxyType({k: MappingProxyType(dict(v)) for k, v in data.items()})
+        self.fetched_at = datetime.now()
+
+    def __contains__(self, indicator_id: str) -> bool:
+        return indicator_id in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def indicator_ids(self) -> list[str]:
+        return list(self._data)
+
+    @property
+    def report_date(self) -> date:
+        """이 스냅샷으로 만드는 리포트의 기준일 (실행 도중 자정이 지나도 바뀌지 않음)"""
+        return self.fetched_at.date()
+
+    def view(self, indicator_ids: Iterable[str]) -> dict[str, Any]:
+        """요청한 지표만 담은 dict 사본 반환 (스냅샷에 없는 지표는 오류로 표시)"""
+        result = {}
+        for ind_id in indicator_ids:
+            entry = self._data.get(ind_id)
+            if entry is None:
+                result[ind_id] = {"error": "not in snapshot", "value": None}
+            else:
+                result[ind_id] = dict(entry)
+        return result
 
 
 class DataService:
 
     def __init__(self):
-        self.fred = Fred(api_key=settings.FRED_API_KEY) if HAS_FRED and settings.FRED_API_KEY else None
-
-    async def fetch_all_indicators(self, indicator_ids: list[str]) -> dict[str, Any]:
-        """선택된 지표들의 최신 데이터를 병렬로 수집"""
-        tasks = [self._fetch_indicator(ind_id) for ind_id in indicator_ids]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        data = {}
-        for ind_id, result in zip(indicator_ids, results):
+        configs = _load_indicator_configs()
+        self.fred = FredClient(
+            settings.FRED_API_KEY, lambda: self.http, max_concurrency=settings.FRED_MAX_CONCURRENCY
+        ) if settings.FRED_API_KEY else None
+        self.cache = IndicatorCache(
+            _build_ttl_map(configs),
+            max_entries=settings.INDICATOR_CACHE_MAX_ENTRIES,
+            max_stale=settings.INDICATOR_MAX_STALE_SECONDS,
+        )
+        self.store = ObservationStore(settings.INDICATOR_STORE_PATH) if settings.INDICATOR_STORE_PATH else None
+        self._http: Optional[httpx.AsyncClient] = None
+        self.executor = FetchExecutor()
+        # 수집 중인 지표 id → 수집 작업 (같은 지표의 동시 갱신 병합)
+        self._inflight: dict[str, asyncio.Task] = {}
+        # 지표 설정 기준 소스 라우팅 (시작 시 한 번 구성)
+        self.sources: SourceRegistry = build_registry(self, configs)
+        # 소스별 서킷 브레이커 (장애 소스는 cooldown 동안 즉시 실패 → 캐시 값으로 대체)
+        self.breakers: dict[str, CircuitBreaker] = {name: CircuitBreaker(name) for name in self.sources.adapters}
+
+    async def open(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """공용 HTTP 클라이언트 생성 (lifespan 시작 시 호출)"""
+        if self._http is None or self._http.is_closed:
+            self._http = build_http_client(transport)
+
+    async def close(self) -> None:
+        """공용 HTTP 클라이언트와 로컬 저장소 정리 (lifespan 종료 시 호출)"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self.executor.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """공용 HTTP 클라이언트 (lifespan 밖에서 쓰면 지연 생성)"""
+        if self._http is None or self._http.is_closed:
+            self._http = build_http_client()
+        return self._http
+
+    async def fetch_all_indicators(self, indicator_ids: list[str], force: bool = False) -> dict[str, Any]:
+        """선택된 지표들의 최신 데이터를 병렬로 수집 (캐시 우선, force=True면 캐시를 건너뛰고 갱신)"""
+        data: dict[str, Any] = {}
+        missing = []
+        for ind_id in indicator_ids:
+            cached = None if force else self.cache.get(ind_id)
+            if cached is not None:
+                data[ind_id] = cached
+            else:
+                missing.append(ind_id)
+
+        results = await self._fetch_many(missing)
+        for ind_id, result in results.items():
             if isinstance(result, Exception):
-                data[ind_id] = {"error": str(result), "value": None}
+                data[ind_id] = self._stale_fallback(ind_id, result)
             else:
                 data[ind_id] = result
-        return data
-
-    async def _fetch_indicator(self, indicator_id: str) -> dict[str, Any]:
-        """지표별 데이터 수집 디스패처"""
-        FRED_SERIES = {
-            # 금리/통화정책
-            "fed_funds_rate": "DFF",
-            "us_10y_treasury": "DGS10",
-            "us_2y_treasury": "DGS2",
-            "us_yield_spread_10y2y": "T10Y2Y",
-            # 물가
-            "us_cpi": "CPIAUCSL",
-            "us_pce": "PCEPI",
-            "us_ppi": "PPIFES",
-            # 고용
-            "us_unemployment": "UNRATE",
-            "us_nfp": "PAYEMS",
-            # 성장
-            "us_gdp": "GDPC1",
-            # 시장
-            "sp500": "SP500",
-            "nasdaq": "NASDAQCOM",
-            "vix": "VIXCLS",
-            # 환율/원자재
-            "usd_krw": "DEXKOUS",
-            "dxy": "DTWEXBGS",
-            "wti_crude": "DCOILWTICO",
-            "gold": "GOLDAMGBD228NLBM",
-        }
-        YFINANCE_TICKERS = {
-            "sp500": "^GSPC",
-            "nasdaq": "^IXIC",
-            "vix": "^VIX",
-            "dxy": "DX-Y.NYB",
-            "usd_krw": "KRW=X",
-            "wti_crude": "CL=F",
-            "gold": "GC=F",
-            "kospi": "^KS11",
-            "kosdaq": "^KQ11",
-        }
+                if result.get("value") is not None and "error" not in result:
+                    self.cache.set(ind_id, result)
+        return {ind_id: data[ind_id] for ind_id in indicator_ids}
 
-        if indicator_id in FRED_SERIES and self.fred:
-            return await asyncio.to_thread(self._fetch_fred, FRED_SERIES[indicator_id], indicator_id)
-        elif indicator_id in YFINANCE_TICKERS and HAS_YFINANCE:
-            return await asyncio.to_thread(self._fetch_yfinance, YFINANCE_TICKERS[indicator_id], indicator_id)
-        else:
-            return await self._fetch_public_api(indicator_id)
-
-    def _fetch_fred(self, series_id: str, indicator_id: str) -> dict[str, Any]:
-        """FRED API에서 시계열 데이터 수집"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365)
-        series = self.fred.get_series(series_id, start_date, end_date)
-        latest = series.dropna().iloc[-1]
-        prev = series.dropna().iloc[-2] if len(series.dropna()) > 1 else None
-        return {
-            "indicator_id": indicator_id,
-            "value": float(latest),
-            "prev_value": float(prev) if prev is not None else None,
-            "change": float(latest - prev) if prev is not None else None,
-            "change_pct": float((latest - prev) / prev * 100) if prev is not None else None,
-            "date": series.dropna().index[-1].strftime("%Y-%m-%d"),
-            "history": [
-                {"date": d.strftime("%Y-%m-%d"), "value": float(v)}
-                for d, v in series.dropna().tail(12).items()
-            ],
-            "source": "FRED",
-        }
+    def _stale_fallback(self, indicator_id: str, error: Exception) -> dict[str, Any]:
+        """
+        수집 실패 시 max_stale 이내의 마지막 캐시 값을 stale 표시와 함께 반환 (없으면 오류 결과).
+        결과는 공개 API와 리포트 raw_data로 나가므로 오류는 public_error로 정제합니다.
+        """
+        peeked = self.cache.peek(indicator_id)
+        if peeked is None:
+            return {"error": public_error(error), "value": None}
+        value, _ = peeked
+        value["stale"] = True
+        value["stale_reason"] = public_error(error)
+        return value
 
-    def _fetch_yfinance(self, ticker: str, indicator_id: str) -> dict[str, Any]:
-        """Yahoo Finance에서 시세 데이터 수집"""
-        t = yf.Ticker(ticker)
-        hist = t.history(period="1y")
-        if hist.empty:
-            raise ValueError(f"No data for {ticker}")
-        latest = hist["Close"].iloc[-1]
-        prev = hist["Close"].iloc[-2] if len(hist) > 1 else None
-        return {
-            "indicator_id": indicator_id,
-            "value": round(float(latest), 2),
-            "prev_value": round(float(prev), 2) if prev is not None else None,
-            "change": round(float(latest - prev), 2) if prev is not None else None,
-            "change_pct": round(float((latest - prev) / prev * 100), 2) if prev is not None else None,
-            "date": hist.index[-1].strftime("%Y-%m-%d"),
-            "history": [
-                {"date": d.strftime("%Y-%m-%d"), "value": round(float(v), 2)}
-                for d, v in hist["Close"].tail(60).items()
-            ],
-            "source": "Yahoo Finance",
-        }
+    def source_health(self) -> dict[str, Any]:
+        """소스별 서킷 브레이커 상태 (하나라도 open이면 degraded)"""
+        sources = {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+        degraded = any(s["state"] != CLOSED for s in sources.values())
+        return {"status": "degraded" if degraded else "ok", "sources": sources}
 
-    async def _fetch_public_api(self, indicator_id: str) -> dict[str, Any]:
-        """공개 API (World Bank 등) 에서 데이터 수집"""
-        WB_INDICATORS = {
-            "kr_gdp": ("KOR", "NY.GDP.MKTP.CD"),
-            "kr_cpi": ("KOR", "FP.CPI.TOTL.ZG"),
-            "kr_unemployment": ("KOR", "SL.UEM.TOTL.ZS"),
+    async def fetch_live(self, indicator_ids: list[str]) -> dict[str, Any]:
+        """
+        stale-while-revalidate 조회 (대시보드 실시간 API용).
+        캐시 값은 TTL이 지났어도 max_stale 이내면 즉시 반환하고 백그라운드에서 갱신합니다.
+        캐시에 없는 지표만 수집을 기다리며, 각 결과에 freshness 메타데이터를 붙입니다.
+        """
+        data: dict[str, Any] = {}
+        ages: dict[str, float] = {}
+        missing, stale_ids = [], []
+        for ind_id in indicator_ids:
+            peeked = self.cache.peek(ind_id)
+            if peeked is None:
+                missing.append(ind_id)
+                continue
+            data[ind_id], ages[ind_id] = peeked
+            if ages[ind_id] >= self.cache.ttl_for(ind_id):
+                stale_ids.append(ind_id)
+
+        # 오래된 지표는 한 번의 수집 작업으로 묶어 갱신 (소스별 배치 수집 활용)
+        if stale_ids:
+            self._refresh(stale_ids)
+        for ind_id, age in ages.items():
+            data[ind_id]["freshness"] = {
+                "age_seconds": round(age, 3),
+                "stale": ind_id in stale_ids,
+                "revalidating": ind_id in self._inflight,
+            }
+
+        if missing:
+            tasks = self._refresh(missing)
+            for ind_id in missing:
+                fetched = await asyncio.shield(tasks[ind_id])
+                value = dict(fetched.get(ind_id) or {"error": "데이터를 가져올 수 없습니다", "value": None})
+                value["freshness"] = {"age_seconds": 0.0, "stale": False, "revalidating": False}
+                data[ind_id] = value
+        return {ind_id: data[ind_id] for ind_id in indicator_ids}
+
+    def _refresh(self, indicator_ids: list[str]) -> dict[str, asyncio.Task]:
+        """지표 수집 작업 시작 (이미 수집 중인 지표는 기존 작업 재사용)"""
+        new_ids = [ind_id for ind_id in dict.fromkeys(indicator_ids) if ind_id not in self._inflight]
+        if new_ids:
+            task = asyncio.ensure_future(self.fetch_all_indicators(new_ids))
+            for ind_id in new_ids:
+                self._inflight[ind_id] = task
+
+            def _done(t: asyncio.Task, ids: list[str] = new_ids) -> None:
+                for ind_id in ids:
+                    if self._inflight.get(ind_id) is t:
+                        del self._inflight[ind_id]
+                if not t.cancelled() and t.exception() is not None:
+                    print(f"[DATA] Refresh failed for {ids}: {t.exception()}")
+
+            task.add_done_callback(_done)
+        return {ind_id: self._inflight[ind_id] for ind_id in indicator_ids if ind_id in self._inflight}
+
+    async def fetch_snapshot(self, indicator_ids: Iterable[str]) -> IndicatorSnapshot:
+        """중복을 제거한 지표 목록을 한 번만 수집하여 불변 스냅샷으로 반환"""
+        unique_ids = list(dict.fromkeys(indicator_ids))
+        data = await self.fetch_all_indicators(unique_ids)
+        return IndicatorSnapshot(data)
+
+    async def _fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        """
+        여러 지표를 한 번에 수집 (결과 또는 예외를 지표 id별로 반환).
+        요청 지표를 소스 어댑터별로 묶어 소스마다 fetch_many를 한 번씩 동시에 호출합니다.
+        """
+        groups, unsupported = self.sources.group(indicator_ids)
+        gathered = await asyncio.gather(
+            *(self._fetch_source(name, ids) for name, ids in groups.items()),
+            return_exceptions=True,
+        )
+
+        results: dict[str, Any] = {
+            ind_id: {"indicator_id": ind_id, "value": None, "error": "unsupported indicator", "source": "unknown"}
+            for ind_id in unsupported
         }
-        if indicator_id in WB_INDICATORS:
-            country, wb_id = WB_INDICATORS[indicator_id]
-            url = f"https://api.worldbank.org/v2/country/{country}/indicator/{wb_id}?format=json&mrv=5"
-            async with httpx.AsyncClient(timeout=10) as client:
-                resp = await client.get(url)
-                resp.raise_for_status()
-                data = resp.json()
-                entries = [e for e in data[1] if e["value"] is not None]
-                if not entries:
-                    raise ValueError(f"No World Bank data for {indicator_id}")
-                latest = entries[0]
-                return {
-                    "indicator_id": indicator_id,
-                    "value": float(latest["value"]),
-                    "date": latest["date"],
-                    "source": "World Bank",
-                    "history": [
-                        {"date": e["date"], "value": float(e["value"])}
-                        for e in entries[:5]
-                    ],
-                }
-        return {"indicator_id": indicator_id, "value": None, "error": "unsupported indicator", "source": "unknown"}
+        for ids, batch in zip(groups.values(), gathered):
+            for ind_id in ids:
+                results[ind_id] = batch if isinstance(batch, Exception) else batch[ind_id]
+        return {ind_id: results[ind_id] for ind_id in indicator_ids}
+
+    async def _fetch_source(self, name: str, indicator_ids: list[str]) -> dict[str, Any]:
+        """
+        소스 하나의 일괄 수집을 서킷 브레이커로 감쌈.
+        차단 중이면 요청 없이 CircuitOpenError를, 제한 시간을 넘기면 시간 초과 UpstreamError를 지표별로 반환합니다.
+        소스 전체 예외 또는 요청 지표가 모두 실패한 경우를 소스 실패로 집계합니다.
+        """
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(name)
+        if not breaker.allow():
+            error = CircuitOpenError(name, breaker.retry_after())
+            return {ind_id: error for ind_id in indicator_ids}
+
+        try:
+            batch = await asyncio.wait_for(
+                self.sources[name].fetch_many(indicator_ids), timeout=settings.SOURCE_FETCH_TIMEOUT_SECONDS
+            )
+        except asyncio.CancelledError:
+            breaker.abort()
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = UpstreamError(name, reason=f"timed out after {settings.SOURCE_FETCH_TIMEOUT_SECONDS:.0f}s")
+            breaker.record_failure(e)
+            return {ind_id: e for ind_id in indicator_ids}
+
+        errors = [result for result in batch.values() if isinstance(result, Exception)]
+        if errors and len(errors) == len(batch):
+            breaker.record_failure(errors[0])
+        else:
+            breaker.record_success()
+        return batch
 
 
 data_service = DataService()
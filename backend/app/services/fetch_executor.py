@@ -0,0 +1,122 @@
+"""
+블로킹 지표 수집 전용 스레드 풀
+yfinance와 로컬 관측치 저장소(sqlite3)는 동기 API라 스레드에서 실행해야 합니다.
+기본 이벤트 루프 executor를 공유하지 않도록 전용 풀을 두고, 소스별 동시 실행 수를 제한합니다.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from ..core.config import settings
+from .concurrency import LoopSemaphores
+
+
+class _SourceMetrics:
+    """소스별 대기열 깊이/대기 시간 집계"""
+
+    def __init__(self):
+        self.queued = 0       # 동시 실행 제한 또는 스레드 대기 중
+        self.running = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        # 대기 시간 평균은 실행이 시작된 작업 기준
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_seconds": round(self.total_wait / self.started, 4) if self.started else 0.0,
+            "max_wait_seconds": round(self.max_wait, 4),
+        }
+
+
+class FetchExecutor:
+    """
+    크기 제한 스레드 풀 + 소스별 동시 실행 제한.
+    대기 시간은 제출 시점부터 작업 스레드에서 실제 실행이 시작될 때까지입니다.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        source_limits: Optional[dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_workers = max_workers or settings.FETCH_EXECUTOR_WORKERS
+        self.source_limits = source_limits if source_limits is not None else {
+            "yfinance": settings.YFINANCE_MAX_CONCURRENCY,
+        }
+        self._clock = clock
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._semaphores = LoopSemaphores()
+        self._metrics: dict[str, _SourceMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mesa-fetch")
+        return self._pool
+
+    async def run(self, source: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """fn(*args)를 전용 풀에서 실행 (source별 동시 실행 수 제한)"""
+        metrics = self._metrics.setdefault(source, _SourceMetrics())
+        submitted = self._clock()
+        started = False
+
+        def _call() -> Any:
+            nonlocal started
+            wait = self._clock() - submitted
+            with self._lock:
+                started = True
+                metrics.queued -= 1
+                metrics.running += 1
+                metrics.started += 1
+                metrics.total_wait += wait
+                metrics.max_wait = max(metrics.max_wait, wait)
+            return fn(*args)
+
+        with self._lock:
+            metrics.queued += 1
+        semaphore = self._semaphores.get(source, self.source_limits.get(source))
+        try:
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._get_pool(), _call)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+        except BaseException:
+            with self._lock:
+                metrics.failed += 1
+            raise
+        else:
+            with self._lock:
+                metrics.completed += 1
+            return result
+        finally:
+            with self._lock:
+                if started:
+                    metrics.running -= 1
+                else:
+                    metrics.queued -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """풀 크기/소스별 지표"""
+        return {
+            "max_workers": self.max_workers,
+            "source_limits": dict(self.source_limits),
+            "sources": {source: m.as_dict() for source, m in self._metrics.items()},
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
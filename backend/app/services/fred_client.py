@@ -0,0 +1,56 @@
+"""
+FRED 비동기 클라이언트
+공용 httpx 클라이언트로 JSON 관측치를 받아 필요한 구간만 전송받습니다. (fredapi/pandas 미사용)
+https://fred.stlouisfed.org/docs/api/fred/series_observations.html
+"""
+from typing import Callable, Optional
+
+import httpx
+
+from .concurrency import LoopSemaphores
+from .http_client import get_json
+
+FRED_API_BASE = "https://api.stlouisfed.org/fred"
+_MISSING = "."  # FRED는 결측 관측치를 "."로 표기
+
+
+class FredClient:
+    """series/observations 조회 (sort_order=desc + limit으로 최근 관측치만 요청)"""
+
+    def __init__(
+        self,
+        api_key: str,
+        http: Callable[[], httpx.AsyncClient],
+        max_concurrency: Optional[int] = None,
+    ):
+        self.api_key = api_key
+        self._http = http
+        self._max_concurrency = max_concurrency
+        self._semaphores = LoopSemaphores()
+
+    async def observations(
+        self, series_id: str, observation_start: str, limit: int
+    ) -> list[tuple[str, float]]:
+        """observation_start(YYYY-MM-DD) 이후 최근 limit개 관측치를 날짜 오름차순으로 반환"""
+        params = {
+            "series_id": series_id,
+            "api_key": self.api_key,
+            "file_type": "json",
+            "observation_start": observation_start,
+            "sort_order": "desc",
+            "limit": limit,
+        }
+        semaphore = self._semaphores.get("fred", self._max_concurrency)
+        if semaphore is None:
+            data = await get_json(self._http(), f"{FRED_API_BASE}/series/observations", params=params, source="FRED")
+        else:
+            async with semaphore:
+                data = await get_json(self._http(), f"{FRED_API_BASE}/series/observations", params=params, source="FRED")
+
+        observations = [
+            (o["date"], float(o["value"]))
+            for o in data.get("observations", [])
+            if o.get("value") not in (None, "", _MISSING)
+        ]
+        observations.reverse()
+        return observations
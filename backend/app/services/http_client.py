@@ -0,0 +1,124 @@
+"""
+공개 API 호출용 공용 HTTP 클라이언트
+프로세스 수명 동안 하나의 httpx.AsyncClient를 재사용해 같은 호스트로의 연결(DNS/TCP/TLS)을 유지합니다.
+"""
+import asyncio
+from typing import Any, Optional, Sequence
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+from ..core.config import settings
+
+# 재시도 대상 응답 코드 (일시적 서버 오류/요청 제한)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """
+    원천 API 호출 실패.
+    API 키가 쿼리/경로에 담긴 요청 URL을 그대로 남기지 않도록 소스 이름, 상태 코드,
+    쿼리 문자열을 뺀(키는 가린) URL만 보관하므로 메시지를 응답/로그에 그대로 써도 안전합니다.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        status_code: Optional[int] = None,
+        url: str = "",
+        reason: str = "",
+    ):
+        self.source = source
+        self.status_code = status_code
+        self.url = url
+        self.reason = reason
+        parts = [source]
+        if status_code is not None:
+            parts.append(f"HTTP {status_code}")
+        if reason:
+            parts.append(reason)
+        if url:
+            parts.append(f"({url})")
+        super().__init__(" ".join(parts))
+
+
+class UpstreamDataError(UpstreamError, ValueError):
+    """원천 응답은 받았지만 쓸 수 있는 데이터가 없거나 오류 응답인 경우"""
+
+
+def redact_url(url: Any, secrets: Sequence[str] = ()) -> str:
+    """쿼리 문자열을 제거하고 경로에 들어간 비밀값(API 키)을 가린 URL"""
+    text = str(url).split("?", 1)[0].split("#", 1)[0]
+    for secret in secrets:
+        if secret:
+            text = text.replace(secret, "***")
+    return text
+
+
+def public_error(error: BaseException) -> str:
+    """
+    공개 API 응답/헬스 체크에 담을 오류 설명.
+    원천 호출 오류(UpstreamError)는 정제된 메시지를, 그 외 예외는 내부 정보가 섞일 수 있어 예외 클래스 이름만 반환합니다.
+    """
+    if isinstance(error, UpstreamError):
+        return str(error)
+    return type(error).__name__
+
+
+def build_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    max_connections: Optional[int] = None,
+) -> httpx.AsyncClient:
+    """연결 풀/keep-alive/HTTP2 설정이 적용된 AsyncClient 생성"""
+    limits = httpx.Limits(
+        max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    return httpx.AsyncClient(
+        http2=HAS_HTTP2,
+        limits=limits,
+        timeout=settings.HTTP_TIMEOUT_SECONDS,
+        transport=transport,
+        headers={"User-Agent": "MESA/2.0"},
+    )
+
+
+async def get_json(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Optional[dict[str, Any]] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    source: Optional[str] = None,
+    redact: Sequence[str] = (),
+) -> Any:
+    """
+    GET 후 JSON 반환. 연결 오류/타임아웃과 RETRYABLE_STATUS 응답은
+    지수 백오프(backoff * 2^n)로 최대 retries회 재시도합니다.
+    최종 실패는 UpstreamError로 올리고, 로그/오류에는 쿼리를 빼고 redact 값을 가린 URL만 남깁니다.
+    """
+    retries = settings.HTTP_RETRIES if retries is None else retries
+    backoff = settings.HTTP_RETRY_BACKOFF_SECONDS if backoff is None else backoff
+    # 경로에 키가 들어가는 API(ECOS)도 있어 요청 URL이 아닌 호출 템플릿에서 가린 URL을 만든다
+    display_url = redact_url(url, redact)
+    source = source or httpx.URL(display_url).host
+
+    for attempt in range(retries + 1):
+        try:
+            resp = await client.get(url, params=params)
+            if resp.status_code not in RETRYABLE_STATUS or attempt == retries:
+                if resp.is_error:
+                    raise UpstreamError(source, resp.status_code, display_url)
+                return resp.json()
+            print(f"[HTTP] {resp.status_code} from {display_url}, retry {attempt + 1}/{retries}")
+        except httpx.TransportError as e:
+            if attempt == retries:
+                raise UpstreamError(source, url=display_url, reason=type(e).__name__) from None
+            print(f"[HTTP] {type(e).__name__} for {display_url}, retry {attempt + 1}/{retries}")
+        await asyncio.sleep(backoff * (2 ** attempt))
@@ -0,0 +1,75 @@
+"""
+경제 지표 시계열 로컬 저장소
+원천 API에서 받은 관측치를 SQLite 파일에 (series, date, value)로 누적 저장합니다.
+갱신 시 마지막 저장 날짜 이후만 받아오고, history는 디스크에서 제공합니다.
+"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    series TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    value  REAL NOT NULL,
+    PRIMARY KEY (series, date)
+) WITHOUT ROWID
+"""
+
+
+class ObservationStore:
+    """
+    시계열 관측치 저장소 (stdlib sqlite3).
+    모든 소스가 수집 전용 스레드 풀(FetchExecutor)에서 호출하므로 동기 API와 내부 락으로 스레드 안전성을 보장합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def last_date(self, series: str) -> Optional[str]:
+        """저장된 마지막 관측 날짜 (YYYY-MM-DD), 없으면 None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(date) FROM observations WHERE series = ?", (series,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, series: str, observations: Iterable[tuple[str, float]]) -> None:
+        """관측치 저장 (같은 날짜는 최신 값으로 덮어씀)"""
+        rows = [(series, d, v) for d, v in observations]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO observations (series, date, value) VALUES (?, ?, ?)", rows
+            )
+            conn.commit()
+
+    def history(self, series: str, limit: int) -> list[tuple[str, float]]:
+        """최근 limit개 관측치를 날짜 오름차순으로 반환"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT date, value FROM observations WHERE series = ? ORDER BY date DESC LIMIT ?",
+                (series, limit),
+            ).fetchall()
+        return list(reversed(rows))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
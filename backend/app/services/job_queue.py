@@ -0,0 +1,257 @@
+"""
+온디맨드 리포트 생성 작업 큐
+HTTP 요청은 작업만 등록하고, 워커 풀이 데이터 수집 → AI 분석 → 저장 → 푸시를 처리합니다.
+"""
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from ..core.config import settings
+from ..models.report_job import ReportJob, ReportJobStatus
+from ..models.user import User
+from . import report_service
+
+_ACTIVE_STATUSES = (ReportJobStatus.QUEUED, ReportJobStatus.RUNNING)
+_FINISHED_RETENTION = timedelta(hours=1)
+
+# 실패한 작업에 기록하는 사용자 노출용 메시지 (예외 원문은 로그에만 남김)
+JOB_FAILED_MESSAGE = "리포트 생성 중 오류가 발생했습니다"
+
+
+class JobStore(ABC):
+    """작업 상태 저장소 인터페이스"""
+
+    @abstractmethod
+    async def create(self, user_id: int) -> ReportJob:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[ReportJob]:
+        ...
+
+    @abstractmethod
+    async def save(self, job: ReportJob) -> None:
+        ...
+
+    @abstractmethod
+    async def find_active(self, user_id: int) -> Optional[ReportJob]:
+        """해당 사용자의 대기/실행 중 작업 (중복 등록 방지용)"""
+
+    async def pending(self) -> list[ReportJob]:
+        """재시작 시 다시 처리해야 할 작업 목록 (영속 저장소만 재정의)"""
+        return []
+
+
+def _new_job(user_id: int) -> ReportJob:
+    now = datetime.utcnow()
+    return ReportJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        status=ReportJobStatus.QUEUED,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class InMemoryJobStore(JobStore):
+    """프로세스 메모리 저장소 (기본값). 완료된 작업은 일정 시간 후 정리합니다."""
+
+    def __init__(self):
+        self._jobs: dict[str, ReportJob] = {}
+
+    async def create(self, user_id: int) -> ReportJob:
+        self._prune()
+        job = _new_job(user_id)
+        self._jobs[job.id] = job
+        return job
+
+    async def get(self, job_id: str) -> Optional[ReportJob]:
+        return self._jobs.get(job_id)
+
+    async def save(self, job: ReportJob) -> None:
+        job.updated_at = datetime.utcnow()
+        self._jobs[job.id] = job
+
+    async def find_active(self, user_id: int) -> Optional[ReportJob]:
+        for job in self._jobs.values():
+            if job.user_id == user_id and job.status in _ACTIVE_STATUSES:
+                return job
+        return None
+
+    def _prune(self) -> None:
+        cutoff = datetime.utcnow() - _FINISHED_RETENTION
+        for job_id in [
+            j.id for j in self._jobs.values()
+            if j.status not in _ACTIVE_STATUSES and j.updated_at < cutoff
+        ]:
+            del self._jobs[job_id]
+
+
+class SQLJobStore(JobStore):
+    """report_jobs 테이블 저장소. 프로세스 재시작 후에도 대기 작업을 복구할 수 있습니다."""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self._session_factory = session_factory
+
+    async def create(self, user_id: int) -> ReportJob:
+        job = _new_job(user_id)
+        async with self._session_factory() as db:
+            db.add(job)
+            await db.commit()
+        return job
+
+    async def get(self, job_id: str) -> Optional[ReportJob]:
+        async with self._session_factory() as db:
+            return await db.get(ReportJob, job_id)
+
+    async def save(self, job: ReportJob) -> None:
+        job.updated_at = datetime.utcnow()
+        async with self._session_factory() as db:
+            await db.merge(job)
+            await db.commit()
+
+    async def find_active(self, user_id: int) -> Optional[ReportJob]:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(ReportJob)
+                .where(ReportJob.user_id == user_id, ReportJob.status.in_(_ACTIVE_STATUSES))
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def pending(self) -> list[ReportJob]:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(ReportJob)
+                .where(ReportJob.status.in_(_ACTIVE_STATUSES))
+                .order_by(ReportJob.created_at)
+            )
+            return list(result.scalars().all())
+
+
+class ReportJobQueue:
+    """
+    asyncio.Queue 기반 작업 큐 + 워커 풀.
+    같은 사용자의 대기/실행 중 작업이 있으면 새로 등록하지 않고 기존 작업을 반환합니다.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        workers: Optional[int] = None,
+    ):
+        self.store = store or InMemoryJobStore()
+        self.session_factory = session_factory
+        self.workers = workers or settings.REPORT_JOB_WORKERS
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._enqueue_lock = asyncio.Lock()
+
+    def configure(
+        self,
+        store: Optional[JobStore] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        """저장소/세션 팩토리/워커 수 교체 (워커 시작 전에 호출)"""
+        if store is not None:
+            self.store = store
+        if session_factory is not None:
+            self.session_factory = session_factory
+        if workers is not None:
+            self.workers = workers
+
+    async def start(self) -> None:
+        """워커 풀 시작. 저장소에 남아 있던 대기 작업은 다시 큐에 넣습니다."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._enqueue_lock = asyncio.Lock()
+        for job in await self.store.pending():
+            if job.status == ReportJobStatus.RUNNING:
+                job.status = ReportJobStatus.QUEUED
+                await self.store.save(job)
+            self._queue.put_nowait(job.id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self) -> None:
+        """현재 큐에 있는 작업이 모두 끝날 때까지 대기"""
+        await self._queue.join()
+
+    async def enqueue(self, user_id: int) -> ReportJob:
+        if not self._tasks:
+            await self.start()
+        async with self._enqueue_lock:
+            existing = await self.store.find_active(user_id)
+            if existing is not None:
+                return existing
+            job = await self.store.create(user_id)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[ReportJob]:
+        return await self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 저장소 오류 등으로 작업 하나가 실패해도 워커는 계속 다음 작업을 처리
+                print(f"[JOB] Worker error while running job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.store.get(job_id)
+        if job is None or job.status not in _ACTIVE_STATUSES:
+            return
+        job.status = ReportJobStatus.RUNNING
+        await self.store.save(job)
+
+        try:
+            async with self._get_session_factory()() as db:
+                user = await db.get(User, job.user_id)
+                if user is None:
+                    raise ValueError(f"user {job.user_id} not found")
+                report = await report_service.generate_user_report(user, db)
+            job.status = ReportJobStatus.SUCCEEDED
+            job.report_id = report.id
+        except Exception as e:
+            print(f"[JOB] Report job {job_id} failed for user {job.user_id}: {e}")
+            job.status = ReportJobStatus.FAILED
+            # 상세 원인은 로그에만 남기고 API로는 일반 메시지만 노출
+            job.error = JOB_FAILED_MESSAGE
+        await self.store.save(job)
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        if self.session_factory is None:
+            from ..core.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+        return self.session_factory
+
+
+def build_job_store() -> JobStore:
+    """REPORT_JOB_BACKEND 설정에 맞는 저장소 생성 ("memory" | "sql")"""
+    if settings.REPORT_JOB_BACKEND == "sql":
+        from ..core.database import AsyncSessionLocal
+        return SQLJobStore(AsyncSessionLocal)
+    return InMemoryJobStore()
+
+
+report_job_queue = ReportJobQueue()
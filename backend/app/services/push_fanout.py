@@ -0,0 +1,321 @@
+"""
+Web Push 일괄 전송 (fan-out)
+여러 구독으로 보낼 알림을 모아 공용 비동기 HTTP 클라이언트로 동시에 전송합니다.
+pywebpush의 동기 webpush() 대신 페이로드 암호화(aes128gcm)만 메시지마다 수행하고,
+VAPID JWT는 푸시 서비스 origin별로 캐시하며, 전송은 httpx로 하고 동시 전송 수는 세마포어로 제한합니다.
+메시지는 푸시 서비스 origin별로 묶어 보내므로 origin마다 적은 수의 연결(HTTP/2면 하나)을 재사용합니다.
+"""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
+
+try:
+    from pywebpush import WebPusher, WebPushException
+    from py_vapid import Vapid
+    HAS_WEBPUSH = True
+except ImportError:
+    HAS_WEBPUSH = False
+
+from ..core.config import settings
+from ..models.push_subscription import endpoint_origin
+from .http_client import build_http_client
+
+CONTENT_ENCODING = "aes128gcm"
+VAPID_EXPIRY_SECONDS = 12 * 60 * 60  # 푸시 서비스 허용 최대 24시간보다 짧게
+VAPID_REFRESH_MARGIN_SECONDS = 60 * 60  # 만료 1시간 전부터는 새로 서명
+# 구독이 만료/해지된 경우 푸시 서비스 응답
+GONE_STATUS = {404, 410}
+
+
+def build_payload(title: str, body: str, url: str = "/") -> dict[str, Any]:
+    """서비스 워커가 표시할 알림 페이로드"""
+    return {
+        "title": title,
+        "body": body,
+        "url": url,
+        "icon": "/icons/icon-192x192.png",
+    }
+
+
+class PushMessage:
+    """전송할 알림 하나 (구독 + 페이로드)"""
+
+    def __init__(
+        self,
+        subscription: dict[str, Any],
+        payload: dict[str, Any],
+        user_id: Optional[int] = None,
+        ttl: Optional[int] = None,
+        urgency: Optional[str] = None,
+    ):
+        self.subscription = subscription
+        self.payload = payload
+        self.user_id = user_id
+        self.ttl = settings.PUSH_TTL_SECONDS if ttl is None else ttl
+        self.urgency = urgency or settings.PUSH_URGENCY
+
+    @property
+    def endpoint(self) -> str:
+        return self.subscription.get("endpoint", "")
+
+    @property
+    def origin(self) -> str:
+        return endpoint_origin(self.endpoint)
+
+
+def group_by_origin(messages: Iterable[PushMessage]) -> dict[str, list[tuple[int, PushMessage]]]:
+    """메시지를 푸시 서비스 origin별로 묶음 (원래 순서 index 포함)"""
+    groups: dict[str, list[tuple[int, PushMessage]]] = {}
+    for index, message in enumerate(messages):
+        groups.setdefault(message.origin, []).append((index, message))
+    return groups
+
+
+class PushOutcome:
+    """구독(endpoint)별 전송 결과"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        user_id: Optional[int] = None,
+        status_code: Optional[int] = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+    ):
+        self.endpoint = endpoint
+        self.user_id = user_id
+        self.status_code = status_code
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+    @property
+    def gone(self) -> bool:
+        """구독이 더 이상 유효하지 않음 (404/410)"""
+        return self.status_code in GONE_STATUS
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "endpoint": self.endpoint,
+            "user_id": self.user_id,
+            "status_code": self.status_code,
+            "ok": self.ok,
+            "error": self.error,
+            "elapsed": round(self.elapsed, 4),
+        }
+
+
+class FanoutResult:
+    """일괄 전송 결과 요약"""
+
+    def __init__(self, outcomes: Optional[list[PushOutcome]] = None, elapsed: float = 0.0):
+        self.outcomes = outcomes or []
+        self.elapsed = elapsed
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for o in self.outcomes if o.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.outcomes) - self.sent
+
+    def summary(self) -> dict[str, Any]:
+        by_status: dict[str, int] = {}
+        by_origin: dict[str, int] = {}
+        for o in self.outcomes:
+            key = str(o.status_code) if o.status_code is not None else "error"
+            by_status[key] = by_status.get(key, 0) + 1
+            origin = endpoint_origin(o.endpoint)
+            by_origin[origin] = by_origin.get(origin, 0) + 1
+        return {
+            "total": len(self.outcomes),
+            "sent": self.sent,
+            "failed": self.failed,
+            "elapsed": round(self.elapsed, 3),
+            "by_status": by_status,
+            "by_origin": by_origin,
+        }
+
+
+class VapidSigner:
+    """
+    VAPID 키를 한 번만 로드하고, 푸시 서비스 origin(aud)별 서명 헤더를 만료 직전까지 재사용.
+    구독 수천 개가 FCM/Mozilla/Apple 등 소수 origin을 공유하므로 메시지마다 JWT를 서명할 필요가 없습니다.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        claims_email: str,
+        expiry: int = VAPID_EXPIRY_SECONDS,
+        refresh_margin: int = VAPID_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.private_key = private_key
+        self.claims_email = claims_email
+        self.expiry = expiry
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._vapid = Vapid.from_string(private_key=private_key)
+        self._headers: dict[str, tuple[dict[str, str], float]] = {}  # origin → (헤더, 만료 시각)
+        self._lock = threading.Lock()  # 서명은 작업 스레드에서 호출됨
+        self.signed = 0
+
+    def headers_for(self, endpoint: str) -> dict[str, str]:
+        """endpoint의 origin에 대한 VAPID Authorization 헤더 (캐시된 JWT 재사용)"""
+        origin = endpoint_origin(endpoint)
+        now = self._clock()
+        with self._lock:
+            cached = self._headers.get(origin)
+            if cached is not None and cached[1] - now > self.refresh_margin:
+                return dict(cached[0])
+            expires_at = int(now) + self.expiry
+            headers = self._vapid.sign({
+                "sub": f"mailto:{self.claims_email}",
+                "aud": origin,
+                "exp": expires_at,
+            })
+            self._headers[origin] = (headers, expires_at)
+            self.signed += 1
+            return dict(headers)
+
+
+class PushFanout:
+    """
+    알림 일괄 전송기.
+    암호화/서명은 CPU 작업이라 전용 스레드 풀(PUSH_PREPARE_WORKERS)에서 수행해 이벤트 루프를 막지 않고,
+    기본 executor를 쓰는 다른 작업(DNS 조회 등)과 스레드를 다투지 않도록 합니다.
+    HTTP 전송은 프로세스 수명 동안 재사용하는 AsyncClient 연결 풀로 보냅니다.
+    전체 동시 전송 수(max_concurrency)와 별도로 origin별 동시 전송 수(max_per_origin)를 제한해
+    한 푸시 서비스로 연결이 과도하게 늘지 않고 기존 연결을 이어 쓰도록 합니다.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_per_origin: Optional[int] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.PUSH_MAX_CONCURRENCY
+        self.max_per_origin = max_per_origin or settings.PUSH_MAX_CONCURRENCY_PER_ORIGIN
+        self._transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._signer: Optional[VapidSigner] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = build_http_client(
+                self._transport, max_connections=settings.PUSH_MAX_CONNECTIONS
+            )
+        return self._http
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.PUSH_PREPARE_WORKERS), thread_name_prefix="mesa-push"
+            )
+        return self._pool
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def enabled(self) -> bool:
+        return HAS_WEBPUSH and bool(settings.VAPID_PRIVATE_KEY)
+
+    @property
+    def signer(self) -> VapidSigner:
+        # 키 파싱은 한 번만 (설정이 바뀌면 다시 로드)
+        signer = self._signer
+        if (
+            signer is None
+            or signer.private_key != settings.VAPID_PRIVATE_KEY
+            or signer.claims_email != settings.VAPID_CLAIMS_EMAIL
+        ):
+            signer = self._signer = VapidSigner(settings.VAPID_PRIVATE_KEY, settings.VAPID_CLAIMS_EMAIL)
+        return signer
+
+    def _prepare(self, message: PushMessage, signer: VapidSigner) -> tuple[dict[str, str], bytes]:
+        """페이로드 암호화 + 캐시된 VAPID 헤더 (요청 헤더, 본문)"""
+        if not message.subscription.get("keys"):
+            raise WebPushException("subscription missing keys")
+        data = json.dumps(message.payload).encode("utf-8")
+        encoded = WebPusher(message.subscription).encode(data, CONTENT_ENCODING)
+        headers = {
+            "Content-Encoding": CONTENT_ENCODING,
+            "Content-Type": "application/octet-stream",
+            "TTL": str(message.ttl),
+            "Urgency": message.urgency,
+        }
+        headers.update(signer.headers_for(message.endpoint))
+        return headers, encoded["body"]
+
+    async def _send(
+        self,
+        message: PushMessage,
+        signer: VapidSigner,
+        semaphore: asyncio.Semaphore,
+        origin_limit: asyncio.Semaphore,
+    ) -> PushOutcome:
+        outcome = PushOutcome(message.endpoint, message.user_id)
+        async with origin_limit, semaphore:
+            started = time.perf_counter()
+            try:
+                headers, body = await asyncio.get_running_loop().run_in_executor(
+                    self._get_pool(), self._prepare, message, signer
+                )
+                resp = await self.http.post(
+                    message.endpoint, content=body, headers=headers, timeout=settings.PUSH_TIMEOUT_SECONDS
+                )
+                outcome.status_code = resp.status_code
+                if not outcome.ok:
+                    outcome.error = resp.text[:200] or resp.reason_phrase
+            except Exception as e:
+                outcome.error = f"{type(e).__name__}: {e}"
+            outcome.elapsed = time.perf_counter() - started
+        return outcome
+
+    async def deliver(self, messages: Iterable[PushMessage]) -> FanoutResult:
+        """알림들을 동시에 전송하고 endpoint별 결과를 요청 순서대로 반환"""
+        messages = list(messages)
+        if not messages:
+            return FanoutResult()
+        if not self.enabled():
+            print("[PUSH] Web Push disabled (pywebpush or VAPID key missing), skipping fan-out")
+            return FanoutResult([PushOutcome(m.endpoint, m.user_id, error="push disabled") for m in messages])
+
+        signer = self.signer  # 배치 전체가 같은 서명 캐시를 공유
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        groups = group_by_origin(messages)
+        started = time.perf_counter()
+        outcomes: list[Optional[PushOutcome]] = [None] * len(messages)
+
+        async def _send_origin(items: list[tuple[int, PushMessage]]) -> None:
+            origin_limit = asyncio.Semaphore(max(1, self.max_per_origin))
+            sent = await asyncio.gather(*(self._send(m, signer, semaphore, origin_limit) for _, m in items))
+            for (index, _), outcome in zip(items, sent):
+                outcomes[index] = outcome
+
+        await asyncio.gather(*(_send_origin(items) for items in groups.values()))
+        result = FanoutResult(outcomes, time.perf_counter() - started)
+        if len(messages) > 1 or result.failed:
+            print(f"[PUSH] Fan-out summary: {result.summary()}")
+        return result
+
+
+push_fanout = PushFanout()
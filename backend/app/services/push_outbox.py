@@ -0,0 +1,236 @@
+"""
+푸시 알림 outbox 디스패처
+리포트 저장과 같은 커밋으로 push_outbox에 알림을 기록하고(enqueue_notification),
+백그라운드 디스패처가 대기 알림을 배치로 꺼내 fan-out 전송합니다.
+리포트 생성은 푸시 서비스 지연/장애와 무관하게 끝나고, 프로세스가 죽어도 기록된 알림은 유실되지 않습니다.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..core.config import settings
+from ..models.push_outbox import PushOutbox, PushOutboxStatus
+from .push_fanout import PushMessage, push_fanout
+from .push_service import record_push_outcomes
+
+
+def enqueue_notification(
+    db: AsyncSession,
+    message: PushMessage,
+    report_id: Optional[int] = None,
+) -> PushOutbox:
+    """outbox에 알림 추가 (커밋은 호출자의 트랜잭션에서 함께 수행)"""
+    now = datetime.utcnow()
+    row = PushOutbox(
+        user_id=message.user_id,
+        report_id=report_id,
+        subscription=message.subscription,
+        payload=message.payload,
+        urgency=message.urgency,
+        status=PushOutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=now,
+        expires_at=now + timedelta(seconds=message.ttl),
+    )
+    db.add(row)
+    return row
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    같은 알림의 시도 횟수별 재시도 간격 (지수 백오프).
+    기기별 백오프(push_service.push_backoff)와는 별개로, 이미 기록된 알림은 기기가 백오프 중이어도
+    이 간격으로 최대 max_attempts회까지 재시도합니다.
+    """
+    return timedelta(seconds=settings.PUSH_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1)))
+
+
+class PushDispatcher:
+    """
+    push_outbox 배치 전송기.
+    대기 알림을 최대 batch_size개씩 조건부 UPDATE로 SENDING 선점한 뒤 한 번의 fan-out으로 전송하고,
+    결과에 따라 SENT / 재시도 예약(PENDING) / FAILED로 갱신합니다. TTL이 지난 알림은 EXPIRED 처리합니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        batch_size: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.PUSH_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.PUSH_OUTBOX_POLL_SECONDS if poll_interval is None else poll_interval
+        self.max_attempts = max_attempts or settings.PUSH_OUTBOX_MAX_ATTEMPTS
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def configure(self, session_factory: Optional[async_sessionmaker] = None) -> None:
+        """세션 팩토리 교체 (시작 전에 호출)"""
+        if session_factory is not None:
+            self.session_factory = session_factory
+
+    async def start(self) -> None:
+        """디스패처 시작. 전송 중에 중단된 알림(SENDING)은 다시 대기 상태로 돌립니다."""
+        if self._task is not None:
+            return
+        async with self._get_session_factory()() as db:
+            await db.execute(
+                update(PushOutbox)
+                .where(PushOutbox.status == PushOutboxStatus.SENDING)
+                .values(status=PushOutboxStatus.PENDING)
+            )
+            await db.commit()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self) -> None:
+        """새 알림이 기록되었음을 알려 폴링 간격을 기다리지 않고 전송"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _loop(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                print(f"[PUSH] Outbox drain failed: {e}")
+                processed = 0
+            if processed >= self.batch_size:
+                continue  # 밀린 알림이 더 있으면 바로 다음 배치
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain(self) -> int:
+        """지금 전송 가능한 알림을 모두 처리 (처리 건수 반환)"""
+        total = 0
+        while True:
+            processed = await self.drain_once()
+            total += processed
+            if processed < self.batch_size:
+                return total
+
+    async def drain_once(self) -> int:
+        """대기 알림 한 배치 전송 (처리 건수 반환, 푸시가 비활성화되어 있으면 0)"""
+        if not push_fanout.enabled():
+            return 0
+        now = self._clock()
+        async with self._get_session_factory()() as db:
+            await db.execute(
+                update(PushOutbox)
+                .where(PushOutbox.status == PushOutboxStatus.PENDING, PushOutbox.expires_at <= now)
+                .values(status=PushOutboxStatus.EXPIRED, error="ttl expired")
+            )
+            rows = await self._claim(db, now)
+            if not rows:
+                return 0
+
+            messages = [
+                PushMessage(
+                    row.subscription,
+                    row.payload,
+                    user_id=row.user_id,
+                    ttl=max(0, int((row.expires_at - now).total_seconds())),  # 남은 보관 시간
+                    urgency=row.urgency,
+                )
+                for row in rows
+            ]
+            try:
+                sent = await push_fanout.deliver(messages)
+            except Exception as e:
+                # 선점한 알림이 SENDING으로 남지 않도록 재시도 예약 (start() 전까지 전송/만료 처리가 멈춤)
+                print(f"[PUSH] Outbox delivery failed for {len(rows)} rows: {type(e).__name__}")
+                self._reschedule(rows, f"delivery error: {type(e).__name__}")
+                await db.commit()
+                return len(rows)
+
+            now = self._clock()
+            retried = [row.attempts > 0 for row in rows]
+            for row, outcome in zip(rows, sent.outcomes):
+                row.attempts += 1
+                row.last_status_code = outcome.status_code
+                row.error = outcome.error
+                if outcome.ok:
+                    row.status = PushOutboxStatus.SENT
+                elif outcome.gone or row.attempts >= self.max_attempts:
+                    row.status = PushOutboxStatus.FAILED
+                else:
+                    row.status = PushOutboxStatus.PENDING
+                    row.next_attempt_at = now + retry_delay(row.attempts)
+            await db.commit()
+            # 만료 구독 정리/구독별 백오프 반영 (재시도 실패는 기기 실패 횟수에 다시 더하지 않음)
+            await record_push_outcomes(db, sent.outcomes, retried)
+        return len(rows)
+
+    def _reschedule(self, rows: list[PushOutbox], error: str) -> None:
+        """전송 단계 자체가 실패한 알림: 시도 횟수를 올리고 백오프 후 다시 대기 (한도 초과 시 FAILED)"""
+        now = self._clock()
+        for row in rows:
+            row.attempts += 1
+            row.error = error
+            if row.attempts >= self.max_attempts:
+                row.status = PushOutboxStatus.FAILED
+            else:
+                row.status = PushOutboxStatus.PENDING
+                row.next_attempt_at = now + retry_delay(row.attempts)
+
+    async def _claim(self, db: AsyncSession, now: datetime) -> list[PushOutbox]:
+        """
+        전송할 대기 알림을 SENDING으로 선점하고 반환.
+        후보 id를 고른 뒤 status가 아직 PENDING인 행만 조건부 UPDATE로 바꾸므로,
+        여러 디스패처(프로세스)가 같은 행을 골라도 실제로 상태를 바꾼 쪽만 전송합니다.
+        """
+        result = await db.execute(
+            select(PushOutbox.id)
+            .where(PushOutbox.status == PushOutboxStatus.PENDING, PushOutbox.next_attempt_at <= now)
+            .order_by(PushOutbox.next_attempt_at, PushOutbox.id)
+            .limit(self.batch_size)
+        )
+        candidate_ids = list(result.scalars().all())
+        if not candidate_ids:
+            await db.commit()
+            return []
+        result = await db.execute(
+            update(PushOutbox)
+            .where(PushOutbox.id.in_(candidate_ids), PushOutbox.status == PushOutboxStatus.PENDING)
+            .values(status=PushOutboxStatus.SENDING)
+            .returning(PushOutbox.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed_ids = list(result.scalars().all())
+        await db.commit()
+        if len(claimed_ids) < len(candidate_ids):
+            print(f"[PUSH] Outbox claim: {len(candidate_ids) - len(claimed_ids)} rows already taken by another dispatcher")
+        if not claimed_ids:
+            return []
+        result = await db.execute(
+            select(PushOutbox)
+            .where(PushOutbox.id.in_(claimed_ids))
+            .order_by(PushOutbox.next_attempt_at, PushOutbox.id)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.scalars().all())
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        if self.session_factory is None:
+            from ..core.database import AsyncSessionLocal
+            self.session_factory = AsyncSessionLocal
+        return self.session_factory
+
+
+push_dispatcher = PushDispatcher()
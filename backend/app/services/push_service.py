@@ -1,66 +1,158 @@
 """
 Web Push 알림 서비스
-사용자에게 새 리포트 생성 시 브라우저 푸시 알림을 전송합니다.
+사용자에게 새 리포트 생성 시 등록된 모든 기기(push_subscriptions)로 브라우저 푸시 알림을 전송합니다.
+실제 전송은 push_fanout의 비동기 일괄 전송기가 담당하고,
+전송 결과는 record_push_outcomes로 기기별 구독 상태에 반영합니다.
 """
-import json
-from typing import Any
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
 
-try:
-    from pywebpush import webpush, WebPushException
-    HAS_WEBPUSH = True
-except ImportError:
-    HAS_WEBPUSH = False
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..core.config import settings
+from ..models.push_subscription import PushSubscription, endpoint_origin
+from ..models.user import User
+from .push_fanout import PushMessage, PushOutcome, build_payload
 
 
-async def send_push_notification(
-    subscription: dict[str, Any],
-    title: str,
-    body: str,
-    url: str = "/",
-) -> bool:
-    """
-    단일 사용자에게 Web Push 알림 전송
-    subscription: PushSubscription JSON (endpoint, keys)
-    """
-    if not HAS_WEBPUSH:
-        print("[PUSH] pywebpush not installed, skipping push notification")
-        return False
-    if not settings.VAPID_PRIVATE_KEY:
-        print("[PUSH] VAPID key not configured, skipping push notification")
-        return False
-
-    payload = json.dumps({
-        "title": title,
-        "body": body,
-        "url": url,
-        "icon": "/icons/icon-192x192.png",
-    })
-
-    try:
-        webpush(
-            subscription_info=subscription,
-            data=payload,
-            vapid_private_key=settings.VAPID_PRIVATE_KEY,
-            vapid_claims={"sub": f"mailto:{settings.VAPID_CLAIMS_EMAIL}"},
-        )
-        return True
-    except WebPushException as e:
-        print(f"[PUSH] WebPush error: {e}")
-        return False
-    except Exception as e:
-        print(f"[PUSH] Unexpected error: {e}")
-        return False
-
-
-async def send_report_notification(user, report) -> bool:
-    """리포트 생성 완료 후 해당 사용자에게 알림 전송"""
-    if not user.push_enabled or not user.push_subscription:
-        return False
-    return await send_push_notification(
-        subscription=user.push_subscription,
+def build_report_messages(user, report, subscriptions: Iterable[PushSubscription]) -> list[PushMessage]:
+    """리포트 알림 메시지를 기기(구독)마다 생성 (푸시를 받지 않는 사용자/백오프 중인 기기는 제외)"""
+    if not user.push_enabled:
+        return []
+    now = datetime.utcnow()
+    payload = build_payload(
         title=f"📊 새 경제 리포트 도착",
         body=report.summary.split("\n")[0] if report.summary else "새 리포트를 확인하세요",
         url=f"/reports/{report.id}",
     )
+    return [
+        PushMessage(sub.as_subscription(), payload, user_id=user.id)
+        for sub in subscriptions
+        if sub.retry_after is None or sub.retry_after <= now
+    ]
+
+
+async def load_push_subscriptions(db: AsyncSession, user_id: int) -> list[PushSubscription]:
+    """사용자의 기기별 구독 (푸시 서비스 origin 순)"""
+    result = await db.execute(
+        select(PushSubscription)
+        .where(PushSubscription.user_id == user_id)
+        .order_by(PushSubscription.origin, PushSubscription.id)
+    )
+    return list(result.scalars().all())
+
+
+async def upsert_push_subscription(db: AsyncSession, user: User, subscription: dict[str, Any]) -> PushSubscription:
+    """
+    endpoint 기준으로 구독 등록/갱신 (커밋은 호출자가 수행).
+    같은 기기가 다시 구독하면 키를 갱신하고 실패 이력/백오프를 초기화하며,
+    다른 계정으로 로그인한 기기면 소유자를 옮깁니다.
+    """
+    endpoint = subscription["endpoint"]
+    result = await db.execute(select(PushSubscription).where(PushSubscription.endpoint == endpoint))
+    row = result.scalar_one_or_none()
+    if row is None:
+        row = PushSubscription(endpoint=endpoint, origin=endpoint_origin(endpoint), user_id=user.id)
+        try:
+            async with db.begin_nested():
+                db.add(row)
+        except IntegrityError:
+            # 같은 endpoint 동시 등록: 먼저 저장된 행을 갱신
+            result = await db.execute(select(PushSubscription).where(PushSubscription.endpoint == endpoint))
+            row = result.scalar_one()
+    row.user_id = user.id
+    row.keys = subscription.get("keys")
+    row.failure_count = 0
+    row.retry_after = None
+    return row
+
+
+async def remove_push_subscriptions(db: AsyncSession, user: User, endpoint: Optional[str] = None) -> None:
+    """사용자의 구독 삭제 (endpoint가 없으면 모든 기기, 커밋은 호출자가 수행)"""
+    query = delete(PushSubscription).where(PushSubscription.user_id == user.id)
+    if endpoint is not None:
+        query = query.where(PushSubscription.endpoint == endpoint)
+    await db.execute(query)
+
+
+async def count_push_subscriptions(db: AsyncSession, user_id: int) -> int:
+    """사용자가 등록한 기기 수"""
+    result = await db.execute(
+        select(func.count()).select_from(PushSubscription).where(PushSubscription.user_id == user_id)
+    )
+    return result.scalar_one()
+
+
+def push_backoff(failures: int) -> timedelta:
+    """
+    연속으로 실패한 알림 수별 기기 제외 기간 (지수 백오프, 상한 있음).
+    이 기간 동안 해당 기기는 새 알림 대상에서 빠질 뿐이고, 이미 outbox에 기록된 알림은
+    push_outbox.retry_delay 간격으로 따로 재시도됩니다 (재시도 실패는 실패 횟수에 더하지 않음).
+    """
+    seconds = settings.PUSH_BACKOFF_BASE_SECONDS * (2 ** max(0, failures - 1))
+    return timedelta(seconds=min(seconds, settings.PUSH_BACKOFF_MAX_SECONDS))
+
+
+async def record_push_outcomes(
+    db: AsyncSession,
+    outcomes: Iterable[PushOutcome],
+    retried: Optional[Iterable[bool]] = None,
+) -> dict[str, int]:
+    """
+    전송 결과를 기기별 구독 상태에 반영.
+    - 404/410: 만료된 구독 삭제, 남은 기기가 없으면 push_enabled 해제
+    - 성공: 실패 횟수/백오프 초기화
+    - 그 외 실패: 실패 횟수 증가 + 지수 백오프 동안 해당 기기 제외
+
+    failure_count는 시도 횟수가 아니라 실패한 알림 수입니다. retried는 outcomes와 같은 순서로
+    각 결과가 outbox 재시도(같은 알림의 두 번째 이후 시도)인지를 나타내며, 재시도 실패는
+    이미 첫 실패에서 센 알림이므로 실패 횟수와 백오프를 바꾸지 않습니다.
+    전송 중에 기기가 다시 구독해 endpoint가 바뀌었으면 새 구독에는 영향이 없습니다.
+    """
+    outcomes = list(outcomes)
+    retried = list(retried) if retried is not None else [False] * len(outcomes)
+    outcomes = [(o, is_retry) for o, is_retry in zip(outcomes, retried) if o.endpoint]
+    counts = {"pruned": 0, "backoff": 0, "recovered": 0}
+    if not outcomes:
+        return counts
+
+    result = await db.execute(
+        select(PushSubscription).where(PushSubscription.endpoint.in_({o.endpoint for o, _ in outcomes}))
+    )
+    subscriptions = {sub.endpoint: sub for sub in result.scalars().all()}
+    pruned_users: set[int] = set()
+    now = datetime.utcnow()
+    for outcome, is_retry in outcomes:
+        sub = subscriptions.get(outcome.endpoint)
+        if sub is None:
+            continue
+        if outcome.gone:
+            print(f"[PUSH] Pruning expired subscription for user {sub.user_id} ({outcome.status_code})")
+            await db.delete(sub)
+            del subscriptions[outcome.endpoint]
+            pruned_users.add(sub.user_id)
+            counts["pruned"] += 1
+        elif outcome.ok:
+            if sub.failure_count:
+                counts["recovered"] += 1
+            sub.failure_count = 0
+            sub.retry_after = None
+        elif not is_retry:
+            sub.failure_count = (sub.failure_count or 0) + 1
+            sub.retry_after = now + push_backoff(sub.failure_count)
+            counts["backoff"] += 1
+
+    if pruned_users:
+        await db.flush()
+        result = await db.execute(
+            select(PushSubscription.user_id).where(PushSubscription.user_id.in_(pruned_users)).distinct()
+        )
+        remaining = set(result.scalars().all())
+        if pruned_users - remaining:
+            await db.execute(
+                update(User).where(User.id.in_(pruned_users - remaining)).values(push_enabled=False)
+            )
+    await db.commit()
+    return counts
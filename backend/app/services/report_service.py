@@ -2,17 +2,22 @@
 리포트 생성 오케스트레이션 서비스
 데이터 수집 → AI 분석 → DB 저장 → 푸시 알림 파이프라인을 관리합니다.
 """
+import asyncio
 import json
+import time
 from datetime import date
 from pathlib import Path
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Iterable, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 
+from ..core.config import settings
 from ..models.user import User, ReportLevel, ReportFrequency
 from ..models.report import Report
-from .data_service import data_service
+from .data_service import data_service, IndicatorSnapshot
 from . import ai_service
-from .push_service import send_report_notification
+from .push_outbox import enqueue_notification, push_dispatcher
+from .push_service import build_report_messages, load_push_subscriptions
 
 
 # 기본 지표 설정 로드
@@ -39,21 +44,136 @@ DEFAULT_INDICATORS = [
 ]
 
 
-async def generate_user_report(user: User, db: AsyncSession) -> Report:
+def _user_indicator_ids(user: User) -> list[str]:
+    return user.selected_indicators or DEFAULT_INDICATORS
+
+
+async def build_indicator_snapshot(users: Iterable[User]) -> IndicatorSnapshot:
+    """
+    배치 대상 사용자들의 선택 지표 합집합(+ 기본 지표)을 한 번만 수집.
+    N명 × K개 지표 호출이 K개로 줄고, 같은 실행의 모든 리포트가 동일한 데이터를 봅니다.
+    """
+    ids: list[str] = list(DEFAULT_INDICATORS)
+    for user in users:
+        ids.extend(_user_indicator_ids(user))
+    return await data_service.fetch_snapshot(ids)
+
+
+async def prewarm_indicators(db: AsyncSession) -> int:
+    """
+    리포트 스케줄 전에 활성 사용자 전체의 선택 지표(+ 기본 지표)를 미리 갱신.
+    캐시 TTL과 무관하게 새로 수집해 캐시/로컬 저장소를 채우므로,
+    리포트 생성 시점에는 원천 API 호출 없이 캐시에서 데이터를 읽습니다.
+    갱신에 성공한 지표 수를 반환합니다.
+    """
+    result = await db.execute(select(User).where(User.is_active == True))
+    users = result.scalars().all()
+    ids: list[str] = list(DEFAULT_INDICATORS)
+    for user in users:
+        ids.extend(_user_indicator_ids(user))
+    ids = list(dict.fromkeys(ids))
+
+    data = await data_service.fetch_all_indicators(ids, force=True)
+    warmed = sum(1 for v in data.values() if v.get("value") is not None and "error" not in v and not v.get("stale"))
+    print(f"[PREWARM] {warmed}/{len(ids)} indicators refreshed for {len(users)} active users")
+    return warmed
+
+
+async def prefetch_batch_reports(users: Iterable[User], snapshot: IndicatorSnapshot) -> dict[str, dict]:
+    """
+    REPORT_AI_MODE == "batch"일 때: 배치 대상 전체 프롬프트를 Message Batches로 미리 생성.
+    결과는 이 실행 전용 dict(프롬프트 키 → 결과)로 반환하며, run_report_batch(batch_results=...)로 넘기면
+    사용자별 generate_user_report가 공용 LRU 캐시 크기와 무관하게 그대로 사용합니다.
+    스냅샷 전체 데이터를 공유 블록으로 넘겨 모든 요청이 같은 프롬프트 캐시 prefix를 씁니다.
+    """
+    configs = _load_indicators_config()
+    shared_data = snapshot.view(snapshot.indicator_ids)
+    items = [
+        (snapshot.view(_user_indicator_ids(user)), user.report_level or ReportLevel.STANDARD)
+        for user in users
+    ]
+    results: dict[str, dict] = {}
+    try:
+        await ai_service.prefetch_reports_batch(
+            items, configs, shared_data, snapshot.report_date, results=results
+        )
+    except Exception as e:
+        print(f"[REPORT] Batch AI prefetch failed, falling back to realtime: {e}")
+    return results
+
+
+async def generate_user_report(
+    user: User,
+    db: AsyncSession,
+    snapshot: Optional[IndicatorSnapshot] = None,
+    batch_results: Optional[dict[str, dict]] = None,
+) -> Report:
     """
     사용자 설정에 맞는 리포트 생성 후 DB 저장 및 푸시 알림 전송
+    snapshot이 주어지면 외부 API 대신 스냅샷에서 데이터를 가져옵니다.
+    batch_results는 prefetch_batch_reports가 만든 실행 단위 배치 결과입니다.
     """
-    indicator_ids = user.selected_indicators or DEFAULT_INDICATORS
+    indicator_ids = _user_indicator_ids(user)
     level = user.report_level or ReportLevel.STANDARD
     configs = _load_indicators_config()
 
     # 1. 데이터 수집
+    shared_data = None
+    report_date = None
+    if snapshot is not None:
+        raw_data = snapshot.view(indicator_ids)
+        shared_data = snapshot.view(snapshot.indicator_ids)
+        report_date = snapshot.report_date
+    else:
+        raw_data = await data_service.fetch_all_indicators(indicator_ids)
+
+    # 2. AI 리포트 생성 (스냅샷 전체를 공유 블록으로 사용해 사용자 간 프롬프트 캐시 재사용)
+    result = await ai_service.generate_report(
+        raw_data, level, configs, shared_data, report_date, batch_results=batch_results
+    )
+
+    # 3. DB 저장 + 4. 푸시 알림
+    return await _save_report(user, db, level, indicator_ids, raw_data, result)
+
+
+async def stream_user_report(
+    user: User,
+    db: AsyncSession,
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    generate_user_report의 스트리밍 버전.
+    요약 문장과 섹션을 파싱되는 즉시 ("summary"/"section", payload)로 내보내고,
+    저장이 끝나면 ("report", Report)를 마지막으로 내보냅니다.
+    """
+    indicator_ids = _user_indicator_ids(user)
+    level = user.report_level or ReportLevel.STANDARD
+    configs = _load_indicators_config()
+
     raw_data = await data_service.fetch_all_indicators(indicator_ids)
 
-    # 2. AI 리포트 생성
-    result = await ai_service.generate_report(raw_data, level, configs)
+    result = None
+    async for event, payload in ai_service.stream_report(raw_data, level, configs):
+        if event == "complete":
+            result = payload
+        else:
+            yield event, payload
 
-    # 3. DB 저장
+    report = await _save_report(user, db, level, indicator_ids, raw_data, result)
+    yield "report", report
+
+
+async def _save_report(
+    user: User,
+    db: AsyncSession,
+    level: ReportLevel,
+    indicator_ids: list[str],
+    raw_data: dict[str, Any],
+    result: dict[str, Any],
+) -> Report:
+    """
+    AI 결과를 Report로 저장하고 같은 커밋으로 푸시 알림을 outbox에 기록.
+    전송은 push_dispatcher가 백그라운드에서 담당하므로 푸시 서비스 지연이 리포트 생성을 막지 않습니다.
+    """
     report = Report(
         user_id=user.id,
         title=result["title"],
@@ -62,39 +182,155 @@ async def generate_user_report(user: User, db: AsyncSession) -> Report:
         level=level,
         indicators_used=indicator_ids,
         raw_data=raw_data,
+        ai_usage=result.get("usage"),
     )
     db.add(report)
+    await db.flush()  # 알림 URL에 쓸 report.id 확보
+
+    messages = []
+    if user.push_enabled:
+        # 등록된 기기마다 알림 기록
+        messages = build_report_messages(user, report, await load_push_subscriptions(db, user.id))
+    for message in messages:
+        enqueue_notification(db, message, report_id=report.id)
     await db.commit()
     await db.refresh(report)
 
-    # 4. 푸시 알림
-    await send_report_notification(user, report)
+    if messages:
+        push_dispatcher.wake()
 
     return report
 
 
-async def generate_reports_by_frequency(db: AsyncSession, frequency: ReportFrequency) -> int:
+class ReportBatchResult:
+    """배치 리포트 생성 결과 요약 (성공/실패/사용자별 소요 시간)"""
+
+    def __init__(self):
+        self.succeeded: list[int] = []
+        self.failed: dict[int, str] = {}
+        self.durations: dict[int, float] = {}
+        self.elapsed: float = 0.0
+
+    @property
+    def success_count(self) -> int:
+        return len(self.succeeded)
+
+    @property
+    def failure_count(self) -> int:
+        return len(self.failed)
+
+    def summary(self) -> dict:
+        durations = list(self.durations.values())
+        return {
+            "succeeded": self.success_count,
+            "failed": self.failure_count,
+            "elapsed": round(self.elapsed, 3),
+            "avg_duration": round(sum(durations) / len(durations), 3) if durations else 0.0,
+            "max_duration": round(max(durations), 3) if durations else 0.0,
+        }
+
+
+async def run_report_batch(
+    db: AsyncSession,
+    users: Sequence[User],
+    snapshot: Optional[IndicatorSnapshot] = None,
+    session_factory: Optional[async_sessionmaker] = None,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    label: str = "",
+    batch_results: Optional[dict[str, dict]] = None,
+) -> ReportBatchResult:
+    """
+    여러 사용자의 리포트를 세마포어로 동시 실행 수를 제한하며 생성.
+
+    AsyncSession은 동시 사용이 불가능하므로, session_factory가 주어지면 워커마다
+    별도 세션을 열어 사용합니다. session_factory가 없으면 공용 db로 순차 실행합니다.
+    batch_results(prefetch_batch_reports 결과)는 실행이 끝날 때까지 모든 사용자 생성에 그대로 전달됩니다.
+    """
+    result = ReportBatchResult()
+    if not users:
+        return result
+
+    if session_factory is None:
+        max_concurrency = 1
+    elif max_concurrency is None:
+        max_concurrency = settings.REPORT_BATCH_CONCURRENCY
+    if timeout is None:
+        timeout = settings.REPORT_USER_TIMEOUT_SECONDS
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    prefix = f"{label} " if label else ""
+
+    async def _run_one(user: User) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if session_factory is None:
+                    await asyncio.wait_for(
+                        generate_user_report(user, db, snapshot=snapshot, batch_results=batch_results), timeout
+                    )
+                else:
+                    async with session_factory() as worker_db:
+                        worker_user = await worker_db.get(User, user.id)
+                        await asyncio.wait_for(
+                            generate_user_report(
+                                worker_user, worker_db, snapshot=snapshot, batch_results=batch_results
+                            ),
+                            timeout,
+                        )
+                result.succeeded.append(user.id)
+            except asyncio.TimeoutError:
+                result.failed[user.id] = f"timeout after {timeout}s"
+                print(f"[REPORT] Timeout generating {prefix}report for user {user.id}")
+            except Exception as e:
+                result.failed[user.id] = str(e)
+                print(f"[REPORT] Error generating {prefix}report for user {user.id}: {e}")
+            finally:
+                result.durations[user.id] = time.perf_counter() - started
+
+    batch_started = time.perf_counter()
+    await asyncio.gather(*(_run_one(user) for user in users))
+    result.elapsed = time.perf_counter() - batch_started
+    return result
+
+
+async def generate_reports_by_frequency(
+    db: AsyncSession,
+    frequency: ReportFrequency,
+    session_factory: Optional[async_sessionmaker] = None,
+    max_concurrency: Optional[int] = None,
+) -> int:
     """
     특정 frequency의 모든 활성 사용자 리포트 생성.
+    session_factory가 주어지면 워커별 세션으로 동시 생성합니다.
     성공적으로 생성된 리포트 수를 반환합니다.
     """
     result = await db.execute(
         select(User).where(User.is_active == True, User.report_frequency == frequency)
     )
     users = result.scalars().all()
+    if not users:
+        return 0
 
-    success_count = 0
-    for user in users:
-        try:
-            await generate_user_report(user, db)
-            success_count += 1
-        except Exception as e:
-            print(f"[REPORT] Error generating {frequency} report for user {user.id}: {e}")
-
-    return success_count
+    snapshot = await build_indicator_snapshot(users)
+    batch_results = None
+    if settings.REPORT_AI_MODE == "batch":
+        batch_results = await prefetch_batch_reports(users, snapshot)
+    batch = await run_report_batch(
+        db, users, snapshot,
+        batch_results=batch_results,
+        session_factory=session_factory,
+        max_concurrency=max_concurrency,
+        label=frequency.value,
+    )
+    print(f"[REPORT] {frequency.value} batch summary: {batch.summary()}")
+    return batch.success_count
 
 
-async def generate_all_due_reports(db: AsyncSession):
+async def generate_all_due_reports(
+    db: AsyncSession,
+    session_factory: Optional[async_sessionmaker] = None,
+    max_concurrency: Optional[int] = None,
+) -> ReportBatchResult:
     """
     스케줄러에서 호출: 오늘 리포트를 받아야 할 모든 사용자에게 생성.
     report_frequency 기준으로 일간/주간/월간 조건을 체크합니다.
@@ -103,6 +339,7 @@ async def generate_all_due_reports(db: AsyncSession):
     result = await db.execute(select(User).where(User.is_active == True))
     users = result.scalars().all()
 
+    due_users = []
     for user in users:
         should_generate = False
         if user.report_frequency == ReportFrequency.DAILY:
@@ -113,7 +350,20 @@ async def generate_all_due_reports(db: AsyncSession):
             should_generate = (today.day == 1)  # 매월 1일
 
         if should_generate:
-            try:
-                await generate_user_report(user, db)
-            except Exception as e:
-                print(f"[REPORT] Error generating report for user {user.id}: {e}")
+            due_users.append(user)
+
+    if not due_users:
+        return ReportBatchResult()
+
+    snapshot = await build_indicator_snapshot(due_users)
+    batch_results = None
+    if settings.REPORT_AI_MODE == "batch":
+        batch_results = await prefetch_batch_reports(due_users, snapshot)
+    batch = await run_report_batch(
+        db, due_users, snapshot,
+        batch_results=batch_results,
+        session_factory=session_factory,
+        max_concurrency=max_concurrency,
+    )
+    print(f"[REPORT] due batch summary: {batch.summary()}")
+    return batch
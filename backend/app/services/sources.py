@@ -0,0 +1,525 @@
+"""
+경제 지표 소스 어댑터
+indicators_config.json의 소스 필드(fred_id, yahoo_symbol, ecos_stat_code, kosis_tbl_id, worldbank_id 등)로 지표별 수집 경로를 정하고,
+소스마다 fetch_many(ids) 한 번으로 요청된 지표를 일괄 수집합니다.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import yfinance as yf
+    HAS_YFINANCE = True
+except ImportError:
+    HAS_YFINANCE = False
+
+from ..core.config import settings
+from .http_client import UpstreamDataError, get_json
+
+if TYPE_CHECKING:
+    from .data_service import DataService
+
+FRED_HISTORY_LENGTH = 12
+YFINANCE_HISTORY_LENGTH = 60
+
+WB_API_BASE = "https://api.worldbank.org/v2"
+WB_SOURCE_ID = 2  # World Development Indicators
+WB_PAGE_SIZE = 1000
+WB_HISTORY_LENGTH = 5
+
+ECOS_HISTORY_LENGTH = 12
+ECOS_MAX_ROWS = 10000
+# 주기별 ECOS 조회 시작 시점 (오늘 기준 과거로)
+ECOS_LOOKBACK_DAYS = {"D": 120, "M": 2 * 365, "Q": 4 * 365, "A": 10 * 365}
+# update_frequency → ECOS 주기 (설정에 ecos_cycle이 없을 때)
+ECOS_CYCLE_BY_FREQUENCY = {"daily": "D", "event": "D", "weekly": "D", "monthly": "M", "quarterly": "Q"}
+
+KOSIS_HISTORY_LENGTH = 12
+
+
+def summarize_series(
+    indicator_id: str,
+    dates: Sequence[Any],
+    values: Sequence[float],
+    source: str,
+    ndigits: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    날짜 오름차순 시계열로 최신값/직전 대비/history 결과 dict 생성 (모든 소스 공용).
+    결측치 제거·반올림·날짜 포맷을 NumPy 배열 단위로 한 번에 처리합니다.
+    dates는 "YYYY-MM-DD" 문자열 또는 datetime64 배열을 받습니다.
+    """
+    values = np.asarray(values, dtype=float)
+    dates = np.asarray(dates)
+    if np.issubdtype(dates.dtype, np.datetime64):
+        dates = np.datetime_as_string(dates, unit="D")
+
+    mask = ~np.isnan(values)
+    if not mask.all():
+        values, dates = values[mask], dates[mask]
+    if values.size == 0:
+        raise ValueError(f"No data for {indicator_id}")
+
+    shown = np.round(values, ndigits) if ndigits is not None else values
+    latest = float(values[-1])
+    prev = float(values[-2]) if values.size > 1 else None
+
+    def _r(x: float) -> float:
+        return round(x, ndigits) if ndigits is not None else x
+
+    return {
+        "indicator_id": indicator_id,
+        "value": float(shown[-1]),
+        "prev_value": float(shown[-2]) if prev is not None else None,
+        "change": _r(latest - prev) if prev is not None else None,
+        "change_pct": _r((latest - prev) / prev * 100) if prev else None,
+        "date": str(dates[-1]),
+        "history": [{"date": d, "value": v} for d, v in zip(dates.tolist(), shown.tolist())],
+        "source": source,
+    }
+
+
+def _split_closes(frame: "pd.DataFrame", symbols: list[str]) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """yf.download 결과를 티커별 (날짜 문자열 배열, 종가 배열)로 분리 (결측치 제거, 데이터 없는 티커는 제외)"""
+    if frame is None or frame.empty:
+        return {}
+    index = frame.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)  # 거래소 현지 날짜 유지
+    dates = np.datetime_as_string(index.values.astype("datetime64[D]"), unit="D")
+
+    if isinstance(frame.columns, pd.MultiIndex):
+        close = frame.xs("Close", axis=1, level=1)
+        found = [symbol for symbol in symbols if symbol in close.columns]
+        matrix = close[found].to_numpy(dtype=float)
+    elif "Close" in frame.columns and len(symbols) == 1:
+        found = symbols
+        matrix = frame[["Close"]].to_numpy(dtype=float)
+    else:
+        return {}
+
+    closes: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    valid = ~np.isnan(matrix)
+    for i, symbol in enumerate(found):
+        mask = valid[:, i]
+        if mask.any():
+            closes[symbol] = (dates[mask], matrix[mask, i])
+    return closes
+
+
+class SourceAdapter(ABC):
+    """
+    소스 어댑터 인터페이스.
+    keys는 레지스트리가 채우는 지표 id → 소스별 조회 키 매핑입니다.
+    """
+
+    name = ""
+
+    def __init__(self, service: "DataService"):
+        self.service = service
+        self.keys: dict[str, Any] = {}
+
+    def available(self) -> bool:
+        """API 키/선택 의존성 등 수집 가능 여부"""
+        return True
+
+    @abstractmethod
+    def key_for(self, config: dict) -> Optional[Any]:
+        """지표 설정에서 이 소스의 조회 키 추출 (지원하지 않으면 None)"""
+
+    @abstractmethod
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        """지표들을 일괄 수집 (결과 dict 또는 예외를 지표 id별로 반환)"""
+
+    def _store_and_load(
+        self, store_key: str, dates: Sequence[str], values: Sequence[float], limit: int
+    ) -> tuple[Sequence[str], Sequence[float]]:
+        """새 관측치를 로컬 저장소에 반영하고 최근 limit개 (날짜, 값)을 저장소에서 읽어 반환"""
+        store = self.service.store
+        if store is None:
+            return dates[-limit:], values[-limit:]
+        store.upsert(store_key, zip(list(dates), [float(v) for v in values]))
+        rows = store.history(store_key, limit)
+        if not rows:
+            return (), ()
+        dates, values = zip(*rows)
+        return dates, values
+
+    async def _store_and_load_async(
+        self, store_key: str, dates: Sequence[str], values: Sequence[float], limit: int
+    ) -> tuple[Sequence[str], Sequence[float]]:
+        """비동기 수집 경로용 _store_and_load (sqlite3 작업이 이벤트 루프를 막지 않도록 수집 스레드 풀에서 실행)"""
+        if self.service.store is None:
+            return self._store_and_load(store_key, dates, values, limit)
+        return await self.service.executor.run("store", self._store_and_load, store_key, dates, values, limit)
+
+
+class FredAdapter(SourceAdapter):
+    """FRED (fred_id) - 시리즈별 비동기 JSON 요청을 동시에 실행"""
+
+    name = "fred"
+
+    def available(self) -> bool:
+        return self.service.fred is not None
+
+    def key_for(self, config: dict) -> Optional[str]:
+        return config.get("fred_id")
+
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        results = await asyncio.gather(
+            *(self._fetch(self.keys[ind_id], ind_id) for ind_id in indicator_ids),
+            return_exceptions=True,
+        )
+        return dict(zip(indicator_ids, results))
+
+    async def _fetch(self, series_id: str, indicator_id: str) -> dict[str, Any]:
+        """FRED JSON API에서 시계열 수집 (로컬 저장소가 있으면 마지막 저장일 이후만 요청)"""
+        store = self.service.store
+        store_key = f"fred:{series_id}"
+        last = await self.service.executor.run("store", store.last_date, store_key) if store else None
+        start = last or (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+        observations = await self.service.fred.observations(series_id, start, FRED_HISTORY_LENGTH)
+        dates, values = zip(*observations) if observations else ((), ())
+        dates, values = await self._store_and_load_async(store_key, dates, values, FRED_HISTORY_LENGTH)
+        if len(values) == 0:
+            raise UpstreamDataError("FRED", reason=f"no data for {series_id}")
+        return summarize_series(indicator_id, dates, values, "FRED")
+
+
+class YahooFinanceAdapter(SourceAdapter):
+    """Yahoo Finance (yahoo_symbol) - 요청된 티커를 한 번의 yf.download로 수집"""
+
+    name = "yahoo"
+
+    def available(self) -> bool:
+        return HAS_YFINANCE
+
+    def key_for(self, config: dict) -> Optional[str]:
+        return config.get("yahoo_symbol")
+
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        tickers = {ind_id: self.keys[ind_id] for ind_id in indicator_ids}
+        return await self.service.executor.run("yfinance", self._download, tickers)
+
+    def _download(self, tickers: dict[str, str]) -> dict[str, Any]:
+        """
+        Yahoo Finance 다중 티커 일괄 다운로드 (지표 id → 티커, 전용 스레드 풀에서 실행).
+        한 번의 yf.download 결과를 티커별 종가로 분리해 지표별 결과(또는 예외)로 반환합니다.
+        """
+        store = self.service.store
+        store_keys = {ind_id: f"yahoo:{ticker}" for ind_id, ticker in tickers.items()}
+        last_dates = [store.last_date(key) for key in store_keys.values()] if store else [None]
+        # 증분 구간은 가장 오래된 마지막 저장일 기준 (겹치는 날짜는 upsert로 덮어씀)
+        start = None if None in last_dates else min(last_dates)
+        symbols = sorted(set(tickers.values()))
+        frame = yf.download(
+            symbols,
+            **({"start": start} if start else {"period": "1y"}),
+            group_by="ticker",
+            auto_adjust=True,
+            progress=False,
+        )
+        closes = _split_closes(frame, symbols)
+
+        results: dict[str, Any] = {}
+        for ind_id, ticker in tickers.items():
+            dates, values = closes.get(ticker, ((), ()))
+            dates, values = self._store_and_load(store_keys[ind_id], dates, values, YFINANCE_HISTORY_LENGTH)
+            if len(values) == 0:
+                results[ind_id] = UpstreamDataError("Yahoo Finance", reason=f"no data for {ticker}")
+            else:
+                results[ind_id] = summarize_series(ind_id, dates, values, "Yahoo Finance", ndigits=2)
+        return results
+
+
+class WorldBankAdapter(SourceAdapter):
+    """World Bank (worldbank_country + worldbank_id) - 국가/지표 목록을 세미콜론으로 묶어 단일 요청"""
+
+    name = "worldbank"
+
+    def key_for(self, config: dict) -> Optional[tuple[str, str]]:
+        if config.get("worldbank_id") and config.get("worldbank_country"):
+            return config["worldbank_country"], config["worldbank_id"]
+        return None
+
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        """
+        국가/지표 목록을 한 번에 요청하고, 페이지를 모두 읽은 뒤
+        (국가, 지표) 기준으로 지표별 결과를 분리합니다.
+        """
+        countries = sorted({self.keys[i][0] for i in indicator_ids})
+        wb_ids = sorted({self.keys[i][1] for i in indicator_ids})
+        url = f"{WB_API_BASE}/country/{';'.join(countries)}/indicator/{';'.join(wb_ids)}"
+        params: dict[str, Any] = {"format": "json", "mrv": WB_HISTORY_LENGTH, "per_page": WB_PAGE_SIZE}
+        if len(wb_ids) > 1:
+            params["source"] = WB_SOURCE_ID  # 다중 지표 요청은 source 지정 필요
+
+        series: dict[tuple[str, str], list[dict]] = {}
+        page, pages = 1, 1
+        while page <= pages:
+            data = await get_json(self.service.http, url, params={**params, "page": page}, source="World Bank")
+            if not isinstance(data, list) or not data or "message" in data[0]:
+                raise UpstreamDataError("World Bank", reason=f"error response: {data}")
+            pages = int(data[0].get("pages") or 1)
+            for e in (data[1] if len(data) > 1 and data[1] else []):
+                if e.get("value") is None:
+                    continue
+                key = (e.get("countryiso3code") or e["country"]["id"], e["indicator"]["id"])
+                series.setdefault(key, []).append(e)
+            page += 1
+
+        results: dict[str, Any] = {}
+        for ind_id in indicator_ids:
+            entries = sorted(series.get(self.keys[ind_id], []), key=lambda e: e["date"])
+            entries = entries[-WB_HISTORY_LENGTH:]
+            if not entries:
+                results[ind_id] = UpstreamDataError("World Bank", reason=f"no data for {ind_id}")
+                continue
+            results[ind_id] = summarize_series(
+                ind_id, [e["date"] for e in entries], [e["value"] for e in entries], "World Bank"
+            )
+        return results
+
+
+def _ecos_period(day: datetime, cycle: str) -> str:
+    """ECOS 조회 기간 파라미터 형식 (D: YYYYMMDD, M: YYYYMM, Q: YYYYQn, A: YYYY)"""
+    if cycle == "D":
+        return day.strftime("%Y%m%d")
+    if cycle == "M":
+        return day.strftime("%Y%m")
+    if cycle == "Q":
+        return f"{day.year}Q{(day.month - 1) // 3 + 1}"
+    return str(day.year)
+
+
+def _normalize_period(period: str) -> str:
+    """ECOS TIME / KOSIS PRD_DE를 다른 소스와 같은 날짜 문자열로 변환"""
+    if len(period) == 8 and period.isdigit():      # YYYYMMDD
+        return f"{period[:4]}-{period[4:6]}-{period[6:]}"
+    if len(period) == 6 and period.isdigit():      # YYYYMM
+        return f"{period[:4]}-{period[4:]}-01"
+    if len(period) == 6 and period[4] == "Q":      # YYYYQn
+        return f"{period[:4]}-{(int(period[5]) - 1) * 3 + 1:02d}-01"
+    if len(period) == 5 and period[4].isdigit() and period[:4].isdigit():  # KOSIS 분기 YYYYn
+        return f"{period[:4]}-{(int(period[4]) - 1) * 3 + 1:02d}-01"
+    return period
+
+
+class EcosAdapter(SourceAdapter):
+    """
+    한국은행 ECOS (ecos_stat_code + ecos_item_code).
+    같은 통계표·주기의 항목들은 항목 코드 없이 한 번에 요청해 항목별로 분리하고,
+    서로 다른 통계표는 공용 HTTP 클라이언트로 동시에 요청합니다.
+    """
+
+    name = "ecos"
+
+    def available(self) -> bool:
+        return bool(settings.ECOS_API_KEY)
+
+    def key_for(self, config: dict) -> Optional[tuple[str, str, str]]:
+        stat_code, item_code = config.get("ecos_stat_code"), config.get("ecos_item_code")
+        if not (stat_code and item_code):
+            return None
+        cycle = config.get("ecos_cycle") or ECOS_CYCLE_BY_FREQUENCY.get(config.get("update_frequency", ""), "M")
+        return stat_code, item_code, cycle
+
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        groups: dict[tuple[str, str], list[str]] = {}
+        for ind_id in indicator_ids:
+            stat_code, _, cycle = self.keys[ind_id]
+            groups.setdefault((stat_code, cycle), []).append(ind_id)
+
+        gathered = await asyncio.gather(
+            *(self._fetch_table(stat_code, cycle, ids) for (stat_code, cycle), ids in groups.items()),
+            return_exceptions=True,
+        )
+        results: dict[str, Any] = {}
+        for ids, batch in zip(groups.values(), gathered):
+            for ind_id in ids:
+                results[ind_id] = batch if isinstance(batch, Exception) else batch[ind_id]
+        return results
+
+    async def _fetch_table(self, stat_code: str, cycle: str, indicator_ids: list[str]) -> dict[str, Any]:
+        """StatisticSearch 한 번으로 통계표의 항목들을 수집 (항목이 하나면 항목 코드로 좁혀 요청)"""
+        now = datetime.now()
+        start = _ecos_period(now - timedelta(days=ECOS_LOOKBACK_DAYS.get(cycle, 365)), cycle)
+        end = _ecos_period(now, cycle)
+        items = sorted({self.keys[i][1] for i in indicator_ids})
+        url = (
+            f"{settings.ECOS_API_BASE}/StatisticSearch/{settings.ECOS_API_KEY}/json/kr/1/{ECOS_MAX_ROWS}"
+            f"/{stat_code}/{cycle}/{start}/{end}"
+        )
+        if len(items) == 1:
+            url += f"/{items[0]}"
+
+        # 인증키가 URL 경로에 들어가므로 로그/오류용 URL에서는 가림
+        data = await get_json(self.service.http, url, source="ECOS", redact=[settings.ECOS_API_KEY])
+        rows = (data.get("StatisticSearch") or {}).get("row", [])
+        if not rows and "RESULT" in data and data["RESULT"].get("CODE") != "INFO-200":
+            raise UpstreamDataError("ECOS", reason=f"error response: {data['RESULT'].get('MESSAGE')}")
+
+        by_item: dict[str, list[tuple[str, float]]] = {}
+        for row in rows:
+            value = row.get("DATA_VALUE")
+            if value in (None, "", "-"):
+                continue
+            by_item.setdefault(row["ITEM_CODE1"], []).append((_normalize_period(row["TIME"]), float(value)))
+
+        results: dict[str, Any] = {}
+        for ind_id in indicator_ids:
+            _, item_code, _ = self.keys[ind_id]
+            observations = sorted(by_item.get(item_code, []))
+            dates, values = zip(*observations) if observations else ((), ())
+            dates, values = await self._store_and_load_async(
+                f"ecos:{stat_code}:{item_code}", dates, values, ECOS_HISTORY_LENGTH
+            )
+            if len(values) == 0:
+                results[ind_id] = UpstreamDataError("ECOS", reason=f"no data for {ind_id}")
+            else:
+                results[ind_id] = summarize_series(ind_id, dates, values, "ECOS")
+        return results
+
+
+class KosisAdapter(SourceAdapter):
+    """
+    통계청 KOSIS (kosis_org_id + kosis_tbl_id + kosis_itm_id, 선택 kosis_obj_l1/kosis_prd_se).
+    같은 통계표의 항목/분류는 itmId·objL1을 "+"로 이어 한 번에 요청하고 (항목, 분류)별로 분리합니다.
+    """
+
+    name = "kosis"
+
+    def available(self) -> bool:
+        return bool(settings.KOSIS_API_KEY)
+
+    def key_for(self, config: dict) -> Optional[tuple[str, str, str, str, str]]:
+        if not (config.get("kosis_org_id") and config.get("kosis_tbl_id") and config.get("kosis_itm_id")):
+            return None
+        return (
+            config["kosis_org_id"],
+            config["kosis_tbl_id"],
+            config["kosis_itm_id"],
+            config.get("kosis_obj_l1", "ALL"),
+            config.get("kosis_prd_se", "M"),
+        )
+
+    async def fetch_many(self, indicator_ids: list[str]) -> dict[str, Any]:
+        groups: dict[tuple[str, str, str], list[str]] = {}
+        for ind_id in indicator_ids:
+            org_id, tbl_id, _, _, prd_se = self.keys[ind_id]
+            groups.setdefault((org_id, tbl_id, prd_se), []).append(ind_id)
+
+        gathered = await asyncio.gather(
+            *(self._fetch_table(*table, ids) for table, ids in groups.items()),
+            return_exceptions=True,
+        )
+        results: dict[str, Any] = {}
+        for ids, batch in zip(groups.values(), gathered):
+            for ind_id in ids:
+                results[ind_id] = batch if isinstance(batch, Exception) else batch[ind_id]
+        return results
+
+    async def _fetch_table(
+        self, org_id: str, tbl_id: str, prd_se: str, indicator_ids: list[str]
+    ) -> dict[str, Any]:
+        """statisticsParameterData 한 번으로 통계표의 여러 항목/분류를 수집"""
+        itm_ids = sorted({self.keys[i][2] for i in indicator_ids})
+        obj_l1s = sorted({self.keys[i][3] for i in indicator_ids})
+        params = {
+            "method": "getList",
+            "apiKey": settings.KOSIS_API_KEY,
+            "orgId": org_id,
+            "tblId": tbl_id,
+            "itmId": "+".join(itm_ids) + "+",
+            "objL1": "ALL" if "ALL" in obj_l1s else "+".join(obj_l1s) + "+",
+            "prdSe": prd_se,
+            "newEstPrdCnt": KOSIS_HISTORY_LENGTH,
+            "format": "json",
+            "jsonVD": "Y",
+        }
+        data = await get_json(
+            self.service.http, f"{settings.KOSIS_API_BASE}/Param/statisticsParameterData.do", params,
+            source="KOSIS", redact=[settings.KOSIS_API_KEY],
+        )
+        if isinstance(data, dict):
+            raise UpstreamDataError("KOSIS", reason=f"error response: {data.get('errMsg', data)}")
+
+        by_key: dict[tuple[str, str], list[tuple[str, float]]] = {}
+        for row in data:
+            value = row.get("DT")
+            if value in (None, "", "-"):
+                continue
+            by_key.setdefault((row["ITM_ID"], row.get("C1", "")), []).append(
+                (_normalize_period(row["PRD_DE"]), float(value))
+            )
+
+        results: dict[str, Any] = {}
+        for ind_id in indicator_ids:
+            _, _, itm_id, obj_l1, _ = self.keys[ind_id]
+            if obj_l1 == "ALL":
+                # 분류를 지정하지 않은 지표는 분류가 하나뿐일 때만 사용 (여러 분류를 한 시계열로 합치지 않음)
+                categories = sorted(c1 for itm, c1 in by_key if itm == itm_id)
+                if len(categories) > 1:
+                    results[ind_id] = UpstreamDataError(
+                        "KOSIS", reason=f"{ind_id}: objL1=ALL returned {len(categories)} categories, set kosis_obj_l1"
+                    )
+                    continue
+                observations = sorted(by_key.get((itm_id, categories[0]), [])) if categories else []
+            else:
+                observations = sorted(by_key.get((itm_id, obj_l1), []))
+            dates, values = zip(*observations) if observations else ((), ())
+            dates, values = await self._store_and_load_async(
+                f"kosis:{org_id}:{tbl_id}:{itm_id}:{obj_l1}", dates, values, KOSIS_HISTORY_LENGTH
+            )
+            if len(values) == 0:
+                results[ind_id] = UpstreamDataError("KOSIS", reason=f"no data for {ind_id}")
+            else:
+                results[ind_id] = summarize_series(ind_id, dates, values, "KOSIS")
+        return results
+
+
+# 지표 하나에 여러 소스 필드가 있으면 앞쪽 어댑터가 우선
+# (예: sp500은 FRED 키가 있으면 FRED, 없으면 Yahoo / kr_unemployment는 KOSIS 키가 있으면 KOSIS, 없으면 World Bank)
+ADAPTER_TYPES: list[type[SourceAdapter]] = [
+    FredAdapter, YahooFinanceAdapter, EcosAdapter, KosisAdapter, WorldBankAdapter,
+]
+
+
+class SourceRegistry:
+    """지표 설정으로 한 번 구성하는 지표 id → 소스 어댑터 라우팅 테이블"""
+
+    def __init__(self, adapters: list[SourceAdapter], configs: list[dict]):
+        self.adapters = {adapter.name: adapter for adapter in adapters}
+        self.routes: dict[str, SourceAdapter] = {}
+        available = [adapter for adapter in adapters if adapter.available()]
+        for config in configs:
+            ind_id = config.get("id")
+            for adapter in available:
+                key = adapter.key_for(config)
+                if ind_id and key:
+                    adapter.keys[ind_id] = key
+                    self.routes[ind_id] = adapter
+                    break
+
+    def __getitem__(self, name: str) -> SourceAdapter:
+        return self.adapters[name]
+
+    def group(self, indicator_ids: list[str]) -> tuple[dict[str, list[str]], list[str]]:
+        """요청 지표를 어댑터 이름별로 묶음 (지원하지 않는 지표는 별도 목록)"""
+        groups: dict[str, list[str]] = {}
+        unsupported = []
+        for ind_id in indicator_ids:
+            adapter = self.routes.get(ind_id)
+            if adapter is None:
+                unsupported.append(ind_id)
+            else:
+                groups.setdefault(adapter.name, []).append(ind_id)
+        return groups, unsupported
+
+
+def build_registry(service: "DataService", configs: list[dict]) -> SourceRegistry:
+    return SourceRegistry([adapter_type(service) for adapter_type in ADAPTER_TYPES], configs)
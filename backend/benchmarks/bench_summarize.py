@@ -0,0 +1,75 @@
+"""
+지표 요약 마이크로 벤치마크
+기존 pandas 경로(dropna 반복 + 행별 strftime)와 summarize_series(NumPy 일괄 처리)를 비교합니다.
+
+실행: cd backend && python -m benchmarks.bench_summarize
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from app.services.sources import _split_closes, summarize_series
+
+ROWS = 252        # 1년치 영업일
+HISTORY = 60      # YFINANCE_HISTORY_LENGTH
+TICKERS = ["^GSPC", "^IXIC", "^VIX", "DX-Y.NYB", "KRW=X", "CL=F", "GC=F", "^KS11", "^KQ11"]
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2024-01-01", periods=ROWS)
+    data = {}
+    for ticker in TICKERS:
+        close = 100 + rng.standard_normal(ROWS).cumsum()
+        close[rng.integers(0, ROWS, 5)] = np.nan
+        data[ticker] = pd.DataFrame({"Close": close}, index=index)
+    return pd.concat(data, axis=1)
+
+
+def legacy(frame: pd.DataFrame) -> list[dict]:
+    """기존 _fetch_fred/_fetch_yfinance 방식"""
+    results = []
+    for ticker in TICKERS:
+        series = frame[ticker]["Close"]
+        latest = series.dropna().iloc[-1]
+        prev = series.dropna().iloc[-2] if len(series.dropna()) > 1 else None
+        results.append({
+            "indicator_id": ticker,
+            "value": round(float(latest), 2),
+            "prev_value": round(float(prev), 2) if prev is not None else None,
+            "change": round(float(latest - prev), 2) if prev is not None else None,
+            "change_pct": round(float((latest - prev) / prev * 100), 2) if prev is not None else None,
+            "date": series.dropna().index[-1].strftime("%Y-%m-%d"),
+            "history": [
+                {"date": d.strftime("%Y-%m-%d"), "value": round(float(v), 2)}
+                for d, v in series.dropna().tail(HISTORY).items()
+            ],
+            "source": "Yahoo Finance",
+        })
+    return results
+
+
+def vectorized(frame: pd.DataFrame) -> list[dict]:
+    """_split_closes + summarize_series"""
+    closes = _split_closes(frame, TICKERS)
+    return [
+        summarize_series(ticker, dates[-HISTORY:], values[-HISTORY:], "Yahoo Finance", ndigits=2)
+        for ticker, (dates, values) in closes.items()
+    ]
+
+
+def main(number: int = 200) -> None:
+    frame = _frame()
+    assert legacy(frame) == vectorized(frame), "결과 불일치"
+
+    t_legacy = min(timeit.repeat(lambda: legacy(frame), number=number, repeat=5)) / number
+    t_vector = min(timeit.repeat(lambda: vectorized(frame), number=number, repeat=5)) / number
+    print(f"[BENCH] {len(TICKERS)} tickers x {ROWS} rows, history {HISTORY}")
+    print(f"[BENCH] legacy pandas : {t_legacy * 1e3:8.3f} ms/call")
+    print(f"[BENCH] vectorized    : {t_vector * 1e3:8.3f} ms/call")
+    print(f"[BENCH] speedup       : {t_legacy / t_vector:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
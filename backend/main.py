@@ -10,17 +10,34 @@ from apscheduler.triggers.cron import CronTrigger
 
 from app.core.database import init_db, AsyncSessionLocal
 from app.api import auth_router, reports_router, settings_router, indicators_router
+from app.services.data_service import data_service
+from app.services.job_queue import report_job_queue, build_job_store
+from app.services.push_fanout import push_fanout
+from app.services.push_outbox import push_dispatcher
 
 scheduler = AsyncIOScheduler()
 
+# 리포트 스케줄 시각: 오전 8시 KST = UTC 23:00
+REPORT_HOUR_UTC = 23
+REPORT_MINUTE_UTC = 0
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await data_service.open()
+    report_job_queue.configure(store=build_job_store(), session_factory=AsyncSessionLocal)
+    await report_job_queue.start()
+    push_dispatcher.configure(session_factory=AsyncSessionLocal)
+    await push_dispatcher.start()
     _setup_scheduler()
     scheduler.start()
     yield
     scheduler.shutdown()
+    await report_job_queue.stop()
+    await push_dispatcher.stop()
+    await data_service.close()
+    await push_fanout.close()
 
 
 def _setup_scheduler():
@@ -29,29 +46,52 @@ def _setup_scheduler():
     - 일간(DAILY):   매일 오전 8시 KST (UTC 23:00)
     - 주간(WEEKLY):  매주 월요일 오전 8시 KST (UTC 23:00)
     - 월간(MONTHLY): 매월 1일 오전 8시 KST (UTC 23:00)
+    - 지표 사전 갱신: 매일 리포트 스케줄 REPORT_PREWARM_LEAD_MINUTES분 전
     """
-    from app.services.report_service import generate_reports_by_frequency
+    from app.core.config import settings
+    from app.services.report_service import generate_reports_by_frequency, prewarm_indicators
     from app.models.user import ReportFrequency
 
     async def _run_daily():
         async with AsyncSessionLocal() as db:
-            count = await generate_reports_by_frequency(db, ReportFrequency.DAILY)
+            count = await generate_reports_by_frequency(
+                db, ReportFrequency.DAILY, session_factory=AsyncSessionLocal
+            )
             print(f"[SCHEDULER] daily: {count}개 리포트 생성 완료")
 
     async def _run_weekly():
         async with AsyncSessionLocal() as db:
-            count = await generate_reports_by_frequency(db, ReportFrequency.WEEKLY)
+            count = await generate_reports_by_frequency(
+                db, ReportFrequency.WEEKLY, session_factory=AsyncSessionLocal
+            )
             print(f"[SCHEDULER] weekly: {count}개 리포트 생성 완료")
 
     async def _run_monthly():
         async with AsyncSessionLocal() as db:
-            count = await generate_reports_by_frequency(db, ReportFrequency.MONTHLY)
+            count = await generate_reports_by_frequency(
+                db, ReportFrequency.MONTHLY, session_factory=AsyncSessionLocal
+            )
             print(f"[SCHEDULER] monthly: {count}개 리포트 생성 완료")
 
+    async def _run_prewarm():
+        async with AsyncSessionLocal() as db:
+            await prewarm_indicators(db)
+
+    # 지표 사전 갱신: 모든 리포트 스케줄이 같은 시각이므로 매일 한 번, 리포트 직전에 실행
+    lead = settings.REPORT_PREWARM_LEAD_MINUTES
+    if lead > 0:
+        prewarm_at = (REPORT_HOUR_UTC * 60 + REPORT_MINUTE_UTC - lead) % (24 * 60)
+        scheduler.add_job(
+            _run_prewarm,
+            CronTrigger(hour=prewarm_at // 60, minute=prewarm_at % 60, timezone="UTC"),
+            id="prewarm_indicators",
+            replace_existing=True,
+        )
+
     # 일간: 매일 오전 8시 KST = UTC 23:00
     scheduler.add_job(
         _run_daily,
-        CronTrigger(hour=23, minute=0, timezone="UTC"),
+        CronTrigger(hour=REPORT_HOUR_UTC, minute=REPORT_MINUTE_UTC, timezone="UTC"),
         id="daily_reports",
         replace_existing=True,
     )
@@ -59,7 +99,7 @@ def _setup_scheduler():
     # 주간: 매주 월요일 오전 8시 KST = UTC 23:00
     scheduler.add_job(
         _run_weekly,
-        CronTrigger(day_of_week="mon", hour=23, minute=0, timezone="UTC"),
+        CronTrigger(day_of_week="mon", hour=REPORT_HOUR_UTC, minute=REPORT_MINUTE_UTC, timezone="UTC"),
         id="weekly_reports",
         replace_existing=True,
     )
@@ -67,7 +107,7 @@ def _setup_scheduler():
     # 월간: 매월 1일 오전 8시 KST = UTC 23:00
     scheduler.add_job(
         _run_monthly,
-        CronTrigger(day=1, hour=23, minute=0, timezone="UTC"),
+        CronTrigger(day=1, hour=REPORT_HOUR_UTC, minute=REPORT_MINUTE_UTC, timezone="UTC"),
         id="monthly_reports",
         replace_existing=True,
     )
@@ -4,9 +4,12 @@ MESA v2 테스트 공용 픽스처
 - in-memory SQLite DB (테스트마다 격리)
 - AI 서비스 mock (Anthropic API 호출 차단)
 - 데이터 서비스 mock (FRED/yfinance 외부 호출 차단)
+- 테스트용 시계 (fake_clock: 단조 시계, utc_clock: UTC 시각)
 """
 import pytest
 import pytest_asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from unittest.mock import AsyncMock, patch
@@ -50,12 +53,59 @@ async def client(db_session: AsyncSession):
 
     app.dependency_overrides[get_db] = override_get_db
 
+    # 온디맨드 작업 큐 워커도 같은 테스트 세션을 사용
+    from app.services.job_queue import report_job_queue, InMemoryJobStore
+
+    @asynccontextmanager
+    async def _test_session():
+        yield db_session
+
+    report_job_queue.configure(store=InMemoryJobStore(), session_factory=_test_session)
+
+    # SSE 스트리밍 엔드포인트가 응답 본문에서 여는 세션도 테스트 세션으로 대체
+    stream_session = patch("app.api.reports.AsyncSessionLocal", _test_session)
+    stream_session.start()
+
+    # 푸시 outbox 디스패처는 시작하지 않고, 테스트에서 push_dispatcher.drain()으로 직접 전송
+    from app.services.push_outbox import push_dispatcher
+    previous_factory = push_dispatcher.session_factory
+    push_dispatcher.session_factory = _test_session
+
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
+    stream_session.stop()
+    await report_job_queue.stop()
+    report_job_queue.session_factory = None
+    push_dispatcher.session_factory = previous_factory
     app.dependency_overrides.clear()
 
 
+# ──────────────────────────────────────────────
+# 테스트용 시계
+# ──────────────────────────────────────────────
+
+class FakeClock:
+    """테스트용 시계 (now를 직접 옮겨 시간 경과를 흉내)"""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    """0초에서 시작하는 단조 시계 (time.monotonic/time.time 대체)"""
+    return FakeClock()
+
+
+@pytest.fixture
+def utc_clock() -> FakeClock:
+    """고정 시각에서 시작하는 UTC 시계 (datetime.utcnow 대체)"""
+    return FakeClock(datetime(2025, 1, 15, 23, 0, 0))
+
+
 # ──────────────────────────────────────────────
 # AI 서비스 mock
 # ──────────────────────────────────────────────
@@ -94,15 +144,19 @@ def mock_data_service():
 
 
 # ──────────────────────────────────────────────
-# Push 서비스 mock (webpush 실제 전송 차단)
+# Push 서비스 mock (fan-out 실제 전송 차단)
 # ──────────────────────────────────────────────
 
 @pytest.fixture(autouse=True)
 def mock_push_service():
-    """Web Push 실제 전송을 mock으로 차단 (모든 테스트에 자동 적용)"""
-    with patch("app.services.push_service.webpush") as mock_webpush:
-        mock_webpush.return_value = None
-        yield mock_webpush
+    """Web Push 일괄 전송을 mock으로 차단 (모든 테스트에 자동 적용, 모든 endpoint 201 응답)"""
+    from app.services.push_fanout import FanoutResult, PushOutcome
+
+    async def _deliver(messages):
+        return FanoutResult([PushOutcome(m.endpoint, m.user_id, status_code=201) for m in messages])
+
+    with patch("app.services.push_fanout.push_fanout.deliver", side_effect=_deliver) as mock_deliver:
+        yield mock_deliver
 
 
 # ──────────────────────────────────────────────
@@ -125,3 +179,14 @@ async def create_and_login(client: AsyncClient, user: dict = TEST_USER) -> str:
 def auth_headers(token: str) -> dict:
     """Authorization 헤더 딕셔너리 반환"""
     return {"Authorization": f"Bearer {token}"}
+
+
+async def generate_report_and_wait(client: AsyncClient, token: str) -> dict:
+    """POST /reports/generate로 작업 등록 후 처리 완료까지 기다려 작업 상태 반환"""
+    from app.services.job_queue import report_job_queue
+
+    resp = await client.post("/reports/generate", headers=auth_headers(token))
+    assert resp.status_code == 202
+    await report_job_queue.join()
+    job_resp = await client.get(f"/reports/jobs/{resp.json()['id']}", headers=auth_headers(token))
+    return job_resp.json()
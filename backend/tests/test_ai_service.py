@@ -0,0 +1,454 @@
+"""
+ai_service.py 단위 테스트
+
+- AIResultCache: 결과 재사용, 동시 요청 single-flight, 실패 미캐시
+- generate_report: 같은 입력의 Claude 호출 중복 제거, 파싱 실패 fallback
+- PartialReportParser: 스트리밍 중 부분 JSON에서 요약/섹션 점진 추출
+- prefetch_reports_batch: Message Batches 결과의 캐시 적재 (로컬 가짜 배치 서버)
+"""
+import asyncio
+import json
+from datetime import date, timedelta
+import pytest
+import httpx
+import respx
+from unittest.mock import AsyncMock, MagicMock, patch
+from anthropic import AsyncAnthropic
+
+from app.models.user import ReportLevel
+from app.services.ai_service import (  # autouse mock 이전의 원본
+    AIResultCache,
+    AnthropicBatchBackend,
+    BatchBackend,
+    PartialReportParser,
+    generate_report,
+    prefetch_reports_batch,
+)
+
+INDICATOR_DATA = {"sp500": {"value": 5800.0, "change_pct": 0.5, "date": "2024-10-01"}}
+CONFIGS = [{"id": "sp500", "name_ko": "S&P 500", "category": "market_indices"}]
+
+REPORT_JSON = {
+    "title": "테스트 리포트",
+    "summary_line1": "첫째",
+    "summary_line2": "둘째",
+    "summary_line3": "셋째",
+    "sections": [{"title": "섹션", "content": "<p>내용</p>"}],
+}
+
+
+def _mock_client(text: str, delay: float = 0.0) -> MagicMock:
+    async def _create(**kwargs):
+        await asyncio.sleep(delay)
+        usage = MagicMock(input_tokens=50, cache_creation_input_tokens=0,
+                          cache_read_input_tokens=1200, output_tokens=800)
+        return MagicMock(content=[MagicMock(text=text)], usage=usage)
+
+    client = MagicMock()
+    client.messages.create = AsyncMock(side_effect=_create)
+    return client
+
+
+# ──────────────────────────────────────────────
+# AIResultCache 테스트
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_cache_reuses_result_for_same_key():
+    """같은 키는 두 번째부터 캐시된 결과를 반환한다"""
+    cache = AIResultCache()
+    factory = AsyncMock(return_value={"title": "a"})
+
+    first = await cache.get_or_create("k", factory)
+    second = await cache.get_or_create("k", factory)
+
+    assert first == second == {"title": "a"}
+    factory.assert_called_once()
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_concurrent_requests():
+    """진행 중인 같은 키 요청은 하나의 호출로 합쳐진다"""
+    cache = AIResultCache()
+    calls = 0
+
+    async def _factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"title": "a"}
+
+    results = await asyncio.gather(*(cache.get_or_create("k", _factory) for _ in range(5)))
+
+    assert calls == 1
+    assert all(r == {"title": "a"} for r in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cache_does_not_store_failures():
+    """실패한 호출은 캐시하지 않고 다음 요청에서 다시 시도한다"""
+    cache = AIResultCache()
+    factory = AsyncMock(side_effect=[RuntimeError("rate limited"), {"title": "ok"}])
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_create("k", factory)
+    assert await cache.get_or_create("k", factory) == {"title": "ok"}
+    assert factory.call_count == 2
+
+
+# ──────────────────────────────────────────────
+# generate_report 테스트
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_generate_report_deduplicates_identical_inputs():
+    """같은 데이터·레벨의 동시 리포트 요청은 Claude를 한 번만 호출한다"""
+    client = _mock_client(json.dumps(REPORT_JSON), delay=0.01)
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        results = await asyncio.gather(*(
+            generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS) for _ in range(3)
+        ))
+        await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS)
+
+    assert client.messages.create.call_count == 1
+    assert all(r["title"] == "테스트 리포트" for r in results)
+
+
+@pytest.mark.asyncio
+async def test_generate_report_distinct_levels_call_separately():
+    """레벨이 다르면 별도의 Claude 호출이 발생한다"""
+    client = _mock_client(json.dumps(REPORT_JSON))
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS)
+        await generate_report(INDICATOR_DATA, ReportLevel.EXPERT, CONFIGS)
+
+    assert client.messages.create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_report_ignores_indicator_selection_order():
+    """같은 지표 집합이면 고른 순서가 달라도 같은 캐시 키로 Claude를 한 번만 호출한다"""
+    vix = {"value": 15.0, "change_pct": -1.0, "date": "2024-10-01"}
+    configs = CONFIGS + [{"id": "vix", "name_ko": "VIX", "category": "market_indices"}]
+    client = _mock_client(json.dumps(REPORT_JSON))
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        await generate_report({**INDICATOR_DATA, "vix": vix}, ReportLevel.STANDARD, configs)
+        await generate_report({"vix": vix, **INDICATOR_DATA}, ReportLevel.STANDARD, configs)
+
+    assert client.messages.create.call_count == 1
+    text = client.messages.create.call_args.kwargs["messages"][0]["content"][0]["text"]
+    assert text.index("S&P 500") < text.index("VIX")
+
+
+@pytest.mark.asyncio
+async def test_generate_report_parse_failure_falls_back_and_is_not_cached():
+    """JSON 파싱 실패 시 원문 fallback을 반환하고 결과는 캐시하지 않는다"""
+    client = _mock_client("not a json response")
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        result = await generate_report(INDICATOR_DATA, ReportLevel.BEGINNER, CONFIGS)
+        await generate_report(INDICATOR_DATA, ReportLevel.BEGINNER, CONFIGS)
+
+    assert "파싱 오류" in result["summary"]
+    assert client.messages.create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generate_report_marks_cacheable_prefixes():
+    """공유 지침+지표 데이터 블록만 캐시 구간이고, 레벨 프롬프트와 사용자별 지시문은 그 뒤에 온다"""
+    client = _mock_client(json.dumps(REPORT_JSON))
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS)
+
+    kwargs = client.messages.create.call_args.kwargs
+    shared_block, level_block = kwargs["system"]
+    assert shared_block["cache_control"] == {"type": "ephemeral"}
+    assert "S&P 500" in shared_block["text"]
+    assert "cache_control" not in level_block
+    (instructions,) = kwargs["messages"][0]["content"]
+    assert "cache_control" not in instructions
+    assert "[일반]" in instructions["text"]
+
+
+@pytest.mark.asyncio
+async def test_generate_report_shares_cached_prefix_across_levels_and_selections():
+    """같은 실행의 공유 데이터를 쓰면 레벨·선택 지표가 달라도 캐시 구간 블록이 동일하다"""
+    shared = {
+        "sp500": INDICATOR_DATA["sp500"],
+        "vix": {"value": 15.0, "change_pct": -1.0, "date": "2024-10-01"},
+    }
+    configs = CONFIGS + [{"id": "vix", "name_ko": "VIX", "category": "market_indices"}]
+    client = _mock_client(json.dumps(REPORT_JSON))
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        await generate_report({"sp500": shared["sp500"]}, ReportLevel.BEGINNER, configs, shared)
+        await generate_report({"vix": shared["vix"]}, ReportLevel.EXPERT, configs, shared)
+
+    first, second = (c.kwargs for c in client.messages.create.call_args_list)
+    assert first["system"][0] == second["system"][0]
+    assert "VIX" in first["system"][0]["text"]
+    assert first["system"][1] != second["system"][1]
+    assert "S&P 500" in first["messages"][0]["content"][0]["text"]
+    assert "VIX" in second["messages"][0]["content"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_generate_report_records_token_usage():
+    """직접 호출한 요청은 캐시/비캐시 토큰 수를, 중복 제거된 요청은 0을 기록한다"""
+    client = _mock_client(json.dumps(REPORT_JSON))
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        first = await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS)
+        second = await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS)
+
+    assert first["usage"]["cache_read_input_tokens"] == 1200
+    assert first["usage"]["input_tokens"] == 50
+    assert second["usage"]["deduplicated"] is True
+    assert second["usage"]["input_tokens"] == 0
+
+
+# ──────────────────────────────────────────────
+# PartialReportParser 테스트
+# ──────────────────────────────────────────────
+
+def _feed_in_chunks(text: str, size: int) -> list[tuple[str, dict]]:
+    parser = PartialReportParser()
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 10_000])
+def test_partial_parser_emits_each_item_once(chunk_size):
+    """조각 크기와 무관하게 요약 3줄과 섹션을 순서대로 한 번씩 내보낸다"""
+    text = "```json\n" + json.dumps(REPORT_JSON, ensure_ascii=False) + "\n```"
+    events = _feed_in_chunks(text, chunk_size)
+
+    assert events == [
+        ("summary", {"line": 1, "text": "첫째"}),
+        ("summary", {"line": 2, "text": "둘째"}),
+        ("summary", {"line": 3, "text": "셋째"}),
+        ("section", {"index": 0, "title": "섹션", "content": "<p>내용</p>"}),
+    ]
+
+
+def test_partial_parser_handles_escapes_and_braces_in_strings():
+    """문자열 안의 따옴표·중괄호·대괄호는 구조로 오인하지 않는다"""
+    report = {
+        "summary_line1": 'say "hi" {not json}',
+        "sections": [{"title": "a]b", "content": "x {y} \\ z"}, {"title": "two", "content": ""}],
+    }
+    events = _feed_in_chunks(json.dumps(report), 3)
+
+    assert events[0] == ("summary", {"line": 1, "text": 'say "hi" {not json}'})
+    sections = [payload for name, payload in events if name == "section"]
+    assert [s["title"] for s in sections] == ["a]b", "two"]
+    assert sections[0]["content"] == "x {y} \\ z"
+
+
+def test_partial_parser_waits_for_incomplete_section():
+    """닫히지 않은 섹션은 완성될 때까지 내보내지 않는다"""
+    parser = PartialReportParser()
+    assert parser.feed('{"sections": [{"title": "a", "content": "par') == []
+    assert parser.feed('tial"}') == [("section", {"index": 0, "title": "a", "content": "partial"})]
+
+
+# ──────────────────────────────────────────────
+# Message Batches 테스트
+# ──────────────────────────────────────────────
+
+class FakeBatchBackend(BatchBackend):
+    """로컬 가짜 배치 서버: 두 번째 폴링에서 완료되며, 프롬프트의 레벨 라벨로 실패 항목을 지정한다"""
+
+    def __init__(self, text: str, fail_levels: tuple[str, ...] = ()):
+        self.text = text
+        self.fail_levels = fail_levels
+        self.submitted: list[dict] = []
+        self.polls = 0
+        self.cancelled: list[str] = []
+
+    async def submit(self, requests):
+        self.submitted = list(requests)
+        return "batch_1"
+
+    async def is_done(self, batch_id):
+        self.polls += 1
+        return self.polls >= 2
+
+    async def cancel(self, batch_id):
+        self.cancelled.append(batch_id)
+
+    async def results(self, batch_id):
+        results = {}
+        for req in self.submitted:
+            prompt = "".join(block["text"] for block in req["params"]["messages"][0]["content"])
+            failed = any(level in prompt for level in self.fail_levels)
+            results[req["custom_id"]] = None if failed else self.text
+        return results
+
+
+def test_batch_backend_requires_cancel():
+    """취소를 구현하지 않은 배치 백엔드는 인스턴스를 만들 수 없다 (max_wait 초과 시 필요)"""
+    class _NoCancel(BatchBackend):
+        async def submit(self, requests):
+            return "batch_1"
+
+        async def is_done(self, batch_id):
+            return True
+
+        async def results(self, batch_id):
+            return {}
+
+    with pytest.raises(TypeError):
+        _NoCancel()
+
+
+@pytest.mark.asyncio
+async def test_batch_prefetch_seeds_cache_and_skips_realtime_calls():
+    """배치 결과가 캐시에 적재되어 이후 generate_report는 실시간 호출을 하지 않는다"""
+    backend = FakeBatchBackend(json.dumps(REPORT_JSON))
+    client = _mock_client(json.dumps(REPORT_JSON))
+    items = [
+        (INDICATOR_DATA, ReportLevel.STANDARD),
+        (INDICATOR_DATA, ReportLevel.STANDARD),
+        (INDICATOR_DATA, ReportLevel.EXPERT),
+    ]
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        seeded = await prefetch_reports_batch(items, CONFIGS, backend=backend, poll_interval=0)
+        for data, level in items:
+            result = await generate_report(data, level, CONFIGS)
+            assert result["title"] == "테스트 리포트"
+
+    assert len(backend.submitted) == 2  # 동일 입력은 한 요청으로 합쳐짐
+    assert seeded == 2
+    assert backend.polls == 2
+    client.messages.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_prefetch_cache_survives_midnight_with_fixed_report_date():
+    """실행 단위로 고정한 리포트 기준일을 쓰면 배치가 자정을 넘겨 끝나도 캐시 키가 같다"""
+    run_date = date(2024, 10, 1)
+
+    class _NextDay(date):
+        @classmethod
+        def today(cls):
+            return run_date + timedelta(days=1)
+
+    backend = FakeBatchBackend(json.dumps(REPORT_JSON))
+    client = _mock_client(json.dumps(REPORT_JSON))
+    items = [(INDICATOR_DATA, ReportLevel.STANDARD)]
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        await prefetch_reports_batch(items, CONFIGS, report_date=run_date, backend=backend, poll_interval=0)
+        with patch("app.services.ai_service.date", _NextDay):
+            await generate_report(INDICATOR_DATA, ReportLevel.STANDARD, CONFIGS, report_date=run_date)
+
+    assert "2024년 10월 01일" in backend.submitted[0]["params"]["system"][0]["text"]
+    client.messages.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_prefetch_failed_items_fall_back_to_realtime():
+    """배치에서 실패한 항목은 적재되지 않고 실시간 호출로 대체된다"""
+    backend = FakeBatchBackend(json.dumps(REPORT_JSON), fail_levels=("[전문가]",))
+    client = _mock_client(json.dumps(REPORT_JSON))
+    items = [(INDICATOR_DATA, ReportLevel.STANDARD), (INDICATOR_DATA, ReportLevel.EXPERT)]
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        seeded = await prefetch_reports_batch(items, CONFIGS, backend=backend, poll_interval=0)
+        for data, level in items:
+            await generate_report(data, level, CONFIGS)
+
+    assert seeded == 1
+    assert client.messages.create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_results_survive_more_prompts_than_cache_entries():
+    """실행 단위 결과 dict를 쓰면 프롬프트 수가 공용 캐시 크기를 넘어도 실시간 호출이 없다"""
+    backend = FakeBatchBackend(json.dumps(REPORT_JSON))
+    client = _mock_client(json.dumps(REPORT_JSON))
+    items = [
+        ({"sp500": {**INDICATOR_DATA["sp500"], "value": 5800.0 + i}}, ReportLevel.STANDARD)
+        for i in range(6)
+    ]
+    results: dict[str, dict] = {}
+    with patch("app.services.ai_service.client", client), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache(max_entries=2)):
+        seeded = await prefetch_reports_batch(
+            items, CONFIGS, backend=backend, poll_interval=0, results=results
+        )
+        for data, level in items:
+            result = await generate_report(data, level, CONFIGS, batch_results=results)
+            assert result["title"] == "테스트 리포트"
+
+    assert seeded == len(results) == 6
+    client.messages.create.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_prefetch_gives_up_after_max_wait():
+    """최대 대기 시간 안에 끝나지 않으면 배치를 취소하고 아무것도 적재하지 않는다"""
+    backend = FakeBatchBackend(json.dumps(REPORT_JSON))
+    backend.is_done = AsyncMock(return_value=False)
+    with patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        seeded = await prefetch_reports_batch(
+            [(INDICATOR_DATA, ReportLevel.STANDARD)], CONFIGS,
+            backend=backend, poll_interval=0.01, max_wait=0.03,
+        )
+    assert seeded == 0
+    assert backend.cancelled == ["batch_1"]
+
+
+@pytest.mark.asyncio
+async def test_anthropic_batch_backend_against_local_server():
+    """AnthropicBatchBackend가 배치 생성·조회·결과 JSONL·취소를 올바르게 처리한다"""
+    base = "http://batch.test"
+    batch = {
+        "id": "msgbatch_1", "type": "message_batch", "processing_status": "ended",
+        "created_at": "2024-10-01T00:00:00Z", "expires_at": "2024-10-02T00:00:00Z",
+        "request_counts": {"processing": 0, "succeeded": 1, "errored": 1, "canceled": 0, "expired": 0},
+        "results_url": f"{base}/v1/messages/batches/msgbatch_1/results",
+    }
+    message = {
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "claude",
+        "content": [{"type": "text", "text": "hello"}],
+        "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 1, "output_tokens": 1},
+    }
+    lines = [
+        {"custom_id": "a", "result": {"type": "succeeded", "message": message}},
+        {"custom_id": "b", "result": {"type": "errored",
+                                      "error": {"type": "error", "error": {"type": "api_error", "message": "x"}}}},
+    ]
+    jsonl = "\n".join(json.dumps(line) for line in lines)
+
+    with respx.mock(base_url=base) as server:
+        create = server.post("/v1/messages/batches").mock(return_value=httpx.Response(200, json=batch))
+        server.get("/v1/messages/batches/msgbatch_1").mock(return_value=httpx.Response(200, json=batch))
+        server.get("/v1/messages/batches/msgbatch_1/results").mock(
+            return_value=httpx.Response(200, text=jsonl)
+        )
+        cancel = server.post("/v1/messages/batches/msgbatch_1/cancel").mock(
+            return_value=httpx.Response(200, json={**batch, "processing_status": "canceling"})
+        )
+        backend = AnthropicBatchBackend(AsyncAnthropic(api_key="test", base_url=base))
+
+        batch_id = await backend.submit([{"custom_id": "a", "params": {
+            "model": "claude", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}],
+        }}])
+        assert batch_id == "msgbatch_1"
+        assert await backend.is_done(batch_id)
+        assert await backend.results(batch_id) == {"a": "hello", "b": None}
+        assert json.loads(create.calls[0].request.content)["requests"][0]["custom_id"] == "a"
+        await backend.cancel(batch_id)
+        assert cancel.called
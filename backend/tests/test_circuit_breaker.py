@@ -0,0 +1,97 @@
+"""
+circuit_breaker.py 단위 테스트
+
+- 연속 실패 임계값 도달 시 open, 성공 시 실패 횟수 초기화
+- cooldown 경과 후 half_open 시험 요청 1회만 허용
+- 시험 요청 성공 시 closed, 실패 시 다시 open
+"""
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from .conftest import FakeClock
+
+
+def _breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker("yahoo", failure_threshold=3, cooldown=60, clock=clock)
+
+
+def test_opens_after_consecutive_failures(fake_clock):
+    breaker = _breaker(fake_clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure(TimeoutError("timed out"))
+    assert breaker.state == CLOSED
+
+    breaker.record_failure(TimeoutError("timed out"))
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.snapshot()["total_rejected"] == 1
+    assert breaker.snapshot()["retry_after_seconds"] == 60
+
+
+def test_success_resets_consecutive_failures(fake_clock):
+    breaker = _breaker(fake_clock)
+    breaker.record_failure(RuntimeError("a"))
+    breaker.record_failure(RuntimeError("b"))
+    breaker.record_success()
+    breaker.record_failure(RuntimeError("c"))
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["consecutive_failures"] == 1
+    assert breaker.snapshot()["total_failures"] == 3
+
+
+def test_half_open_allows_single_probe_and_closes_on_success(fake_clock):
+    breaker = _breaker(fake_clock)
+    for _ in range(3):
+        breaker.record_failure(RuntimeError("down"))
+
+    fake_clock.now = 60
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # 시험 요청 진행 중에는 나머지 요청 차단
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_for_full_cooldown(fake_clock):
+    breaker = _breaker(fake_clock)
+    for _ in range(3):
+        breaker.record_failure(RuntimeError("down"))
+
+    fake_clock.now = 61
+    assert breaker.allow()
+    breaker.record_failure(RuntimeError("still down"))
+
+    assert breaker.state == OPEN
+    fake_clock.now = 120
+    assert not breaker.allow()
+    fake_clock.now = 121
+    assert breaker.allow()
+
+
+def test_aborted_probe_releases_slot(fake_clock):
+    breaker = _breaker(fake_clock)
+    for _ in range(3):
+        breaker.record_failure(RuntimeError("down"))
+    fake_clock.now = 60
+    assert breaker.allow()
+
+    breaker.abort()
+
+    assert breaker.allow()
+
+
+def test_last_error_keeps_only_sanitized_description(capsys, fake_clock):
+    """헬스 체크로 공개되는 last_error와 로그에는 원본 예외 메시지(키가 든 URL 등)를 남기지 않는다"""
+    from app.services.http_client import UpstreamError
+
+    breaker = _breaker(fake_clock)
+    breaker.record_failure(RuntimeError("GET https://api.example.com/x?api_key=secret"))
+    assert breaker.snapshot()["last_error"] == "RuntimeError"
+
+    breaker.record_failure(UpstreamError("FRED", 500, "https://api.stlouisfed.org/fred/series/observations"))
+    breaker.record_failure(UpstreamError("FRED", 500, "https://api.stlouisfed.org/fred/series/observations"))
+    assert breaker.snapshot()["last_error"] == "FRED HTTP 500 (https://api.stlouisfed.org/fred/series/observations)"
+    assert "secret" not in capsys.readouterr().out
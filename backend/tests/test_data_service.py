@@ -0,0 +1,749 @@
+"""
+data_service.py 단위 테스트
+
+- IndicatorCache: TTL 만료, LRU 제한, hit/miss 카운터, 무효화
+- DataService.fetch_all_indicators: 캐시 우선 조회, 오류 결과 미캐시
+- IndicatorSnapshot: 불변성, 사용자별 view
+- DataService.fetch_live: stale-while-revalidate, 갱신 병합
+- ObservationStore: 시계열 저장/조회, 증분 수집
+- 소스 어댑터: 설정 기반 라우팅, 소스별 일괄 수집 (FRED/Yahoo Finance/World Bank 세미콜론 묶음·페이지네이션)
+- 서킷 브레이커: 소스 차단 시 즉시 실패, stale 캐시 대체, 수집 제한 시간
+"""
+import asyncio
+import threading
+
+import httpx
+import pandas as pd
+import pytest
+import respx
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.config import settings
+from app.services import sources as sources_module
+from app.services.data_service import (
+    DataService,
+    IndicatorCache,
+    IndicatorSnapshot,
+    UPDATE_FREQUENCY_TTL,
+    _build_ttl_map,
+    _load_indicator_configs,
+)
+from app.services.fred_client import FRED_API_BASE, FredClient
+from app.services.indicator_store import ObservationStore
+from app.services.sources import SourceAdapter, SourceRegistry, summarize_series
+from .conftest import FakeClock
+
+
+def _sample(indicator_id: str, value: float = 1.0) -> dict:
+    return {"indicator_id": indicator_id, "value": value, "source": "FRED"}
+
+
+class FakeSource(SourceAdapter):
+    """모든 지표를 담당하고 지표별로 fetch 목을 호출하는 테스트용 어댑터"""
+    name = "fake"
+
+    def __init__(self, service, fetch: AsyncMock):
+        super().__init__(service)
+        self.fetch = fetch
+        self.batches: list[list[str]] = []
+
+    def key_for(self, config):
+        return config["id"]
+
+    async def fetch_many(self, indicator_ids):
+        self.batches.append(list(indicator_ids))
+        results = await asyncio.gather(*(self.fetch(i) for i in indicator_ids), return_exceptions=True)
+        return dict(zip(indicator_ids, results))
+
+
+def _stub_fetch(service: DataService, **mock_kwargs) -> AsyncMock:
+    """service의 소스 레지스트리를 FakeSource 하나로 교체하고 지표별 fetch 목 반환"""
+    fetch = AsyncMock(**mock_kwargs)
+    service.sources = SourceRegistry([FakeSource(service, fetch)], _load_indicator_configs())
+    return fetch
+
+
+# ──────────────────────────────────────────────
+# IndicatorCache 테스트
+# ──────────────────────────────────────────────
+
+def test_ttl_map_follows_update_frequency():
+    """update_frequency에 따라 지표별 TTL이 결정된다"""
+    ttl_map = _build_ttl_map([
+        {"id": "fed_funds_rate", "update_frequency": "daily"},
+        {"id": "us_gdp", "update_frequency": "quarterly"},
+        {"id": "weird", "update_frequency": "hourly"},
+    ])
+    assert ttl_map["fed_funds_rate"] == UPDATE_FREQUENCY_TTL["daily"]
+    assert ttl_map["us_gdp"] == UPDATE_FREQUENCY_TTL["quarterly"]
+    assert ttl_map["weird"] > 0
+
+
+def test_cache_hit_and_miss_counters(fake_clock):
+    """저장 전 조회는 miss, 저장 후 조회는 hit으로 집계된다"""
+    cache = IndicatorCache({}, clock=fake_clock)
+    assert cache.get("sp500") is None
+    cache.set("sp500", _sample("sp500"))
+    assert cache.get("sp500")["value"] == 1.0
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_cache_entry_expires_after_ttl(fake_clock):
+    """TTL이 지나면 캐시 값이 만료된다"""
+    cache = IndicatorCache({"sp500": 60}, clock=fake_clock)
+    cache.set("sp500", _sample("sp500"))
+
+    fake_clock.now = 59
+    assert cache.get("sp500") is not None
+    fake_clock.now = 60
+    assert cache.get("sp500") is None
+
+
+def test_cache_evicts_least_recently_used(fake_clock):
+    """최대 크기를 넘으면 가장 오래 사용되지 않은 항목이 제거된다"""
+    cache = IndicatorCache({}, max_entries=2, clock=fake_clock)
+    cache.set("a", _sample("a"))
+    cache.set("b", _sample("b"))
+    cache.get("a")  # a를 최근 사용으로 갱신
+    cache.set("c", _sample("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cache_invalidate_single_and_all(fake_clock):
+    """특정 지표 또는 전체 캐시를 무효화할 수 있다"""
+    cache = IndicatorCache({}, clock=fake_clock)
+    cache.set("a", _sample("a"))
+    cache.set("b", _sample("b"))
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_returns_copy(fake_clock):
+    """반환된 dict를 수정해도 캐시 원본은 변하지 않는다"""
+    cache = IndicatorCache({}, clock=fake_clock)
+    cache.set("a", _sample("a"))
+    cache.get("a")["value"] = 999
+    assert cache.get("a")["value"] == 1.0
+
+
+# ──────────────────────────────────────────────
+# DataService 캐시 연동 테스트
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_fetch_all_indicators_uses_cache():
+    """같은 지표를 두 번 조회하면 원천 API는 한 번만 호출된다"""
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id))
+
+    first = await service.fetch_all_indicators(["sp500", "vix"])
+    second = await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert first == second
+    assert fetch.call_count == 2
+    assert service.cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_indicators_does_not_cache_errors():
+    """오류 결과는 캐시하지 않고 다음 호출에서 재시도한다"""
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=RuntimeError("upstream down"))
+
+    data = await service.fetch_all_indicators(["sp500"])
+    assert data["sp500"]["value"] is None
+    await service.fetch_all_indicators(["sp500"])
+
+    assert fetch.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_indicators_force_bypasses_cache():
+    """force=True면 캐시를 건너뛰고 다시 수집해 캐시를 갱신한다"""
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id))
+    await service.fetch_all_indicators(["sp500"])
+
+    await service.fetch_all_indicators(["sp500"], force=True)
+
+    assert fetch.call_count == 2
+    assert service.cache.get("sp500") is not None
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_indicators_preserves_request_order():
+    """캐시 hit/miss가 섞여도 요청 순서대로 결과를 반환한다"""
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id))
+    await service.fetch_all_indicators(["vix"])
+
+    data = await service.fetch_all_indicators(["sp500", "vix", "gold"])
+    assert list(data) == ["sp500", "vix", "gold"]
+
+
+def test_cache_peek_serves_stale_within_max_stale(fake_clock):
+    """TTL이 지나면 get은 miss지만 max_stale 이내면 peek으로 경과 시간과 함께 조회된다"""
+    cache = IndicatorCache({"sp500": 60}, max_stale=600, clock=fake_clock)
+    cache.set("sp500", _sample("sp500"))
+
+    fake_clock.now = 100
+    assert cache.get("sp500") is None
+    value, age = cache.peek("sp500")
+    assert value["value"] == 1.0
+    assert age == 100
+
+    fake_clock.now = 660
+    assert cache.peek("sp500") is None
+
+
+# ──────────────────────────────────────────────
+# DataService.fetch_live (stale-while-revalidate) 테스트
+# ──────────────────────────────────────────────
+
+def _swr_service(clock: FakeClock) -> DataService:
+    service = DataService()
+    service.cache = IndicatorCache({"sp500": 60, "vix": 60}, max_stale=600, clock=clock)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_fetch_live_returns_fresh_cache_without_fetch(fake_clock):
+    """TTL 이내 값은 원천 호출 없이 freshness 메타데이터와 함께 반환된다"""
+    service = _swr_service(fake_clock)
+    service.cache.set("sp500", _sample("sp500"))
+    fetch = _stub_fetch(service)
+    fake_clock.now = 10
+
+    data = await service.fetch_live(["sp500"])
+
+    assert data["sp500"]["value"] == 1.0
+    assert data["sp500"]["freshness"] == {"age_seconds": 10, "stale": False, "revalidating": False}
+    fetch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fetch_live_serves_stale_and_revalidates_once(fake_clock):
+    """오래된 값은 즉시 반환하고, 동시 요청의 백그라운드 갱신은 한 번으로 병합된다"""
+    service = _swr_service(fake_clock)
+    service.cache.set("sp500", _sample("sp500", 1.0))
+    release = asyncio.Event()
+
+    async def _slow_fetch(ind_id):
+        await release.wait()
+        return _sample(ind_id, 2.0)
+
+    fetch = _stub_fetch(service, side_effect=_slow_fetch)
+    fake_clock.now = 120
+
+    first, second = await asyncio.gather(
+        service.fetch_live(["sp500"]), service.fetch_live(["sp500"])
+    )
+    assert first["sp500"]["value"] == 1.0
+    assert first["sp500"]["freshness"]["stale"] is True
+    assert second["sp500"]["freshness"]["revalidating"] is True
+
+    release.set()
+    await asyncio.gather(*set(service._inflight.values()))
+    assert fetch.call_count == 1
+    refreshed = await service.fetch_live(["sp500"])
+    assert refreshed["sp500"]["value"] == 2.0
+    assert refreshed["sp500"]["freshness"]["stale"] is False
+
+
+@pytest.mark.asyncio
+async def test_fetch_live_refreshes_stale_indicators_in_one_batch(fake_clock):
+    """여러 지표가 오래되면 지표별이 아니라 한 번의 수집 작업으로 갱신한다"""
+    service = _swr_service(fake_clock)
+    service.cache.set("sp500", _sample("sp500"))
+    service.cache.set("vix", _sample("vix"))
+    _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id, 2.0))
+    fake_clock.now = 120
+
+    with patch.object(service, "fetch_all_indicators", wraps=service.fetch_all_indicators) as fetch_all:
+        data = await service.fetch_live(["sp500", "vix"])
+        await asyncio.gather(*set(service._inflight.values()))
+
+    assert all(data[i]["freshness"]["revalidating"] for i in ("sp500", "vix"))
+    fetch_all.assert_called_once_with(["sp500", "vix"])
+
+
+@pytest.mark.asyncio
+async def test_fetch_live_coalesces_concurrent_misses(fake_clock):
+    """캐시에 없는 지표를 동시에 요청하면 수집은 한 번만 일어난다"""
+    service = _swr_service(fake_clock)
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id))
+
+    results = await asyncio.gather(*(service.fetch_live(["sp500", "vix"]) for _ in range(5)))
+
+    assert fetch.call_count == 2
+    assert all(r["vix"]["value"] == 1.0 for r in results)
+    assert not service._inflight
+
+
+# ──────────────────────────────────────────────
+# IndicatorSnapshot 테스트
+# ──────────────────────────────────────────────
+
+def test_snapshot_is_read_only():
+    """스냅샷 내부 데이터는 수정할 수 없다"""
+    snapshot = IndicatorSnapshot({"sp500": _sample("sp500")})
+    with pytest.raises(TypeError):
+        snapshot._data["sp500"]["value"] = 0
+
+
+def test_snapshot_view_returns_independent_copies():
+    """view()는 요청 지표만 담은 수정 가능한 사본을 반환한다"""
+    snapshot = IndicatorSnapshot({"sp500": _sample("sp500"), "vix": _sample("vix")})
+    view = snapshot.view(["vix", "missing"])
+
+    assert list(view) == ["vix", "missing"]
+    assert view["missing"]["value"] is None
+    view["vix"]["value"] = 999
+    assert snapshot.view(["vix"])["vix"]["value"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_snapshot_deduplicates_ids():
+    """fetch_snapshot은 중복 지표를 한 번만 수집한다"""
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id))
+
+    snapshot = await service.fetch_snapshot(["sp500", "vix", "sp500"])
+
+    assert fetch.call_count == 2
+    assert len(snapshot) == 2
+
+
+# ──────────────────────────────────────────────
+# ObservationStore / 증분 수집 테스트
+# ──────────────────────────────────────────────
+
+def test_store_upsert_and_history(tmp_path):
+    """같은 날짜는 덮어쓰고, history는 최근 N개를 날짜 오름차순으로 반환한다"""
+    store = ObservationStore(str(tmp_path / "obs.db"))
+    store.upsert("fred:DFF", [("2024-01-01", 5.0), ("2024-01-02", 5.1), ("2024-01-03", 5.2)])
+    store.upsert("fred:DFF", [("2024-01-03", 5.3)])
+
+    assert store.last_date("fred:DFF") == "2024-01-03"
+    assert store.last_date("fred:UNKNOWN") is None
+    assert store.history("fred:DFF", 2) == [("2024-01-02", 5.1), ("2024-01-03", 5.3)]
+    store.close()
+
+
+def _service_with_store(tmp_path, monkeypatch) -> DataService:
+    """FRED 키가 설정된 상태로 구성한 DataService (로컬 저장소는 tmp_path)"""
+    monkeypatch.setattr(settings, "FRED_API_KEY", "test-key")
+    service = DataService()
+    service.store = ObservationStore(str(tmp_path / "obs.db"))
+    return service
+
+
+def _fred_response(observations: list[tuple[str, str]]) -> httpx.Response:
+    """FRED series/observations JSON 응답 (sort_order=desc)"""
+    return httpx.Response(200, json={
+        "observations": [{"date": d, "value": v} for d, v in observations],
+    })
+
+
+@pytest.mark.asyncio
+async def test_fetch_fred_requests_only_new_observations(tmp_path, monkeypatch):
+    """저장된 데이터가 있으면 마지막 저장일부터 최근 관측치만 JSON으로 요청한다"""
+    service = _service_with_store(tmp_path, monkeypatch)
+    service.store.upsert("fred:DFF", [("2024-01-01", 5.0), ("2024-01-02", 5.25)])
+
+    with respx.mock:
+        route = respx.get(f"{FRED_API_BASE}/series/observations").mock(
+            return_value=_fred_response([("2024-01-03", "5.5"), ("2024-01-02", "5.25")])
+        )
+        result = (await service.sources["fred"].fetch_many(["fed_funds_rate"]))["fed_funds_rate"]
+    await service.close()
+
+    params = route.calls[0].request.url.params
+    assert params["observation_start"] == "2024-01-02"
+    assert params["sort_order"] == "desc"
+    assert params["file_type"] == "json"
+    assert int(params["limit"]) > 0
+    assert result["value"] == 5.5
+    assert result["prev_value"] == 5.25
+    assert [h["date"] for h in result["history"]] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_fred_serves_history_from_store(tmp_path, monkeypatch):
+    """원천 응답이 비어도 저장된 history로 결과를 만든다"""
+    service = _service_with_store(tmp_path, monkeypatch)
+    service.store.upsert("fred:DFF", [("2024-01-01", 5.0), ("2024-01-02", 5.25)])
+
+    with respx.mock:
+        respx.get(f"{FRED_API_BASE}/series/observations").mock(return_value=_fred_response([]))
+        result = (await service.sources["fred"].fetch_many(["fed_funds_rate"]))["fed_funds_rate"]
+    await service.close()
+
+    assert result["value"] == 5.25
+    assert len(result["history"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_fred_runs_store_io_off_event_loop(tmp_path, monkeypatch):
+    """FRED 수집의 로컬 저장소 조회/저장은 이벤트 루프 스레드가 아닌 수집 스레드 풀에서 실행된다"""
+    service = _service_with_store(tmp_path, monkeypatch)
+    loop_thread = threading.get_ident()
+    store_threads = []
+    original_upsert = service.store.upsert
+
+    def _upsert(*args):
+        store_threads.append(threading.get_ident())
+        original_upsert(*args)
+
+    service.store.upsert = _upsert
+    with respx.mock:
+        respx.get(f"{FRED_API_BASE}/series/observations").mock(
+            return_value=_fred_response([("2024-01-02", "5.25"), ("2024-01-01", "5.0")])
+        )
+        result = (await service.sources["fred"].fetch_many(["fed_funds_rate"]))["fed_funds_rate"]
+    stats = service.executor.stats()["sources"]["store"]
+    await service.close()
+
+    assert result["value"] == 5.25
+    assert store_threads and loop_thread not in store_threads
+    assert stats["completed"] == 2  # last_date + store_and_load
+
+
+@pytest.mark.asyncio
+async def test_fred_client_skips_missing_values():
+    """FRED 결측 표기(".")는 건너뛰고 날짜 오름차순으로 반환한다"""
+    service = DataService()
+    client = FredClient("test-key", lambda: service.http)
+
+    with respx.mock:
+        respx.get(f"{FRED_API_BASE}/series/observations").mock(
+            return_value=_fred_response([("2024-01-03", "."), ("2024-01-02", "4.1"), ("2024-01-01", "4.0")])
+        )
+        observations = await client.observations("DGS10", "2024-01-01", 12)
+    await service.close()
+
+    assert observations == [("2024-01-01", 4.0), ("2024-01-02", 4.1)]
+
+
+def test_summarize_series_guards_zero_prev():
+    """이전 값이 0이면 change_pct는 None이다"""
+    result = summarize_series("x", ["2024-01-01", "2024-01-02"], [0.0, 1.0], "FRED")
+    assert result["change"] == 1.0
+    assert result["change_pct"] is None
+
+
+def test_summarize_series_matches_legacy_shape():
+    """결측치 제거·반올림·날짜 포맷 결과가 기존 pandas 경로와 같다"""
+    series = pd.Series(
+        [100.123, float("nan"), 101.456, 103.789],
+        index=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]),
+    )
+    result = summarize_series("sp500", series.index.values, series.to_numpy(), "Yahoo Finance", ndigits=2)
+
+    clean = series.dropna()
+    assert result["value"] == round(float(clean.iloc[-1]), 2)
+    assert result["prev_value"] == round(float(clean.iloc[-2]), 2)
+    assert result["change"] == round(float(clean.iloc[-1] - clean.iloc[-2]), 2)
+    assert result["change_pct"] == round(float((clean.iloc[-1] - clean.iloc[-2]) / clean.iloc[-2] * 100), 2)
+    assert result["date"] == "2024-01-04"
+    assert result["history"] == [
+        {"date": d.strftime("%Y-%m-%d"), "value": round(float(v), 2)} for d, v in clean.items()
+    ]
+    assert all(type(h["value"]) is float for h in result["history"])
+
+
+def test_summarize_series_rejects_all_missing():
+    """유효한 관측치가 없으면 ValueError"""
+    with pytest.raises(ValueError):
+        summarize_series("x", ["2024-01-01"], [float("nan")], "FRED")
+
+
+# ──────────────────────────────────────────────
+# Yahoo Finance 일괄 다운로드 테스트
+# ──────────────────────────────────────────────
+
+def _download_frame(closes: dict[str, list[float]], dates: list[str]) -> pd.DataFrame:
+    """yf.download(group_by="ticker") 형태의 MultiIndex 프레임 생성"""
+    index = pd.to_datetime(dates)
+    return pd.concat(
+        {ticker: pd.DataFrame({"Close": values}, index=index) for ticker, values in closes.items()},
+        axis=1,
+    )
+
+
+@pytest.fixture
+def yf_download(monkeypatch):
+    monkeypatch.setattr(settings, "FRED_API_KEY", "")
+    monkeypatch.setattr(sources_module, "HAS_YFINANCE", True)
+    download = MagicMock()
+    monkeypatch.setattr(sources_module.yf, "download", download, raising=False)
+    return download
+
+
+@pytest.mark.asyncio
+async def test_yfinance_indicators_fetched_in_one_download(yf_download):
+    """여러 Yahoo Finance 지표를 한 번의 다운로드로 수집하고 지표별로 분리한다"""
+    yf_download.return_value = _download_frame(
+        {"^GSPC": [100.0, 110.0], "^VIX": [20.0, 15.0]}, ["2024-01-02", "2024-01-03"]
+    )
+    service = DataService()
+    service.store = None
+
+    data = await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert yf_download.call_count == 1
+    assert sorted(yf_download.call_args.args[0]) == ["^GSPC", "^VIX"]
+    assert data["sp500"]["value"] == 110.0
+    assert data["sp500"]["change_pct"] == 10.0
+    assert data["vix"]["prev_value"] == 20.0
+    assert data["vix"]["source"] == "Yahoo Finance"
+    assert set(data["sp500"]) == {
+        "indicator_id", "value", "prev_value", "change", "change_pct", "date", "history", "source",
+    }
+
+
+@pytest.mark.asyncio
+async def test_yfinance_batch_isolates_missing_ticker(yf_download):
+    """다운로드에서 빠진 티커만 오류로 처리하고 나머지는 정상 반환한다"""
+    yf_download.return_value = _download_frame({"^GSPC": [100.0, 101.0]}, ["2024-01-02", "2024-01-03"])
+    service = DataService()
+    service.store = None
+
+    data = await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert data["sp500"]["value"] == 101.0
+    assert data["vix"]["value"] is None
+    assert "error" in data["vix"]
+
+
+@pytest.mark.asyncio
+async def test_yfinance_batch_starts_from_oldest_stored_date(tmp_path, yf_download):
+    """저장소가 있으면 티커들 중 가장 오래된 마지막 저장일부터 요청한다"""
+    yf_download.return_value = _download_frame(
+        {"^GSPC": [110.0], "^VIX": [15.0]}, ["2024-01-03"]
+    )
+    service = DataService()
+    service.store = ObservationStore(str(tmp_path / "obs.db"))
+    service.store.upsert("yahoo:^GSPC", [("2024-01-02", 100.0)])
+    service.store.upsert("yahoo:^VIX", [("2023-12-29", 20.0)])
+
+    results = await service.sources["yahoo"].fetch_many(["sp500", "vix"])
+
+    assert yf_download.call_args.kwargs["start"] == "2023-12-29"
+    assert results["sp500"]["prev_value"] == 100.0
+    assert results["vix"]["prev_value"] == 20.0
+
+
+# ──────────────────────────────────────────────
+# World Bank 일괄 요청 테스트
+# ──────────────────────────────────────────────
+
+def _wb_entry(wb_id: str, date: str, value) -> dict:
+    return {
+        "indicator": {"id": wb_id},
+        "country": {"id": "KR"},
+        "countryiso3code": "KOR",
+        "date": date,
+        "value": value,
+    }
+
+
+@pytest.mark.asyncio
+async def test_world_bank_indicators_fetched_in_one_request():
+    """한국 GDP/CPI/실업률은 한 번의 요청으로 수집되어 지표별로 분리된다"""
+    payload = [{"page": 1, "pages": 1}, [
+        _wb_entry("NY.GDP.MKTP.CD", "2023", 1.7e12),
+        _wb_entry("FP.CPI.TOTL.ZG", "2023", 3.6),
+        _wb_entry("FP.CPI.TOTL.ZG", "2022", 5.1),
+        _wb_entry("SL.UEM.TOTL.ZS", "2023", None),
+        _wb_entry("SL.UEM.TOTL.ZS", "2022", 2.9),
+    ]]
+    service = DataService()
+    service.store = None
+
+    with respx.mock:
+        route = respx.get(url__startswith="https://api.worldbank.org/").mock(
+            return_value=httpx.Response(200, json=payload)
+        )
+        data = await service.fetch_all_indicators(["kr_gdp", "kr_cpi", "kr_unemployment"])
+    await service.close()
+
+    assert route.call_count == 1
+    request = route.calls[0].request
+    assert "FP.CPI.TOTL.ZG;NY.GDP.MKTP.CD;SL.UEM.TOTL.ZS" in request.url.path
+    assert request.url.params["source"] == "2"
+    assert data["kr_gdp"]["value"] == 1.7e12
+    assert [h["value"] for h in data["kr_cpi"]["history"]] == [5.1, 3.6]
+    assert data["kr_cpi"]["prev_value"] == 5.1
+    assert data["kr_unemployment"]["value"] == 2.9
+
+
+@pytest.mark.asyncio
+async def test_world_bank_batch_follows_pagination():
+    """여러 페이지 응답을 모두 읽고, 데이터가 없는 지표만 오류로 처리한다"""
+    pages = {
+        "1": [{"page": 1, "pages": 2}, [_wb_entry("FP.CPI.TOTL.ZG", "2023", 3.6)]],
+        "2": [{"page": 2, "pages": 2}, [_wb_entry("NY.GDP.MKTP.CD", "2023", 1.7e12)]],
+    }
+    service = DataService()
+    service.store = None
+
+    with respx.mock:
+        route = respx.get(url__startswith="https://api.worldbank.org/").mock(
+            side_effect=lambda request: httpx.Response(200, json=pages[request.url.params["page"]])
+        )
+        results = await service.sources["worldbank"].fetch_many(["kr_gdp", "kr_cpi", "kr_unemployment"])
+    await service.close()
+
+    assert route.call_count == 2
+    assert results["kr_cpi"]["value"] == 3.6
+    assert results["kr_gdp"]["value"] == 1.7e12
+    assert isinstance(results["kr_unemployment"], ValueError)
+
+
+# ──────────────────────────────────────────────
+# 소스 어댑터 레지스트리 테스트
+# ──────────────────────────────────────────────
+
+def test_registry_routes_by_config_fields(monkeypatch):
+    """설정의 소스 필드로 라우팅하며, FRED 키가 없으면 yahoo_symbol로 대체된다"""
+    monkeypatch.setattr(sources_module, "HAS_YFINANCE", True)
+
+    monkeypatch.setattr(settings, "FRED_API_KEY", "test-key")
+    with_fred = DataService().sources
+    assert with_fred.routes["sp500"].name == "fred"
+    assert with_fred["fred"].keys["us_cpi"] == "CPIAUCSL"
+    assert with_fred.routes["kospi"].name == "yahoo"
+    assert with_fred.routes["kr_gdp"].name == "worldbank"
+
+    monkeypatch.setattr(settings, "FRED_API_KEY", "")
+    without_fred = DataService().sources
+    assert without_fred.routes["sp500"].name == "yahoo"
+    assert "us_cpi" not in without_fred.routes
+
+
+def test_source_adapter_requires_key_for_and_fetch_many():
+    """key_for/fetch_many 중 하나라도 빠진 어댑터는 인스턴스를 만들 수 없다"""
+    class _KeyOnly(SourceAdapter):
+        name = "partial"
+
+        def key_for(self, config):
+            return config["id"]
+
+    with pytest.raises(TypeError):
+        _KeyOnly(DataService())
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_indicators_dispatches_one_batch_per_source():
+    """요청 지표를 소스별로 묶어 소스마다 fetch_many를 한 번 호출하고, 미지원 지표는 오류로 둔다"""
+    service = DataService()
+    first = FakeSource(service, AsyncMock(side_effect=lambda ind_id: _sample(ind_id)))
+    second = FakeSource(service, AsyncMock(side_effect=lambda ind_id: _sample(ind_id)))
+    second.name = "fake2"
+    second.key_for = lambda config: config["id"] if config["id"].startswith("kr_") else None
+    service.sources = SourceRegistry(
+        [second, first], [{"id": "sp500"}, {"id": "vix"}, {"id": "kr_gdp"}, {"id": "kr_cpi"}]
+    )
+
+    data = await service.fetch_all_indicators(["sp500", "kr_gdp", "vix", "kr_cpi", "unknown"])
+
+    assert first.batches == [["sp500", "vix"]]
+    assert second.batches == [["kr_gdp", "kr_cpi"]]
+    assert list(data) == ["sp500", "kr_gdp", "vix", "kr_cpi", "unknown"]
+    assert data["unknown"]["error"] == "unsupported indicator"
+
+
+# ──────────────────────────────────────────────
+# 소스별 서킷 브레이커
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling_source(monkeypatch):
+    """연속 실패로 차단된 소스는 cooldown 동안 호출하지 않는다"""
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    service = DataService()
+    fetch = _stub_fetch(service, side_effect=httpx.ConnectError("refused"))
+
+    await service.fetch_all_indicators(["sp500"])
+    await service.fetch_all_indicators(["sp500"])
+    data = await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert fetch.call_count == 2
+    assert "circuit open" in data["sp500"]["error"]
+    assert service.source_health()["sources"]["fake"]["state"] == "open"
+    assert service.source_health()["status"] == "degraded"
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_falls_back_to_stale_cache(fake_clock):
+    """수집 실패 시 max_stale 이내의 마지막 캐시 값을 stale 표시와 함께 반환하고 다시 캐시하지 않는다"""
+    service = DataService()
+    service.cache = IndicatorCache({"sp500": 10}, max_stale=100, clock=fake_clock)
+    fetch = _stub_fetch(service, side_effect=lambda ind_id: _sample(ind_id, 42.0))
+    await service.fetch_all_indicators(["sp500"])
+
+    fake_clock.now = 20
+    fetch.side_effect = httpx.ConnectError("refused")
+    data = await service.fetch_all_indicators(["sp500"])
+
+    assert data["sp500"]["value"] == 42.0
+    assert data["sp500"]["stale"] is True
+    assert data["sp500"]["stale_reason"] == "ConnectError"  # 원본 예외 메시지는 노출하지 않음
+    assert service.cache.peek("sp500")[1] == 20  # 대체 값으로 캐시 시각이 갱신되지 않음
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_error_does_not_leak_exception_text():
+    """원천 URL/키가 담길 수 있는 예외 메시지는 결과에 넣지 않고, UpstreamError만 그대로 노출한다"""
+    from app.services.http_client import UpstreamError
+
+    service = DataService()
+    _stub_fetch(service, side_effect=lambda ind_id: (
+        RuntimeError("GET https://api.example.com/x?api_key=secret failed") if ind_id == "sp500"
+        else UpstreamError("FRED", 400, "https://api.stlouisfed.org/fred/series/observations")
+    ))
+
+    data = await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert data["sp500"]["error"] == "RuntimeError"
+    assert data["vix"]["error"] == "FRED HTTP 400 (https://api.stlouisfed.org/fred/series/observations)"
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_failure_does_not_trip_breaker(monkeypatch):
+    """일부 지표만 실패한 일괄 수집은 소스 장애로 보지 않는다"""
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 1)
+    service = DataService()
+    _stub_fetch(service, side_effect=lambda ind_id: (
+        _sample(ind_id) if ind_id == "vix" else ValueError(f"No data for {ind_id}")
+    ))
+
+    await service.fetch_all_indicators(["sp500", "vix"])
+
+    assert service.breakers["fake"].state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_slow_source_times_out_and_counts_as_failure(monkeypatch):
+    """제한 시간을 넘긴 소스는 TimeoutError로 끝나고 실패로 집계된다"""
+    monkeypatch.setattr(settings, "SOURCE_FETCH_TIMEOUT_SECONDS", 0.05)
+    service = DataService()
+
+    async def _hang(ind_id):
+        await asyncio.sleep(10)
+
+    _stub_fetch(service, side_effect=_hang)
+
+    data = await asyncio.wait_for(service.fetch_all_indicators(["sp500"]), timeout=2)
+
+    assert "timed out" in data["sp500"]["error"]
+    assert service.breakers["fake"].snapshot()["consecutive_failures"] == 1
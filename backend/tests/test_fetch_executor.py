@@ -0,0 +1,92 @@
+"""
+fetch_executor.py 단위 테스트
+
+- 전용 스레드 풀에서 실행
+- 소스별 동시 실행 제한 (이벤트 루프가 바뀌어도 유지)
+- 대기열/대기 시간/실패 지표 집계
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.fetch_executor import FetchExecutor
+
+
+class _ConcurrencyProbe:
+    """동시에 실행 중인 작업 수의 최댓값 기록"""
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(0.02)
+        with self._lock:
+            self.current -= 1
+        return value
+
+
+@pytest.mark.asyncio
+async def test_runs_on_dedicated_pool():
+    """작업은 기본 executor가 아닌 전용 풀 스레드에서 실행된다"""
+    executor = FetchExecutor(max_workers=2, source_limits={})
+    name = await executor.run("fred", lambda: threading.current_thread().name)
+    executor.shutdown()
+    assert name.startswith("mesa-fetch")
+
+
+@pytest.mark.asyncio
+async def test_source_limit_caps_concurrency():
+    """소스별 제한을 넘는 작업은 풀에 여유가 있어도 대기한다"""
+    executor = FetchExecutor(max_workers=8, source_limits={"fred": 2})
+    probe = _ConcurrencyProbe()
+
+    results = await asyncio.gather(*(executor.run("fred", probe, i) for i in range(6)))
+    executor.shutdown()
+
+    assert results == list(range(6))
+    assert probe.peak == 2
+
+
+def test_source_limit_survives_event_loop_change():
+    """같은 실행기를 다른 이벤트 루프에서 다시 써도 루프별 세마포어로 제한이 유지된다"""
+    executor = FetchExecutor(max_workers=8, source_limits={"fred": 2})
+
+    for _ in range(2):
+        probe = _ConcurrencyProbe()
+        asyncio.run(_gather(executor, probe))
+        assert probe.peak == 2
+    executor.shutdown()
+
+
+async def _gather(executor: FetchExecutor, probe: _ConcurrencyProbe):
+    return await asyncio.gather(*(executor.run("fred", probe, i) for i in range(4)))
+
+
+@pytest.mark.asyncio
+async def test_metrics_track_wait_and_failures():
+    """완료/실패 건수와 대기 시간이 집계되고 끝난 뒤 대기열은 비어 있다"""
+    executor = FetchExecutor(max_workers=1, source_limits={"yfinance": 1})
+
+    def _boom():
+        raise RuntimeError("rate limited")
+
+    await asyncio.gather(
+        executor.run("yfinance", time.sleep, 0.02),
+        executor.run("yfinance", time.sleep, 0.02),
+    )
+    with pytest.raises(RuntimeError):
+        await executor.run("yfinance", _boom)
+    stats = executor.stats()["sources"]["yfinance"]
+    executor.shutdown()
+
+    assert stats["completed"] == 2
+    assert stats["failed"] == 1
+    assert stats["queued"] == 0
+    assert stats["running"] == 0
+    assert stats["max_wait_seconds"] >= 0.01
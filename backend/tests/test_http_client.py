@@ -0,0 +1,106 @@
+"""
+http_client.py / DataService 공용 HTTP 클라이언트 테스트
+
+- get_json: 일시적 오류 재시도, 재시도 소진 시 예외
+- DataService: 클라이언트 수명주기, World Bank 호출 시 클라이언트 재사용
+"""
+import httpx
+import pytest
+import respx
+
+from app.services.data_service import DataService
+from app.services.http_client import UpstreamError, build_http_client, get_json
+
+
+@pytest.mark.asyncio
+async def test_get_json_retries_transient_errors():
+    """503/연결 오류 후 성공하면 최종 응답을 반환한다"""
+    with respx.mock:
+        route = respx.get("https://example.com/data").mock(side_effect=[
+            httpx.Response(503),
+            httpx.ConnectError("reset"),
+            httpx.Response(200, json={"ok": True}),
+        ])
+        async with build_http_client() as client:
+            data = await get_json(client, "https://example.com/data", retries=2, backoff=0)
+
+    assert data == {"ok": True}
+    assert route.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_get_json_raises_after_retries_exhausted():
+    """재시도를 모두 소진하면 마지막 상태 코드를 담은 UpstreamError를 올린다"""
+    with respx.mock:
+        route = respx.get("https://example.com/data").mock(return_value=httpx.Response(502))
+        async with build_http_client() as client:
+            with pytest.raises(UpstreamError) as exc_info:
+                await get_json(client, "https://example.com/data", retries=1, backoff=0)
+
+    assert route.call_count == 2
+    assert exc_info.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_get_json_does_not_retry_client_errors():
+    """404 같은 클라이언트 오류는 재시도하지 않는다"""
+    with respx.mock:
+        route = respx.get("https://example.com/data").mock(return_value=httpx.Response(404))
+        async with build_http_client() as client:
+            with pytest.raises(UpstreamError) as exc_info:
+                await get_json(client, "https://example.com/data", retries=3, backoff=0)
+
+    assert route.call_count == 1
+    assert exc_info.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_json_error_omits_query_and_redacted_secrets(capsys):
+    """오류/재시도 로그에는 쿼리 문자열(api_key)과 경로에 든 키가 남지 않는다"""
+    with respx.mock:
+        respx.get(url__startswith="https://api.stlouisfed.org/").mock(return_value=httpx.Response(400))
+        respx.get(url__startswith="https://ecos.example.com/").mock(
+            side_effect=[httpx.Response(503), httpx.ConnectError("reset")]
+        )
+        async with build_http_client() as client:
+            with pytest.raises(UpstreamError) as fred_error:
+                await get_json(
+                    client, "https://api.stlouisfed.org/fred/series/observations",
+                    params={"series_id": "CPIAUCSL", "api_key": "fred-secret"}, source="FRED", retries=0,
+                )
+            with pytest.raises(UpstreamError) as ecos_error:
+                await get_json(
+                    client, "https://ecos.example.com/api/StatisticSearch/ecos-secret/json",
+                    source="ECOS", redact=["ecos-secret"], retries=1, backoff=0,
+                )
+
+    assert str(fred_error.value) == "FRED HTTP 400 (https://api.stlouisfed.org/fred/series/observations)"
+    assert str(ecos_error.value) == "ECOS ConnectError (https://ecos.example.com/api/StatisticSearch/***/json)"
+    assert "secret" not in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_data_service_reuses_http_client():
+    """World Bank 지표들은 같은 공용 클라이언트로 호출되고 close() 후 정리된다"""
+    payload = [{"page": 1, "pages": 1}, [
+        {"indicator": {"id": "FP.CPI.TOTL.ZG"}, "countryiso3code": "KOR", "date": "2023", "value": 3.6},
+        {"indicator": {"id": "SL.UEM.TOTL.ZS"}, "countryiso3code": "KOR", "date": "2023", "value": 2.7},
+    ]]
+    service = DataService()
+    service.store = None
+    await service.open()
+    client = service.http
+
+    with respx.mock:
+        respx.get(url__startswith="https://api.worldbank.org/").mock(
+            return_value=httpx.Response(200, json=payload)
+        )
+        first = (await service.sources["worldbank"].fetch_many(["kr_cpi"]))["kr_cpi"]
+        await service.sources["worldbank"].fetch_many(["kr_unemployment"])
+        assert service.http is client
+
+    assert first["value"] == 3.6
+    assert first["source"] == "World Bank"
+
+    await service.close()
+    assert client.is_closed
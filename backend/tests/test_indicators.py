@@ -119,6 +119,16 @@ async def test_get_live_indicator_calls_data_service(client: AsyncClient, mock_d
     mock_data_service.assert_called_once_with(["sp500"])
 
 
+@pytest.mark.asyncio
+async def test_get_live_indicator_includes_freshness(client: AsyncClient):
+    """실시간 지표 응답에 캐시 경과 시간/갱신 여부 메타데이터 포함"""
+    resp = await client.get("/indicators/sp500/live")
+    freshness = resp.json()["freshness"]
+    assert freshness["stale"] is False
+    assert "age_seconds" in freshness
+    assert "revalidating" in freshness
+
+
 @pytest.mark.asyncio
 async def test_get_live_indicator_no_auth_required(client: AsyncClient):
     """실시간 지표 조회 — 인증 없이 접근 가능"""
@@ -193,3 +203,47 @@ async def test_post_live_indicators_no_auth_required(client: AsyncClient):
     """일괄 지표 조회 — 인증 없이 접근 가능"""
     resp = await client.post("/indicators/live", json=["sp500"])
     assert resp.status_code == 200
+
+
+# ──────────────────────────────────────────────
+# GET /indicators/metrics — 수집 지표
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_fetch_metrics_exposes_executor_and_cache(client: AsyncClient):
+    """수집 스레드 풀 설정과 캐시 통계를 반환"""
+    resp = await client.get("/indicators/metrics")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["executor"]["max_workers"] > 0
+    assert "yfinance" in data["executor"]["source_limits"]
+    assert "hits" in data["cache"]
+
+
+# ──────────────────────────────────────────────
+# GET /indicators/health — 소스별 서킷 브레이커 상태
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_source_health_reports_breaker_states(client: AsyncClient):
+    """소스별 브레이커 상태를 반환하고, open 소스가 있으면 degraded"""
+    from app.services.data_service import data_service
+    from app.services.http_client import UpstreamError
+
+    resp = await client.get("/indicators/health")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"] == "ok"
+    assert data["sources"]["worldbank"]["state"] == "closed"
+
+    breaker = data_service.breakers["worldbank"]
+    try:
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure(UpstreamError("World Bank", 503, "https://api.worldbank.org/v2/country/KOR"))
+        data = (await client.get("/indicators/health")).json()
+    finally:
+        breaker.record_success()
+
+    assert data["status"] == "degraded"
+    assert data["sources"]["worldbank"]["state"] == "open"
+    assert data["sources"]["worldbank"]["last_error"] == "World Bank HTTP 503 (https://api.worldbank.org/v2/country/KOR)"
@@ -0,0 +1,151 @@
+"""
+job_queue.py 단위 테스트
+
+- SQLJobStore: report_jobs 테이블 기반 작업 저장/조회/중복 확인
+- ReportJobQueue: 재시작 시 대기 작업 복구, 사용자별 중복 등록 방지, 작업 오류 후 워커 유지
+"""
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.models.base import Base
+from app.models.report import Report
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.models.user import ReportLevel, User
+from app.services.job_queue import InMemoryJobStore, JobStore, ReportJobQueue, SQLJobStore
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """작업 저장소용 임시 파일 SQLite (세션 간 데이터 공유)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        db.add(User(id=1, email="job@example.com", hashed_password="hashed"))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sql_store_persists_jobs(session_factory):
+    """SQLJobStore는 작업을 테이블에 저장하고 상태 변경을 반영한다"""
+    store = SQLJobStore(session_factory)
+    job = await store.create(1)
+
+    assert (await store.find_active(1)).id == job.id
+
+    job.status = ReportJobStatus.SUCCEEDED
+    job.report_id = None
+    await store.save(job)
+
+    assert (await store.get(job.id)).status == ReportJobStatus.SUCCEEDED
+    assert await store.find_active(1) is None
+
+
+def test_job_store_requires_all_operations():
+    """저장소 구현이 필수 메서드를 빠뜨리면 인스턴스를 만들 수 없다"""
+    class _Partial(JobStore):
+        async def create(self, user_id):
+            return None
+
+    with pytest.raises(TypeError):
+        JobStore()
+    with pytest.raises(TypeError):
+        _Partial()
+
+
+@pytest.mark.asyncio
+async def test_deleting_report_clears_job_report_id(db_session):
+    """리포트를 삭제해도 작업 기록은 남고 report_id만 NULL이 된다 (FK ON DELETE SET NULL)"""
+    await db_session.execute(text("PRAGMA foreign_keys=ON"))
+    db_session.add(User(id=1, email="job@example.com", hashed_password="hashed"))
+    report = Report(user_id=1, title="t", summary="s", html_content="<p></p>", level=ReportLevel.BEGINNER)
+    db_session.add(report)
+    await db_session.flush()
+    job = ReportJob(id="job1", user_id=1, status=ReportJobStatus.SUCCEEDED, report_id=report.id)
+    db_session.add(job)
+    await db_session.commit()
+
+    await db_session.delete(report)
+    await db_session.commit()
+
+    await db_session.refresh(job)
+    assert job.report_id is None
+
+
+@pytest.mark.asyncio
+async def test_queue_recovers_pending_jobs_on_start(session_factory):
+    """재시작 시 저장소에 남은 대기/실행 중 작업을 다시 처리한다"""
+    store = SQLJobStore(session_factory)
+    queued = await store.create(1)
+    running = await store.create(1)
+    running.status = ReportJobStatus.RUNNING
+    await store.save(running)
+
+    queue = ReportJobQueue(store=store, session_factory=session_factory, workers=1)
+    with patch(
+        "app.services.report_service.generate_user_report", new_callable=AsyncMock
+    ) as mock_gen:
+        mock_gen.return_value = MagicMock(id=None)
+        await queue.start()
+        await queue.join()
+        await queue.stop()
+
+    assert mock_gen.call_count == 2
+    for job_id in (queued.id, running.id):
+        assert (await store.get(job_id)).status == ReportJobStatus.SUCCEEDED
+
+
+@pytest.mark.asyncio
+async def test_queue_deduplicates_active_job_per_user(session_factory):
+    """같은 사용자의 작업이 대기 중이면 새 작업을 만들지 않는다"""
+    queue = ReportJobQueue(store=SQLJobStore(session_factory), session_factory=session_factory, workers=1)
+    with patch(
+        "app.services.report_service.generate_user_report", new_callable=AsyncMock
+    ) as mock_gen:
+        mock_gen.return_value = MagicMock(id=None)
+        first = await queue.enqueue(1)
+        second = await queue.enqueue(1)
+        await queue.join()
+        await queue.stop()
+
+    assert first.id == second.id
+    mock_gen.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_store_error(session_factory):
+    """저장소 오류로 작업 하나가 실패해도 워커는 종료되지 않고 다음 작업을 처리한다"""
+    class _FlakyStore(InMemoryJobStore):
+        def __init__(self):
+            super().__init__()
+            self.failures = 1
+
+        async def save(self, job):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("store unavailable")
+            await super().save(job)
+
+    async with session_factory() as db:
+        db.add(User(id=2, email="job2@example.com", hashed_password="hashed"))
+        await db.commit()
+
+    queue = ReportJobQueue(store=_FlakyStore(), session_factory=session_factory, workers=1)
+    with patch(
+        "app.services.report_service.generate_user_report", new_callable=AsyncMock
+    ) as mock_gen:
+        mock_gen.return_value = MagicMock(id=None)
+        await queue.enqueue(1)
+        second = await queue.enqueue(2)
+        await asyncio.wait_for(queue.join(), timeout=5)
+        await queue.stop()
+
+    mock_gen.assert_called_once()
+    assert (await queue.get(second.id)).status == ReportJobStatus.SUCCEEDED
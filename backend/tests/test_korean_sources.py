@@ -0,0 +1,222 @@
+"""
+ECOS/KOSIS 소스 어댑터 테스트
+
+실제 API 대신 tests/fixtures의 녹화된 응답을 돌려주는 로컬 HTTP 서버에 요청합니다.
+- ECOS: 같은 통계표 항목 일괄 요청, 통계표별 동시 요청, 날짜 변환, 오류 응답
+- KOSIS: 같은 통계표의 항목/분류 일괄 요청, (항목, 분류)별 분리, 오류 응답
+- 라우팅: 키가 있으면 World Bank보다 ECOS/KOSIS 우선
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_service import DataService, _load_indicator_configs
+from app.services.sources import _normalize_period, build_registry
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class RecordedAPIServer:
+    """경로 접두사 → 녹화 응답 파일로 응답하고 받은 요청을 기록하는 스텁 서버"""
+
+    def __init__(self):
+        self.routes: dict[str, str] = {}
+        self.requests: list[tuple[str, dict[str, str]]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.requests.append((url.path, {k: v[0] for k, v in parse_qs(url.query).items()}))
+                for prefix, fixture in server.routes.items():
+                    if url.path.startswith(prefix):
+                        body = (FIXTURES / fixture).read_bytes()
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/json; charset=utf-8")
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                        return
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def api_server(monkeypatch):
+    with RecordedAPIServer() as server:
+        monkeypatch.setattr(settings, "ECOS_API_KEY", "test-ecos-key")
+        monkeypatch.setattr(settings, "KOSIS_API_KEY", "test-kosis-key")
+        monkeypatch.setattr(settings, "ECOS_API_BASE", f"{server.base_url}/ecos")
+        monkeypatch.setattr(settings, "KOSIS_API_BASE", f"{server.base_url}/kosis")
+        yield server
+
+
+def _service(extra_configs: list[dict] = ()) -> DataService:
+    service = DataService()
+    service.store = None
+    if extra_configs:
+        service.sources = build_registry(service, _load_indicator_configs() + list(extra_configs))
+    return service
+
+
+def test_normalize_period_formats():
+    assert _normalize_period("20250305") == "2025-03-05"
+    assert _normalize_period("202502") == "2025-02-01"
+    assert _normalize_period("2024Q3") == "2024-07-01"
+    assert _normalize_period("20243") == "2024-07-01"
+    assert _normalize_period("2024") == "2024"
+
+
+def test_korean_sources_preferred_over_world_bank(api_server):
+    """키가 설정되면 kr_unemployment는 World Bank 대신 KOSIS로 라우팅된다"""
+    service = _service()
+    assert service.sources.routes["bok_base_rate"].name == "ecos"
+    assert service.sources.routes["kr_10y_bond"].name == "ecos"
+    assert service.sources.routes["kr_unemployment"].name == "kosis"
+    assert service.sources.routes["kr_cpi"].name == "worldbank"
+
+
+def test_korean_sources_skipped_without_keys(monkeypatch):
+    monkeypatch.setattr(settings, "ECOS_API_KEY", "")
+    monkeypatch.setattr(settings, "KOSIS_API_KEY", "")
+    service = _service()
+    assert "bok_base_rate" not in service.sources.routes
+    assert service.sources.routes["kr_unemployment"].name == "worldbank"
+
+
+@pytest.mark.asyncio
+async def test_ecos_items_of_same_table_fetched_in_one_request(api_server):
+    """같은 통계표의 두 항목은 항목 코드 없이 한 번에 요청되고 ITEM_CODE1로 분리된다"""
+    api_server.routes = {
+        "/ecos/StatisticSearch/test-ecos-key/json/kr/1/10000/722Y001/D/": "ecos_722Y001_D.json",
+        "/ecos/StatisticSearch/test-ecos-key/json/kr/1/10000/817Y002/D/": "ecos_817Y002_D.json",
+    }
+    service = _service([{
+        "id": "kr_lending_rate", "ecos_stat_code": "722Y001", "ecos_item_code": "0102000",
+        "ecos_cycle": "D", "update_frequency": "event",
+    }])
+
+    data = await service.fetch_all_indicators(["bok_base_rate", "kr_lending_rate", "kr_10y_bond"])
+    await service.close()
+
+    paths = sorted(path for path, _ in api_server.requests)
+    assert len(paths) == 2
+    # 통계표당 한 번, 항목이 여럿이면 항목 코드 없이 / 하나면 항목 코드로 좁혀 요청
+    assert paths[0].count("/") == paths[1].count("/") - 1
+    assert paths[1].endswith("/010210000")
+
+    assert data["bok_base_rate"]["value"] == 2.75
+    assert data["bok_base_rate"]["prev_value"] == 3.0
+    assert data["bok_base_rate"]["date"] == "2025-02-25"
+    assert data["bok_base_rate"]["source"] == "ECOS"
+    assert [h["value"] for h in data["kr_lending_rate"]["history"]] == [3.5, 3.25]
+    # "-" 결측치는 건너뛴다
+    assert [h["date"] for h in data["kr_10y_bond"]["history"]] == ["2025-03-03", "2025-03-05"]
+    assert data["kr_10y_bond"]["value"] == 2.785
+
+
+@pytest.mark.asyncio
+async def test_ecos_error_response_marks_indicator_failed(api_server):
+    api_server.routes = {"/ecos/StatisticSearch/": "ecos_error.json"}
+    service = _service()
+
+    results = await service.sources["ecos"].fetch_many(["bok_base_rate"])
+    await service.close()
+
+    assert isinstance(results["bok_base_rate"], ValueError)
+    assert "인증키" in str(results["bok_base_rate"])
+
+
+@pytest.mark.asyncio
+async def test_ecos_http_error_does_not_expose_api_key(api_server, capsys):
+    """ECOS 인증키는 URL 경로에 들어가므로 오류 메시지와 로그에서 가려진다"""
+    api_server.routes = {}  # 모든 요청 404
+    service = _service()
+
+    data = await service.fetch_all_indicators(["bok_base_rate"])
+    await service.close()
+
+    assert "HTTP 404" in data["bok_base_rate"]["error"]
+    assert "/StatisticSearch/***/json/" in data["bok_base_rate"]["error"]
+    assert "test-ecos-key" not in data["bok_base_rate"]["error"]
+    assert "test-ecos-key" not in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_kosis_items_of_same_table_fetched_in_one_request(api_server):
+    """같은 통계표의 항목들은 itmId를 묶어 한 번에 요청되고 (항목, 분류)별로 분리된다"""
+    api_server.routes = {"/kosis/Param/statisticsParameterData.do": "kosis_DT_1DA7102S.json"}
+    service = _service([{
+        "id": "kr_employment_rate", "kosis_org_id": "101", "kosis_tbl_id": "DT_1DA7102S",
+        "kosis_itm_id": "T90", "kosis_obj_l1": "00", "kosis_prd_se": "M",
+    }])
+
+    data = await service.fetch_all_indicators(["kr_unemployment", "kr_employment_rate"])
+    await service.close()
+
+    assert len(api_server.requests) == 1
+    _, params = api_server.requests[0]
+    assert params["itmId"] == "T80+T90+"
+    assert params["objL1"] == "00+"
+    assert params["orgId"] == "101"
+    assert params["tblId"] == "DT_1DA7102S"
+    assert params["apiKey"] == "test-kosis-key"
+
+    # 서울(C1=11) 행은 전국(00) 실업률에 섞이지 않는다
+    assert [h["value"] for h in data["kr_unemployment"]["history"]] == [3.7, 3.7, 3.2]
+    assert data["kr_unemployment"]["date"] == "2025-02-01"
+    assert data["kr_unemployment"]["source"] == "KOSIS"
+    assert data["kr_employment_rate"]["value"] == 60.6
+
+
+@pytest.mark.asyncio
+async def test_kosis_all_categories_not_merged_into_one_series(api_server):
+    """objL1=ALL로 여러 분류(전국/서울)가 오면 하나의 시계열로 합치지 않고 실패로 표시한다"""
+    api_server.routes = {"/kosis/Param/statisticsParameterData.do": "kosis_DT_1DA7102S.json"}
+    service = _service([
+        {"id": "kr_unemployment_all", "kosis_org_id": "101", "kosis_tbl_id": "DT_1DA7102S",
+         "kosis_itm_id": "T80", "kosis_prd_se": "M"},
+        {"id": "kr_employment_all", "kosis_org_id": "101", "kosis_tbl_id": "DT_1DA7102S",
+         "kosis_itm_id": "T90", "kosis_prd_se": "M"},
+    ])
+
+    results = await service.sources["kosis"].fetch_many(["kr_unemployment_all", "kr_employment_all"])
+    await service.close()
+
+    assert api_server.requests[0][1]["objL1"] == "ALL"
+    assert isinstance(results["kr_unemployment_all"], ValueError)
+    assert "2 categories" in str(results["kr_unemployment_all"])
+    # 분류가 하나뿐인 항목은 그대로 사용
+    assert results["kr_employment_all"]["value"] == 60.6
+
+
+@pytest.mark.asyncio
+async def test_kosis_error_response_marks_indicator_failed(api_server):
+    api_server.routes = {"/kosis/": "kosis_error.json"}
+    service = _service()
+
+    results = await service.sources["kosis"].fetch_many(["kr_unemployment"])
+    await service.close()
+
+    assert isinstance(results["kr_unemployment"], ValueError)
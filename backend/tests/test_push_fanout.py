@@ -0,0 +1,260 @@
+"""
+push_fanout.py 단위 테스트
+
+실제 푸시 서비스 대신 httpx.MockTransport로 요청을 받아 확인합니다.
+- 페이로드 암호화(aes128gcm) + VAPID/TTL 헤더
+- endpoint별 결과 (성공/만료/오류/연결 실패/키 누락)
+- 동시 전송 수 제한, 비활성화 시 전송 생략, 전용 암호화 스레드 풀
+- VapidSigner: 푸시 서비스 origin별 JWT 캐시, 만료 직전 재서명
+"""
+import asyncio
+import base64
+import os
+import threading
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid
+
+from app.core.config import settings
+from app.services.push_fanout import PushFanout, PushMessage, build_payload
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _subscription(endpoint: str) -> dict:
+    """브라우저 PushSubscription과 같은 형식의 구독 (수신자 키 쌍 생성)"""
+    public = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    return {"endpoint": endpoint, "keys": {"p256dh": _b64(public), "auth": _b64(os.urandom(16))}}
+
+
+@pytest.fixture
+def vapid_key(monkeypatch):
+    vapid = Vapid()
+    vapid.generate_keys()
+    key = _b64(vapid.private_key.private_numbers().private_value.to_bytes(32, "big"))
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", key)
+    monkeypatch.setattr(settings, "VAPID_CLAIMS_EMAIL", "push@mesa.local")
+    return key
+
+
+def _fanout(handler, **kwargs) -> PushFanout:
+    return PushFanout(transport=httpx.MockTransport(handler), **kwargs)
+
+
+def _message(endpoint: str, user_id: int = 1) -> PushMessage:
+    return PushMessage(_subscription(endpoint), build_payload("새 리포트", "요약"), user_id=user_id)
+
+
+@pytest.mark.asyncio
+async def test_deliver_encrypts_payload_and_signs_request(vapid_key):
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(201)
+
+    fanout = _fanout(handler)
+    result = await fanout.deliver([_message("https://fcm.googleapis.com/fcm/send/abc")])
+    await fanout.close()
+
+    assert result.sent == 1
+    request = requests[0]
+    assert request.headers["Content-Encoding"] == "aes128gcm"
+    assert request.headers["TTL"] == str(settings.PUSH_TTL_SECONDS)
+    assert request.headers["Authorization"].startswith("vapid t=")
+    assert "새 리포트".encode() not in request.content  # 본문은 암호화되어 전송
+
+
+@pytest.mark.asyncio
+async def test_deliver_prepares_messages_on_dedicated_pool(vapid_key, monkeypatch):
+    """암호화/서명은 기본 executor가 아닌 크기 제한된 전용 스레드 풀에서 실행된다"""
+    monkeypatch.setattr(settings, "PUSH_PREPARE_WORKERS", 2)
+    threads = set()
+    fanout = _fanout(lambda request: httpx.Response(201))
+    original = fanout._prepare
+
+    def _prepare(message, signer):
+        threads.add(threading.current_thread().name)
+        return original(message, signer)
+
+    fanout._prepare = _prepare
+    result = await fanout.deliver([_message(f"https://push.example.com/{i}", i) for i in range(6)])
+    assert fanout._pool._max_workers == 2
+    await fanout.close()
+
+    assert result.sent == 6
+    assert threads and all(name.startswith("mesa-push") for name in threads)
+    assert fanout._pool is None
+
+
+@pytest.mark.asyncio
+async def test_deliver_reports_outcome_per_endpoint(vapid_key):
+    """endpoint별 상태 코드/오류를 요청 순서대로 반환한다"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/ok":
+            return httpx.Response(201)
+        if path == "/gone":
+            return httpx.Response(410, text="subscription expired")
+        if path == "/down":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(500)
+
+    messages = [
+        _message("https://push.example.com/ok", 1),
+        _message("https://push.example.com/gone", 2),
+        _message("https://push.example.com/down", 3),
+        _message("https://push.example.com/error", 4),
+        PushMessage({"endpoint": "https://push.example.com/nokeys"}, build_payload("a", "b"), user_id=5),
+    ]
+    fanout = _fanout(handler)
+    result = await fanout.deliver(messages)
+    await fanout.close()
+
+    assert [o.user_id for o in result.outcomes] == [1, 2, 3, 4, 5]
+    ok, gone, down, error, nokeys = result.outcomes
+    assert ok.ok and ok.status_code == 201
+    assert gone.gone and gone.error == "subscription expired"
+    assert down.status_code is None and "ConnectError" in down.error
+    assert error.status_code == 500 and not error.ok
+    assert "keys" in nokeys.error
+    assert result.summary()["by_status"] == {"201": 1, "410": 1, "500": 1, "error": 2}
+
+
+@pytest.mark.asyncio
+async def test_deliver_bounds_parallelism(vapid_key):
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(201)
+
+    fanout = _fanout(handler, max_concurrency=3)
+    result = await fanout.deliver([_message(f"https://push.example.com/{i}", i) for i in range(12)])
+    await fanout.close()
+
+    assert result.sent == 12
+    assert 1 < peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_deliver_skips_when_vapid_key_missing(monkeypatch):
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "")
+    calls = []
+    fanout = _fanout(lambda request: calls.append(request) or httpx.Response(201))
+
+    result = await fanout.deliver([_message("https://push.example.com/a")])
+
+    assert calls == []
+    assert result.failed == 1
+    assert result.outcomes[0].error == "push disabled"
+
+
+# ──────────────────────────────────────────────
+# VapidSigner: origin별 JWT 캐시
+# ──────────────────────────────────────────────
+
+def test_vapid_signer_caches_jwt_per_origin(vapid_key, fake_clock):
+    from app.services.push_fanout import VapidSigner
+
+    signer = VapidSigner(vapid_key, "push@mesa.local", clock=fake_clock)
+    first = signer.headers_for("https://fcm.googleapis.com/fcm/send/a")
+    second = signer.headers_for("https://fcm.googleapis.com/fcm/send/b")
+    mozilla = signer.headers_for("https://updates.push.services.mozilla.com/wpush/v2/c")
+
+    assert first == second
+    assert mozilla != first
+    assert signer.signed == 2
+
+
+def test_vapid_signer_resigns_shortly_before_expiry(vapid_key, fake_clock):
+    from app.services.push_fanout import VapidSigner
+
+    signer = VapidSigner(vapid_key, "push@mesa.local", expiry=3600, refresh_margin=300, clock=fake_clock)
+    first = signer.headers_for("https://fcm.googleapis.com/a")
+
+    fake_clock.now += 3000  # 만료 10분 전: 아직 재사용
+    assert signer.headers_for("https://fcm.googleapis.com/b") == first
+    fake_clock.now += 400   # 만료 200초 전: 새로 서명
+    assert signer.headers_for("https://fcm.googleapis.com/c") != first
+    assert signer.signed == 2
+
+
+@pytest.mark.asyncio
+async def test_fanout_signs_once_per_origin(vapid_key):
+    """같은 푸시 서비스로 가는 메시지들은 하나의 VAPID 헤더를 공유한다"""
+    authorizations = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        authorizations.append((request.url.host, request.headers["Authorization"]))
+        return httpx.Response(201)
+
+    fanout = _fanout(handler)
+    messages = [_message(f"https://fcm.googleapis.com/fcm/send/{i}", i) for i in range(5)]
+    messages += [_message(f"https://web.push.apple.com/{i}", i) for i in range(3)]
+    await fanout.deliver(messages)
+    await fanout.deliver([_message("https://fcm.googleapis.com/fcm/send/x")])
+    await fanout.close()
+
+    assert fanout.signer.signed == 2
+    assert len({auth for host, auth in authorizations if host == "fcm.googleapis.com"}) == 1
+
+
+# ──────────────────────────────────────────────
+# origin별 묶음 전송
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_deliver_bounds_parallelism_per_origin(vapid_key):
+    """origin별 동시 전송 수를 제한하되 다른 origin은 함께 전송하고, 결과는 요청 순서를 유지한다"""
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(201)
+
+    messages = []
+    for i in range(8):
+        messages.append(_message(f"https://fcm.googleapis.com/fcm/send/{i}", i))
+        messages.append(_message(f"https://web.push.apple.com/{i}", 100 + i))
+    fanout = _fanout(handler, max_concurrency=10, max_per_origin=2)
+    result = await fanout.deliver(messages)
+    await fanout.close()
+
+    assert [o.user_id for o in result.outcomes] == [m.user_id for m in messages]
+    assert peak == {"fcm.googleapis.com": 2, "web.push.apple.com": 2}
+    assert result.summary()["by_origin"] == {"https://fcm.googleapis.com": 8, "https://web.push.apple.com": 8}
+
+
+def test_group_by_origin_keeps_request_index():
+    from app.services.push_fanout import group_by_origin
+
+    messages = [
+        _message("https://fcm.googleapis.com/fcm/send/a"),
+        _message("https://updates.push.services.mozilla.com/wpush/v2/b"),
+        _message("https://fcm.googleapis.com/fcm/send/c"),
+    ]
+
+    groups = group_by_origin(messages)
+
+    assert {origin: [i for i, _ in items] for origin, items in groups.items()} == {
+        "https://fcm.googleapis.com": [0, 2],
+        "https://updates.push.services.mozilla.com": [1],
+    }
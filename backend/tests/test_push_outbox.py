@@ -0,0 +1,290 @@
+"""
+push_outbox.py 단위 테스트
+
+- 리포트 저장과 같은 커밋으로 outbox 기록
+- 디스패처: 성공 SENT, 일시 실패 지수 재시도, 재시도 소진/구독 만료 FAILED, TTL 만료 EXPIRED
+- 남은 TTL/Urgency 전달, 배치 크기 단위 전송, 재시작 시 SENDING 복구, 동시 디스패처 선점
+"""
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import Select, Update, select, text
+
+from app.core.config import settings
+from app.models.push_outbox import PushOutbox, PushOutboxStatus
+from app.models.push_subscription import PushSubscription
+from app.models.user import User
+from app.services.push_fanout import FanoutResult, PushMessage, PushOutcome, build_payload
+from app.services.push_outbox import PushDispatcher, enqueue_notification, retry_delay
+from .conftest import FakeClock
+
+
+@pytest.fixture(autouse=True)
+def vapid_configured(monkeypatch):
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "test-vapid-key")
+
+
+def _dispatcher(db_session, clock, **kwargs) -> PushDispatcher:
+    @asynccontextmanager
+    async def _session():
+        yield db_session
+
+    return PushDispatcher(session_factory=_session, clock=clock, **kwargs)
+
+
+def _respond(*statuses):
+    """endpoint 순서대로 상태 코드를 돌려주는 deliver side_effect"""
+    async def _deliver(messages):
+        return FanoutResult([
+            PushOutcome(m.endpoint, m.user_id, status_code=status)
+            for m, status in zip(messages, statuses)
+        ])
+    return _deliver
+
+
+async def _user(db_session, name: str = "u") -> User:
+    user = User(email=f"{name}@example.com", hashed_password="x", push_enabled=True)
+    db_session.add(user)
+    await db_session.flush()
+    db_session.add(PushSubscription(
+        user_id=user.id, endpoint=_endpoint(user), origin="https://push.example.com",
+        keys={"p256dh": "a", "auth": "b"},
+    ))
+    await db_session.commit()
+    return user
+
+
+def _endpoint(user: User) -> str:
+    return f"https://push.example.com/{user.email.split('@')[0]}"
+
+
+async def _enqueue(db_session, user: User, clock: FakeClock, ttl: int = 3600) -> PushOutbox:
+    subscription = {"endpoint": _endpoint(user), "keys": {"p256dh": "a", "auth": "b"}}
+    message = PushMessage(subscription, build_payload("새 리포트", "요약"), user_id=user.id, ttl=ttl)
+    row = enqueue_notification(db_session, message)
+    row.next_attempt_at = clock.now
+    row.expires_at = clock.now + timedelta(seconds=ttl)
+    await db_session.commit()
+    return row
+
+
+@pytest.mark.asyncio
+async def test_report_and_outbox_written_in_same_commit(db_session, mock_push_service):
+    """리포트 저장 시 알림은 바로 전송되지 않고 같은 커밋으로 outbox에 기록된다"""
+    from app.services.report_service import generate_user_report
+
+    user = await _user(db_session)
+    report = await generate_user_report(user, db_session)
+
+    rows = (await db_session.execute(select(PushOutbox))).scalars().all()
+    assert len(rows) == 1
+    assert rows[0].report_id == report.id
+    assert rows[0].payload["url"] == f"/reports/{report.id}"
+    assert rows[0].status == PushOutboxStatus.PENDING
+    mock_push_service.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_deleting_report_keeps_outbox_row(db_session, mock_push_service):
+    """리포트를 삭제해도 outbox 행은 남고 report_id만 NULL이 된다 (FK ON DELETE SET NULL)"""
+    from app.services.report_service import generate_user_report
+
+    await db_session.execute(text("PRAGMA foreign_keys=ON"))
+    user = await _user(db_session)
+    report = await generate_user_report(user, db_session)
+
+    await db_session.delete(report)
+    await db_session.commit()
+
+    row = (await db_session.execute(select(PushOutbox))).scalar_one()
+    await db_session.refresh(row)
+    assert row.report_id is None
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_marks_delivered_rows_sent(db_session, mock_push_service, utc_clock):
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+
+    processed = await _dispatcher(db_session, utc_clock).drain()
+
+    assert processed == 1
+    assert row.status == PushOutboxStatus.SENT
+    assert row.attempts == 1
+    assert row.last_status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_transient_failures_with_backoff(db_session, mock_push_service, utc_clock):
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    dispatcher = _dispatcher(db_session, utc_clock)
+
+    mock_push_service.side_effect = _respond(503)
+    await dispatcher.drain()
+    assert row.status == PushOutboxStatus.PENDING
+    assert row.next_attempt_at == utc_clock.now + retry_delay(1)
+
+    # 재시도 시각 전에는 다시 보내지 않는다
+    utc_clock.now += retry_delay(1) - timedelta(seconds=1)
+    assert await dispatcher.drain() == 0
+
+    utc_clock.now += timedelta(seconds=1)
+    mock_push_service.side_effect = _respond(201)
+    assert await dispatcher.drain() == 1
+    assert row.status == PushOutboxStatus.SENT
+    assert row.attempts == 2
+    assert retry_delay(3) == 4 * retry_delay(1)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_gives_up_after_max_attempts(db_session, mock_push_service, utc_clock):
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    dispatcher = _dispatcher(db_session, utc_clock, max_attempts=2)
+    mock_push_service.side_effect = _respond(500)
+
+    await dispatcher.drain()
+    utc_clock.now += retry_delay(1)
+    await dispatcher.drain()
+
+    assert row.status == PushOutboxStatus.FAILED
+    assert row.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_count_device_failure_once_per_notification(db_session, mock_push_service, utc_clock):
+    """한 알림을 여러 번 재시도해도 기기 실패 횟수는 알림당 한 번만 늘고, 다음 알림의 실패는 새로 센다"""
+    user = await _user(db_session)
+    dispatcher = _dispatcher(db_session, utc_clock, max_attempts=3)
+    mock_push_service.side_effect = _respond(503)
+
+    row = await _enqueue(db_session, user, utc_clock)
+    for _ in range(3):
+        await dispatcher.drain()
+        utc_clock.now += retry_delay(row.attempts)
+    assert row.status == PushOutboxStatus.FAILED
+    sub = (await db_session.execute(select(PushSubscription))).scalar_one()
+    assert sub.failure_count == 1
+
+    await _enqueue(db_session, user, utc_clock)
+    await dispatcher.drain()
+    assert sub.failure_count == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_fails_gone_rows_and_prunes_subscription(db_session, mock_push_service, utc_clock):
+    user = await _user(db_session)
+    row = await _enqueue(db_session, user, utc_clock)
+    mock_push_service.side_effect = _respond(410)
+
+    await _dispatcher(db_session, utc_clock).drain()
+
+    assert row.status == PushOutboxStatus.FAILED
+    assert (await db_session.execute(select(PushSubscription))).scalars().all() == []
+    assert user.push_enabled is False
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_sends_remaining_ttl_and_urgency(db_session, mock_push_service, utc_clock):
+    """남은 보관 시간을 TTL로 보내고, 보관 시간이 지난 알림은 보내지 않고 EXPIRED 처리한다"""
+    user = await _user(db_session)
+    fresh = await _enqueue(db_session, user, utc_clock, ttl=3600)
+    stale = await _enqueue(db_session, user, utc_clock, ttl=60)
+
+    utc_clock.now += timedelta(seconds=600)
+    await _dispatcher(db_session, utc_clock).drain()
+
+    (messages,), _ = mock_push_service.call_args
+    assert len(messages) == 1
+    assert messages[0].ttl == 3000
+    assert messages[0].urgency == settings.PUSH_URGENCY
+    assert fresh.status == PushOutboxStatus.SENT
+    assert stale.status == PushOutboxStatus.EXPIRED
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_drains_in_batches(db_session, mock_push_service, utc_clock):
+    for i in range(5):
+        await _enqueue(db_session, await _user(db_session, f"u{i}"), utc_clock)
+    dispatcher = _dispatcher(db_session, utc_clock, batch_size=2)
+
+    assert await dispatcher.drain_once() == 2
+    assert await dispatcher.drain() == 3
+
+    assert [len(call.args[0]) for call in mock_push_service.call_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_requeues_claimed_rows_when_delivery_raises(db_session, mock_push_service, utc_clock):
+    """전송기 자체가 예외를 내면 선점한 알림을 SENDING에 두지 않고 백오프 후 다시 대기시킨다"""
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    mock_push_service.side_effect = ValueError("Could not deserialize key data")
+    dispatcher = _dispatcher(db_session, utc_clock)
+
+    assert await dispatcher.drain_once() == 1
+    assert row.status == PushOutboxStatus.PENDING
+    assert row.attempts == 1
+    assert row.error == "delivery error: ValueError"
+    assert row.next_attempt_at == utc_clock.now + retry_delay(1)
+
+    mock_push_service.side_effect = _respond(201)
+    utc_clock.now = row.next_attempt_at
+    assert await dispatcher.drain() == 1
+    assert row.status == PushOutboxStatus.SENT
+    assert row.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_skips_rows_claimed_by_another_dispatcher(db_session, mock_push_service, utc_clock):
+    """후보 조회 뒤 다른 디스패처가 먼저 선점한 알림은 다시 전송하지 않는다"""
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    other = _dispatcher(db_session, utc_clock)
+    execute = db_session.execute
+    state = {"selected": False, "raced": False}
+
+    async def _racing_execute(statement, *args, **kwargs):
+        # 후보 id 조회 직후, 선점 UPDATE 전에 다른 디스패처가 같은 행을 먼저 처리
+        if isinstance(statement, Update) and state["selected"] and not state["raced"]:
+            state["raced"] = True
+            await other.drain_once()
+        if isinstance(statement, Select):
+            state["selected"] = True
+        return await execute(statement, *args, **kwargs)
+
+    db_session.execute = _racing_execute
+    try:
+        processed = await _dispatcher(db_session, utc_clock).drain_once()
+    finally:
+        db_session.execute = execute
+
+    assert state["raced"]
+    assert processed == 0
+    assert mock_push_service.call_count == 1
+    assert row.status == PushOutboxStatus.SENT
+    assert row.attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_start_requeues_rows_interrupted_while_sending(db_session, mock_push_service, utc_clock):
+    """전송 중 프로세스가 중단된 알림(SENDING)은 재시작 시 다시 전송된다"""
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    row.status = PushOutboxStatus.SENDING
+    await db_session.commit()
+    dispatcher = _dispatcher(db_session, utc_clock, poll_interval=60)
+
+    await dispatcher.start()
+    await dispatcher.stop()
+    await db_session.refresh(row)
+    assert row.status == PushOutboxStatus.PENDING
+
+    await dispatcher.drain()
+    assert row.status == PushOutboxStatus.SENT
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_idle_when_push_disabled(db_session, mock_push_service, monkeypatch, utc_clock):
+    row = await _enqueue(db_session, await _user(db_session), utc_clock)
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "")
+
+    assert await _dispatcher(db_session, utc_clock).drain() == 0
+    assert row.status == PushOutboxStatus.PENDING
+    mock_push_service.assert_not_called()
@@ -1,11 +1,11 @@
 """
 push_service.py 단위 테스트
 
-- send_push_notification: VAPID 키 없음, pywebpush 없음, 성공/실패/예외 케이스
-- send_report_notification: push_enabled True/False, subscription 유무, 알림 내용 검증
+- build_report_messages: push_enabled True/False, 기기(구독) 유무, 기기별 메시지, 알림 내용 검증
+- upsert/remove_push_subscriptions: endpoint 기준 등록/갱신, 기기별 해제
+- record_push_outcomes: 404/410 구독 정리, 기기별 일시 실패 백오프, 교체된 구독 보호
 """
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
 
 
 # ──────────────────────────────────────────────
@@ -14,10 +14,20 @@ from unittest.mock import AsyncMock, patch, MagicMock
 
 class MockUser:
     """User 모델 목업"""
-    def __init__(self, push_enabled: bool = False, push_subscription=None):
+    def __init__(self, push_enabled: bool = False):
         self.id = 1
         self.push_enabled = push_enabled
-        self.push_subscription = push_subscription
+
+
+class MockSubscription:
+    """PushSubscription 모델 목업 (기기 하나)"""
+    def __init__(self, endpoint: str, keys=None, retry_after=None):
+        self.endpoint = endpoint
+        self.keys = keys
+        self.retry_after = retry_after
+
+    def as_subscription(self) -> dict:
+        return {"endpoint": self.endpoint, "keys": self.keys or {}}
 
 
 class MockReport:
@@ -28,247 +38,284 @@ class MockReport:
 
 
 # ──────────────────────────────────────────────
-# send_push_notification 테스트
+# build_report_messages 테스트
 # ──────────────────────────────────────────────
 
-@pytest.mark.asyncio
-async def test_send_push_returns_false_when_no_vapid_key():
-    """VAPID 키가 설정되지 않으면 False를 반환한다"""
-    from app.services.push_service import send_push_notification
-
-    with patch("app.services.push_service.settings") as mock_settings:
-        mock_settings.VAPID_PRIVATE_KEY = ""
-        mock_settings.VAPID_CLAIMS_EMAIL = "admin@mesa.local"
-
-        result = await send_push_notification(
-            subscription={"endpoint": "https://example.com/push/sub1"},
-            title="테스트 알림",
-            body="내용",
-        )
+def test_report_messages_skipped_when_push_disabled():
+    """push_enabled=False이면 기기가 있어도 알림 메시지를 만들지 않는다"""
+    from app.services.push_service import build_report_messages
 
-    assert result is False
+    user = MockUser(push_enabled=False)
+    subs = [MockSubscription("https://example.com/push/sub1")]
 
+    assert build_report_messages(user, MockReport(), subs) == []
 
-@pytest.mark.asyncio
-async def test_send_push_returns_false_when_pywebpush_not_installed():
-    """pywebpush 라이브러리가 없으면 False를 반환한다"""
-    from app.services import push_service
-
-    original = push_service.HAS_WEBPUSH
-    try:
-        push_service.HAS_WEBPUSH = False
-        result = await push_service.send_push_notification(
-            subscription={"endpoint": "https://example.com/push/sub1"},
-            title="테스트 알림",
-            body="내용",
-        )
-        assert result is False
-    finally:
-        push_service.HAS_WEBPUSH = original
 
+def test_report_messages_skipped_when_no_subscription():
+    """등록된 기기가 없으면 알림 메시지를 만들지 않는다"""
+    from app.services.push_service import build_report_messages
+
+    assert build_report_messages(MockUser(push_enabled=True), MockReport(), []) == []
 
-@pytest.mark.asyncio
-async def test_send_push_returns_true_on_success():
-    """VAPID 키가 있고 webpush 호출이 성공하면 True를 반환한다"""
-    from app.services import push_service
 
-    subscription = {
-        "endpoint": "https://fcm.googleapis.com/push/sub123",
-        "keys": {"p256dh": "abc", "auth": "xyz"},
+def test_report_messages_one_per_device():
+    """기기마다 같은 페이로드의 메시지를 하나씩 만든다"""
+    from app.services.push_service import build_report_messages
+
+    keys = {"p256dh": "abc", "auth": "xyz"}
+    subs = [
+        MockSubscription("https://fcm.googleapis.com/push/phone", keys),
+        MockSubscription("https://updates.push.services.mozilla.com/wpush/v2/laptop", keys),
+    ]
+    report = MockReport(id=42, summary="요약 첫 줄\n두 번째 줄")
+
+    messages = build_report_messages(MockUser(push_enabled=True), report, subs)
+
+    assert [m.subscription for m in messages] == [s.as_subscription() for s in subs]
+    assert all(m.user_id == 1 for m in messages)
+    assert messages[0].payload == {
+        "title": "📊 새 경제 리포트 도착",
+        "body": "요약 첫 줄",
+        "url": "/reports/42",
+        "icon": "/icons/icon-192x192.png",
     }
+    assert messages[1].payload == messages[0].payload
 
-    with patch("app.services.push_service.HAS_WEBPUSH", True), \
-         patch("app.services.push_service.settings") as mock_settings, \
-         patch("app.services.push_service.webpush") as mock_webpush:
 
-        mock_settings.VAPID_PRIVATE_KEY = "fake-private-key"
-        mock_settings.VAPID_CLAIMS_EMAIL = "admin@mesa.local"
-        mock_webpush.return_value = None
+def test_report_messages_use_first_line_of_summary():
+    """summary가 여러 줄일 때 첫 번째 줄만 body로 사용한다"""
+    from app.services.push_service import build_report_messages
 
-        result = await push_service.send_push_notification(
-            subscription=subscription,
-            title="새 리포트",
-            body="리포트가 생성되었습니다",
-            url="/reports/1",
-        )
+    subs = [MockSubscription("https://example.com/push/sub1")]
+    report = MockReport(id=1, summary="첫째 줄\n둘째 줄\n셋째 줄")
 
-    assert result is True
-    mock_webpush.assert_called_once()
+    (message,) = build_report_messages(MockUser(push_enabled=True), report, subs)
 
+    assert message.payload["body"] == "첫째 줄"
 
-@pytest.mark.asyncio
-async def test_send_push_passes_correct_vapid_claims():
-    """webpush 호출 시 VAPID private key와 claims를 올바르게 전달한다"""
-    from app.services import push_service
 
-    subscription = {"endpoint": "https://example.com/push/sub1"}
+def test_report_messages_fallback_when_summary_empty():
+    """summary가 빈 문자열이면 fallback 메시지를 body로 사용한다"""
+    from app.services.push_service import build_report_messages
 
-    with patch("app.services.push_service.HAS_WEBPUSH", True), \
-         patch("app.services.push_service.settings") as mock_settings, \
-         patch("app.services.push_service.webpush") as mock_webpush:
+    subs = [MockSubscription("https://example.com/push/sub1")]
 
-        mock_settings.VAPID_PRIVATE_KEY = "test-private-key"
-        mock_settings.VAPID_CLAIMS_EMAIL = "test@mesa.local"
-        mock_webpush.return_value = None
+    (message,) = build_report_messages(MockUser(push_enabled=True), MockReport(id=1, summary=""), subs)
 
-        await push_service.send_push_notification(
-            subscription=subscription,
-            title="알림",
-            body="내용",
-        )
+    assert message.payload["body"] == "새 리포트를 확인하세요"
 
-        call_kwargs = mock_webpush.call_args[1]
-        assert call_kwargs["vapid_private_key"] == "test-private-key"
-        assert call_kwargs["vapid_claims"]["sub"] == "mailto:test@mesa.local"
 
+def test_report_messages_include_report_url():
+    """알림의 url이 /reports/{report.id} 형식으로 설정된다"""
+    from app.services.push_service import build_report_messages
 
-@pytest.mark.asyncio
-async def test_send_push_returns_false_on_webpush_exception():
-    """WebPushException 발생 시 False를 반환한다"""
-    from app.services import push_service
-
-    with patch("app.services.push_service.HAS_WEBPUSH", True), \
-         patch("app.services.push_service.settings") as mock_settings, \
-         patch("app.services.push_service.webpush") as mock_webpush, \
-         patch("app.services.push_service.WebPushException", Exception):
-
-        mock_settings.VAPID_PRIVATE_KEY = "fake-private-key"
-        mock_settings.VAPID_CLAIMS_EMAIL = "admin@mesa.local"
-        mock_webpush.side_effect = Exception("push 전송 실패")
-
-        result = await push_service.send_push_notification(
-            subscription={"endpoint": "https://example.com/push/sub1"},
-            title="테스트",
-            body="내용",
-        )
+    subs = [MockSubscription("https://example.com/push/sub1")]
 
-    assert result is False
+    (message,) = build_report_messages(MockUser(push_enabled=True), MockReport(id=99, summary="요약 내용"), subs)
 
+    assert message.payload["url"] == "/reports/99"
 
-@pytest.mark.asyncio
-async def test_send_push_returns_false_on_unexpected_exception():
-    """예상치 못한 일반 예외 발생 시 False를 반환한다"""
-    from app.services import push_service
-
-    with patch("app.services.push_service.HAS_WEBPUSH", True), \
-         patch("app.services.push_service.settings") as mock_settings, \
-         patch("app.services.push_service.webpush") as mock_webpush:
-
-        mock_settings.VAPID_PRIVATE_KEY = "fake-private-key"
-        mock_settings.VAPID_CLAIMS_EMAIL = "admin@mesa.local"
-        mock_webpush.side_effect = RuntimeError("네트워크 오류")
-
-        result = await push_service.send_push_notification(
-            subscription={"endpoint": "https://example.com/push/sub1"},
-            title="테스트",
-            body="내용",
-        )
 
-    assert result is False
+def test_report_messages_skip_devices_in_backoff():
+    """백오프 중인 기기만 제외하고 나머지 기기로는 보낸다"""
+    from datetime import datetime, timedelta
+    from app.services.push_service import build_report_messages
+
+    subs = [
+        MockSubscription("https://example.com/push/flaky", retry_after=datetime.utcnow() + timedelta(hours=1)),
+        MockSubscription("https://example.com/push/ok"),
+    ]
+
+    messages = build_report_messages(MockUser(push_enabled=True), MockReport(), subs)
+
+    assert [m.endpoint for m in messages] == ["https://example.com/push/ok"]
 
 
 # ──────────────────────────────────────────────
-# send_report_notification 테스트
+# upsert / remove: 기기별 구독 등록과 해제
 # ──────────────────────────────────────────────
 
-@pytest.mark.asyncio
-async def test_report_notification_skipped_when_push_disabled():
-    """push_enabled=False이면 알림을 전송하지 않고 False를 반환한다"""
-    from app.services.push_service import send_report_notification
+async def _user(db_session, email: str):
+    from app.models.user import User
+
+    user = User(email=email, hashed_password="x", push_enabled=True)
+    db_session.add(user)
+    await db_session.commit()
+    return user
 
-    user = MockUser(push_enabled=False, push_subscription={"endpoint": "https://example.com/push/sub1"})
-    report = MockReport()
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        result = await send_report_notification(user, report)
+async def _subscribed_user(db_session, email: str, *endpoints: str):
+    from app.services.push_service import upsert_push_subscription
 
-    assert result is False
-    mock_send.assert_not_called()
+    user = await _user(db_session, email)
+    for endpoint in endpoints:
+        await upsert_push_subscription(db_session, user, {"endpoint": endpoint, "keys": {"p256dh": "a", "auth": "b"}})
+    await db_session.commit()
+    return user
 
 
 @pytest.mark.asyncio
-async def test_report_notification_skipped_when_no_subscription():
-    """push_subscription이 None이면 알림을 전송하지 않고 False를 반환한다"""
-    from app.services.push_service import send_report_notification
+async def test_upsert_keeps_other_devices_and_updates_same_endpoint(db_session):
+    """새 기기는 추가되고, 같은 endpoint로 다시 구독하면 키만 갱신된다"""
+    from app.services.push_service import load_push_subscriptions, upsert_push_subscription
+
+    phone = "https://fcm.googleapis.com/fcm/send/phone"
+    laptop = "https://updates.push.services.mozilla.com/wpush/v2/laptop"
+    user = await _subscribed_user(db_session, "multi@example.com", phone, laptop)
+
+    await upsert_push_subscription(db_session, user, {"endpoint": phone, "keys": {"p256dh": "new", "auth": "new"}})
+    await db_session.commit()
+
+    subs = await load_push_subscriptions(db_session, user.id)
+    assert sorted(s.endpoint for s in subs) == [phone, laptop]
+    assert {s.endpoint: s.origin for s in subs} == {
+        phone: "https://fcm.googleapis.com",
+        laptop: "https://updates.push.services.mozilla.com",
+    }
+    assert next(s for s in subs if s.endpoint == phone).keys["p256dh"] == "new"
 
-    user = MockUser(push_enabled=True, push_subscription=None)
-    report = MockReport()
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        result = await send_report_notification(user, report)
+@pytest.mark.asyncio
+async def test_upsert_moves_device_to_new_account(db_session):
+    """다른 계정으로 로그인한 기기가 구독하면 구독이 새 계정으로 옮겨진다"""
+    from app.services.push_service import load_push_subscriptions, upsert_push_subscription
 
-    assert result is False
-    mock_send.assert_not_called()
+    endpoint = "https://fcm.googleapis.com/fcm/send/shared"
+    first = await _subscribed_user(db_session, "first@example.com", endpoint)
+    second = await _user(db_session, "second@example.com")
+
+    await upsert_push_subscription(db_session, second, {"endpoint": endpoint, "keys": {"p256dh": "a", "auth": "b"}})
+    await db_session.commit()
+
+    assert await load_push_subscriptions(db_session, first.id) == []
+    assert [s.endpoint for s in await load_push_subscriptions(db_session, second.id)] == [endpoint]
 
 
 @pytest.mark.asyncio
-async def test_report_notification_sends_when_subscribed():
-    """push_enabled=True이고 subscription이 있으면 알림을 전송한다"""
-    from app.services.push_service import send_report_notification
+async def test_remove_single_device_or_all(db_session):
+    from app.services.push_service import count_push_subscriptions, remove_push_subscriptions
 
-    sub = {"endpoint": "https://fcm.googleapis.com/push/sub1", "keys": {"p256dh": "abc", "auth": "xyz"}}
-    user = MockUser(push_enabled=True, push_subscription=sub)
-    report = MockReport(id=42, summary="요약 첫 줄\n두 번째 줄")
+    user = await _subscribed_user(
+        db_session, "rm@example.com", "https://push.example.com/a", "https://push.example.com/b", "https://push.example.com/c",
+    )
+
+    await remove_push_subscriptions(db_session, user, "https://push.example.com/a")
+    assert await count_push_subscriptions(db_session, user.id) == 2
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        mock_send.return_value = True
-        result = await send_report_notification(user, report)
+    await remove_push_subscriptions(db_session, user)
+    assert await count_push_subscriptions(db_session, user.id) == 0
 
-    assert result is True
-    mock_send.assert_called_once_with(
-        subscription=sub,
-        title="📊 새 경제 리포트 도착",
-        body="요약 첫 줄",
-        url="/reports/42",
+
+# ──────────────────────────────────────────────
+# record_push_outcomes: 만료 구독 정리 / 실패 백오프
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_record_outcomes_prunes_gone_subscriptions(db_session):
+    """404/410 응답을 받은 기기만 삭제되고, 남은 기기가 없는 사용자는 push_enabled가 해제된다"""
+    from app.services.push_fanout import PushOutcome
+    from app.services.push_service import load_push_subscriptions, record_push_outcomes
+
+    gone = await _subscribed_user(db_session, "gone@example.com", "https://push.example.com/gone")
+    multi = await _subscribed_user(
+        db_session, "multi@example.com", "https://push.example.com/old-phone", "https://push.example.com/laptop",
     )
 
+    counts = await record_push_outcomes(db_session, [
+        PushOutcome("https://push.example.com/gone", gone.id, status_code=410),
+        PushOutcome("https://push.example.com/old-phone", multi.id, status_code=404),
+        PushOutcome("https://push.example.com/laptop", multi.id, status_code=201),
+    ])
+
+    assert counts["pruned"] == 2
+    assert await load_push_subscriptions(db_session, gone.id) == []
+    assert gone.push_enabled is False
+    assert [s.endpoint for s in await load_push_subscriptions(db_session, multi.id)] == ["https://push.example.com/laptop"]
+    assert multi.push_enabled is True
+
 
 @pytest.mark.asyncio
-async def test_report_notification_uses_first_line_of_summary():
-    """summary가 여러 줄일 때 첫 번째 줄만 body로 사용한다"""
-    from app.services.push_service import send_report_notification
+async def test_record_outcomes_backs_off_transient_failures(db_session):
+    """일시 실패는 해당 기기의 실패 횟수를 늘리고 지수 백오프 동안 그 기기로는 메시지를 만들지 않는다"""
+    from datetime import datetime, timedelta
+    from app.services.push_fanout import PushOutcome
+    from app.services.push_service import (
+        build_report_messages, load_push_subscriptions, push_backoff, record_push_outcomes,
+    )
 
-    sub = {"endpoint": "https://example.com/push/sub1"}
-    user = MockUser(push_enabled=True, push_subscription=sub)
-    report = MockReport(id=1, summary="첫째 줄\n둘째 줄\n셋째 줄")
+    flaky, healthy = "https://push.example.com/flaky", "https://push.example.com/healthy"
+    user = await _subscribed_user(db_session, "flaky@example.com", flaky, healthy)
+
+    await record_push_outcomes(db_session, [PushOutcome(flaky, user.id, status_code=503)])
+    await record_push_outcomes(db_session, [PushOutcome(flaky, user.id, error="ConnectError")])
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        mock_send.return_value = True
-        await send_report_notification(user, report)
+    subs = {s.endpoint: s for s in await load_push_subscriptions(db_session, user.id)}
+    assert subs[flaky].failure_count == 2 and subs[healthy].failure_count == 0
+    assert push_backoff(2) == 2 * push_backoff(1)
+    assert subs[flaky].retry_after > datetime.utcnow() + push_backoff(2) - timedelta(seconds=5)
+    messages = build_report_messages(user, MockReport(), subs.values())
+    assert [m.endpoint for m in messages] == [healthy]
 
-    _, call_kwargs = mock_send.call_args
-    assert call_kwargs["body"] == "첫째 줄"
+    # 백오프가 끝나면 다시 전송하고, 성공하면 이력이 초기화된다
+    subs[flaky].retry_after = datetime.utcnow() - timedelta(seconds=1)
+    assert len(build_report_messages(user, MockReport(), subs.values())) == 2
+    await record_push_outcomes(db_session, [PushOutcome(flaky, user.id, status_code=201)])
+    assert subs[flaky].failure_count == 0 and subs[flaky].retry_after is None
 
 
 @pytest.mark.asyncio
-async def test_report_notification_fallback_when_summary_empty():
-    """summary가 빈 문자열이면 fallback 메시지를 body로 사용한다"""
-    from app.services.push_service import send_report_notification
+async def test_record_outcomes_ignores_replaced_subscription(db_session):
+    """전송 중에 기기가 다시 구독해 endpoint가 바뀌었으면 이전 endpoint의 410으로 새 구독을 지우지 않는다"""
+    from app.services.push_fanout import PushOutcome
+    from app.services.push_service import load_push_subscriptions, record_push_outcomes
 
-    sub = {"endpoint": "https://example.com/push/sub1"}
-    user = MockUser(push_enabled=True, push_subscription=sub)
-    report = MockReport(id=1, summary="")
+    user = await _subscribed_user(db_session, "moved@example.com", "https://push.example.com/new")
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        mock_send.return_value = True
-        await send_report_notification(user, report)
+    counts = await record_push_outcomes(db_session, [
+        PushOutcome("https://push.example.com/old", user.id, status_code=410),
+    ])
 
-    _, call_kwargs = mock_send.call_args
-    assert call_kwargs["body"] == "새 리포트를 확인하세요"
+    assert counts["pruned"] == 0
+    assert [s.endpoint for s in await load_push_subscriptions(db_session, user.id)] == ["https://push.example.com/new"]
+    assert user.push_enabled is True
 
 
-@pytest.mark.asyncio
-async def test_report_notification_includes_report_url():
-    """알림의 url이 /reports/{report.id} 형식으로 설정된다"""
-    from app.services.push_service import send_report_notification
+# ──────────────────────────────────────────────
+# 이전 스키마(users.push_subscription) 이전
+# ──────────────────────────────────────────────
 
-    sub = {"endpoint": "https://example.com/push/sub1"}
-    user = MockUser(push_enabled=True, push_subscription=sub)
-    report = MockReport(id=99, summary="요약 내용")
+@pytest.mark.asyncio
+async def test_import_legacy_push_subscriptions():
+    """users.push_subscription 단일 구독을 push_subscriptions로 옮기고, 다시 실행해도 중복되지 않는다"""
+    import json
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.core.database import import_legacy_push_subscriptions
+    from app.models.base import Base
+    from app.models.push_subscription import PushSubscription
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    legacy = {"endpoint": "https://fcm.googleapis.com/fcm/send/legacy", "keys": {"p256dh": "a", "auth": "b"}}
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        assert await conn.run_sync(import_legacy_push_subscriptions) == 0  # 새 스키마는 컬럼이 없음
+
+        await conn.execute(text("ALTER TABLE users ADD COLUMN push_subscription JSON"))
+        await conn.execute(
+            text(
+                "INSERT INTO users (email, hashed_password, report_level, report_frequency, push_subscription) "
+                "VALUES ('legacy@example.com', 'x', 'STANDARD', 'WEEKLY', :sub)"
+            ),
+            {"sub": json.dumps(legacy)},
+        )
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_send:
-        mock_send.return_value = True
-        await send_report_notification(user, report)
+        assert await conn.run_sync(import_legacy_push_subscriptions) == 1
+        assert await conn.run_sync(import_legacy_push_subscriptions) == 0
 
-    _, call_kwargs = mock_send.call_args
-    assert call_kwargs["url"] == "/reports/99"
+        rows = (await conn.execute(PushSubscription.__table__.select())).mappings().all()
+        assert [(r["endpoint"], r["origin"], r["keys"]) for r in rows] == [
+            (legacy["endpoint"], "https://fcm.googleapis.com", legacy["keys"]),
+        ]
+        remaining = (await conn.execute(text("SELECT push_subscription FROM users"))).scalar_one()
+        assert remaining is None
+    await engine.dispose()
@@ -1,32 +1,85 @@
 """
 FR-03: 리포트 생성 및 조회 E2E 테스트
-- 리포트 수동 생성, 목록 조회, 상세 조회, 권한 격리
+- 리포트 수동 생성(작업 큐), 작업 상태 조회, 목록 조회, 상세 조회, 권한 격리
 - 리포트 생성 후 Web Push 알림 통합 검증
+- SSE 스트리밍 리포트 생성
 """
+import json
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from httpx import AsyncClient
-from .conftest import create_and_login, auth_headers
+
+from app.services.job_queue import JOB_FAILED_MESSAGE
+from app.services.push_outbox import push_dispatcher
+from .conftest import create_and_login, auth_headers, generate_report_and_wait
 
 
 @pytest.mark.asyncio
 async def test_generate_report_manual(client: AsyncClient):
-    """수동 리포트 생성 (AI mock 사용)"""
+    """수동 리포트 생성 — 202와 작업 id 반환 후 작업 완료 시 리포트 생성 (AI mock 사용)"""
     token = await create_and_login(client)
     resp = await client.post("/reports/generate", headers=auth_headers(token))
-    assert resp.status_code == 201
+    assert resp.status_code == 202
     data = resp.json()
     assert "id" in data
-    assert "title" in data
-    assert "level" in data
+    assert data["status"] == "queued"
+
+    from app.services.job_queue import report_job_queue
+    await report_job_queue.join()
+    job = (await client.get(f"/reports/jobs/{data['id']}", headers=auth_headers(token))).json()
+    assert job["status"] == "succeeded"
+    report_resp = await client.get(f"/reports/{job['report_id']}", headers=auth_headers(token))
+    assert report_resp.status_code == 200
+    assert "title" in report_resp.json()
+    assert "level" in report_resp.json()
+
+
+@pytest.mark.asyncio
+async def test_generate_report_deduplicates_pending_job(client: AsyncClient):
+    """대기 중인 작업이 있으면 중복 요청은 같은 작업을 반환하고 리포트는 하나만 생성된다"""
+    from app.services.job_queue import report_job_queue
+
+    token = await create_and_login(client)
+    first = await client.post("/reports/generate", headers=auth_headers(token))
+    second = await client.post("/reports/generate", headers=auth_headers(token))
+    assert first.json()["id"] == second.json()["id"]
+
+    await report_job_queue.join()
+    resp = await client.get("/reports/", headers=auth_headers(token))
+    assert len(resp.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_report_job_failure_is_recorded(client: AsyncClient, mock_ai_service):
+    """생성 중 오류가 나면 작업 상태가 failed가 되고, 오류는 예외 원문 대신 일반 메시지로 기록된다"""
+    token = await create_and_login(client)
+    mock_ai_service.side_effect = RuntimeError("AI 서비스 오류")
+
+    job = await generate_report_and_wait(client, token)
+
+    assert job["status"] == "failed"
+    assert job["error"] == JOB_FAILED_MESSAGE
+    assert "AI 서비스 오류" not in job["error"]
+    assert job["report_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_report_job_not_visible_to_other_user(client: AsyncClient):
+    """다른 사용자의 작업 상태는 조회할 수 없다 (404)"""
+    token1 = await create_and_login(client, {"email": "job1@example.com", "password": "pass1234!"})
+    token2 = await create_and_login(client, {"email": "job2@example.com", "password": "pass1234!"})
+
+    job = await generate_report_and_wait(client, token1)
+    resp = await client.get(f"/reports/jobs/{job['id']}", headers=auth_headers(token2))
+    assert resp.status_code == 404
 
 
 @pytest.mark.asyncio
 async def test_list_reports(client: AsyncClient):
     """리포트 목록 조회"""
     token = await create_and_login(client)
-    await client.post("/reports/generate", headers=auth_headers(token))
-    await client.post("/reports/generate", headers=auth_headers(token))
+    await generate_report_and_wait(client, token)
+    await generate_report_and_wait(client, token)
 
     resp = await client.get("/reports/", headers=auth_headers(token))
     assert resp.status_code == 200
@@ -39,8 +92,7 @@ async def test_list_reports(client: AsyncClient):
 async def test_get_report_detail(client: AsyncClient):
     """리포트 상세 조회"""
     token = await create_and_login(client)
-    create_resp = await client.post("/reports/generate", headers=auth_headers(token))
-    report_id = create_resp.json()["id"]
+    report_id = (await generate_report_and_wait(client, token))["report_id"]
 
     resp = await client.get(f"/reports/{report_id}", headers=auth_headers(token))
     assert resp.status_code == 200
@@ -53,8 +105,7 @@ async def test_cannot_access_other_users_report(client: AsyncClient):
     token1 = await create_and_login(client, {"email": "user1@example.com", "password": "pass1234!"})
     token2 = await create_and_login(client, {"email": "user2@example.com", "password": "pass1234!"})
 
-    create_resp = await client.post("/reports/generate", headers=auth_headers(token1))
-    report_id = create_resp.json()["id"]
+    report_id = (await generate_report_and_wait(client, token1))["report_id"]
 
     # user2가 user1의 리포트 조회 시 404
     resp = await client.get(f"/reports/{report_id}", headers=auth_headers(token2))
@@ -67,8 +118,8 @@ async def test_list_reports_isolated_by_user(client: AsyncClient):
     token1 = await create_and_login(client, {"email": "userA@example.com", "password": "pass1234!"})
     token2 = await create_and_login(client, {"email": "userB@example.com", "password": "pass1234!"})
 
-    await client.post("/reports/generate", headers=auth_headers(token1))
-    await client.post("/reports/generate", headers=auth_headers(token1))
+    await generate_report_and_wait(client, token1)
+    await generate_report_and_wait(client, token1)
 
     # user2는 리포트 0개
     resp = await client.get("/reports/", headers=auth_headers(token2))
@@ -79,8 +130,7 @@ async def test_list_reports_isolated_by_user(client: AsyncClient):
 async def test_delete_report(client: AsyncClient):
     """리포트 삭제 성공 (204 반환)"""
     token = await create_and_login(client)
-    create_resp = await client.post("/reports/generate", headers=auth_headers(token))
-    report_id = create_resp.json()["id"]
+    report_id = (await generate_report_and_wait(client, token))["report_id"]
 
     resp = await client.delete(f"/reports/{report_id}", headers=auth_headers(token))
     assert resp.status_code == 204
@@ -104,8 +154,7 @@ async def test_delete_other_users_report_forbidden(client: AsyncClient):
     token1 = await create_and_login(client, {"email": "del1@example.com", "password": "pass1234!"})
     token2 = await create_and_login(client, {"email": "del2@example.com", "password": "pass1234!"})
 
-    create_resp = await client.post("/reports/generate", headers=auth_headers(token1))
-    report_id = create_resp.json()["id"]
+    report_id = (await generate_report_and_wait(client, token1))["report_id"]
 
     # user2가 user1의 리포트 삭제 시도 → 404
     resp = await client.delete(f"/reports/{report_id}", headers=auth_headers(token2))
@@ -118,9 +167,16 @@ async def test_delete_other_users_report_forbidden(client: AsyncClient):
 # Web Push 통합 테스트
 # ──────────────────────────────────────────────
 
+@pytest.fixture
+def vapid_configured(monkeypatch):
+    """outbox 디스패처가 전송하도록 VAPID 키 설정 (실제 전송은 conftest mock)"""
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", "test-vapid-key")
+
+
 @pytest.mark.asyncio
-async def test_push_notification_called_after_report_for_subscribed_user(client: AsyncClient):
-    """push 구독 설정된 사용자가 리포트를 생성하면 send_push_notification이 호출된다"""
+async def test_push_notification_called_after_report_for_subscribed_user(client: AsyncClient, mock_push_service, vapid_configured):
+    """push 구독 설정된 사용자가 리포트를 생성하면 알림이 전송된다"""
     token = await create_and_login(client)
 
     # push 구독 설정
@@ -134,32 +190,53 @@ async def test_push_notification_called_after_report_for_subscribed_user(client:
         headers=auth_headers(token),
     )
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_push:
-        mock_push.return_value = True
-        resp = await client.post("/reports/generate", headers=auth_headers(token))
+    job = await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
 
-    assert resp.status_code == 201
-    mock_push.assert_called_once()
-    call_kwargs = mock_push.call_args[1]
-    assert call_kwargs["subscription"] == sub
-    assert "새 경제 리포트 도착" in call_kwargs["title"]
+    assert job["status"] == "succeeded"
+    mock_push_service.assert_called_once()
+    (messages,), _ = mock_push_service.call_args
+    assert messages[0].subscription == sub
+    assert "새 경제 리포트 도착" in messages[0].payload["title"]
 
 
 @pytest.mark.asyncio
-async def test_push_notification_not_called_when_not_subscribed(client: AsyncClient):
-    """push 구독이 없는 사용자가 리포트를 생성하면 send_push_notification이 호출되지 않는다"""
+async def test_push_notification_sent_to_every_device(client: AsyncClient, mock_push_service, vapid_configured):
+    """휴대폰과 노트북을 모두 구독하면 리포트 알림이 두 기기 모두로 전송된다"""
     token = await create_and_login(client)
+    subs = [
+        {"endpoint": "https://fcm.googleapis.com/push/phone", "keys": {"p256dh": "a", "auth": "b"}},
+        {"endpoint": "https://updates.push.services.mozilla.com/wpush/v2/laptop", "keys": {"p256dh": "c", "auth": "d"}},
+    ]
+    for sub in subs:
+        await client.post(
+            "/settings/push-subscription",
+            json={"subscription": sub, "enabled": True},
+            headers=auth_headers(token),
+        )
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_push:
-        resp = await client.post("/reports/generate", headers=auth_headers(token))
+    await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
 
-    assert resp.status_code == 201
-    mock_push.assert_not_called()
+    (messages,), _ = mock_push_service.call_args
+    assert sorted(m.endpoint for m in messages) == sorted(s["endpoint"] for s in subs)
 
 
 @pytest.mark.asyncio
-async def test_push_notification_not_called_when_disabled(client: AsyncClient):
-    """push가 비활성화된 사용자의 리포트 생성 시 send_push_notification이 호출되지 않는다"""
+async def test_push_notification_not_called_when_not_subscribed(client: AsyncClient, mock_push_service, vapid_configured):
+    """push 구독이 없는 사용자가 리포트를 생성하면 알림이 전송되지 않는다"""
+    token = await create_and_login(client)
+
+    job = await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
+
+    assert job["status"] == "succeeded"
+    mock_push_service.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_push_notification_not_called_when_disabled(client: AsyncClient, mock_push_service, vapid_configured):
+    """push가 비활성화된 사용자의 리포트 생성 시 알림이 전송되지 않는다"""
     token = await create_and_login(client)
 
     # push 구독은 설정하되 disabled
@@ -170,8 +247,172 @@ async def test_push_notification_not_called_when_disabled(client: AsyncClient):
         headers=auth_headers(token),
     )
 
-    with patch("app.services.push_service.send_push_notification", new_callable=AsyncMock) as mock_push:
-        resp = await client.post("/reports/generate", headers=auth_headers(token))
+    job = await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
+
+    assert job["status"] == "succeeded"
+    mock_push_service.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_expired_push_subscription_is_pruned(client: AsyncClient, mock_push_service, vapid_configured):
+    """푸시 서비스가 410을 반환하면 구독이 삭제되고 push_enabled가 해제된다"""
+    from app.services.push_fanout import FanoutResult, PushOutcome
+
+    token = await create_and_login(client)
+    sub = {"endpoint": "https://fcm.googleapis.com/push/expired", "keys": {"p256dh": "a", "auth": "b"}}
+    await client.post(
+        "/settings/push-subscription",
+        json={"subscription": sub, "enabled": True},
+        headers=auth_headers(token),
+    )
+
+    async def _gone(messages):
+        return FanoutResult([PushOutcome(m.endpoint, m.user_id, status_code=410) for m in messages])
+
+    mock_push_service.side_effect = _gone
+    job = await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
+    assert job["status"] == "succeeded"
+
+    me = (await client.get("/auth/me", headers=auth_headers(token))).json()
+    assert me["push_enabled"] is False
+
+    # 정리된 사용자에게는 다음 리포트에서 전송하지 않는다
+    mock_push_service.reset_mock()
+    await generate_report_and_wait(client, token)
+    await push_dispatcher.drain()
+    mock_push_service.assert_not_called()
 
-    assert resp.status_code == 201
-    mock_push.assert_not_called()
+
+# ──────────────────────────────────────────────
+# SSE 스트리밍 생성 테스트
+# ──────────────────────────────────────────────
+
+STREAM_JSON = (
+    '{"title": "스트리밍 리포트", "summary_line1": "첫째 요약", "summary_line2": "둘째 요약", '
+    '"summary_line3": "셋째 요약", "sections": [{"title": "섹션1", "content": "<p>내용1</p>"}, '
+    '{"title": "섹션2", "content": "<p>내용2</p>"}]}'
+)
+
+
+def _fake_stream_client(text: str, chunk_size: int = 7) -> MagicMock:
+    """messages.stream()을 흉내 내는 Anthropic 클라이언트 mock"""
+    class _Stream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            for i in range(0, len(text), chunk_size):
+                yield text[i:i + chunk_size]
+
+        async def get_final_message(self):
+            return MagicMock(usage=MagicMock(input_tokens=10, cache_creation_input_tokens=0,
+                                             cache_read_input_tokens=0, output_tokens=100))
+
+    client = MagicMock()
+    client.messages.stream = MagicMock(side_effect=lambda **kwargs: _Stream())
+    return client
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_emits_incremental_events(client: AsyncClient):
+    """스트리밍 생성은 요약 → 섹션 → done 순서로 이벤트를 보내고 리포트를 저장한다"""
+    from app.services.ai_service import AIResultCache
+
+    token = await create_and_login(client)
+    with patch("app.services.ai_service.client", _fake_stream_client(STREAM_JSON)), \
+         patch("app.services.ai_service.ai_result_cache", AIResultCache()):
+        resp = await client.post("/reports/generate/stream", headers=auth_headers(token))
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(resp.text)
+    names = [name for name, _ in events]
+    assert names == ["summary", "summary", "summary", "section", "section", "done"]
+    assert events[0][1] == {"line": 1, "text": "첫째 요약"}
+    assert events[4][1]["title"] == "섹션2"
+
+    done = events[-1][1]
+    assert done["title"] == "스트리밍 리포트"
+    list_resp = await client.get("/reports/", headers=auth_headers(token))
+    assert [r["id"] for r in list_resp.json()] == [done["id"]]
+
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_reports_error_event(client: AsyncClient):
+    """생성 중 예외가 나면 error 이벤트를 보내고 리포트는 저장하지 않는다"""
+    token = await create_and_login(client)
+    with patch("app.services.report_service.ai_service.stream_report", side_effect=RuntimeError("boom")):
+        resp = await client.post("/reports/generate/stream", headers=auth_headers(token))
+
+    events = _parse_sse(resp.text)
+    assert [name for name, _ in events] == ["error"]
+    list_resp = await client.get("/reports/", headers=auth_headers(token))
+    assert list_resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_uses_own_session(client: AsyncClient, db_session):
+    """스트림 본문은 요청 의존성 세션이 아니라 스트림 안에서 연 세션으로 사용자를 다시 읽는다"""
+    from contextlib import asynccontextmanager
+
+    token = await create_and_login(client)
+    opened = []
+
+    @asynccontextmanager
+    async def _tracking_session():
+        opened.append(True)
+        yield db_session
+
+    with patch("app.api.reports.AsyncSessionLocal", _tracking_session), \
+         patch("app.services.ai_service.client", _fake_stream_client(STREAM_JSON)):
+        resp = await client.post("/reports/generate/stream", headers=auth_headers(token))
+
+    assert opened == [True]
+    assert _parse_sse(resp.text)[-1][0] == "done"
+
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_requires_auth(client: AsyncClient):
+    """인증 없이 스트리밍 생성 요청 시 401"""
+    resp = await client.post("/reports/generate/stream")
+    assert resp.status_code == 401
+
+
+# ──────────────────────────────────────────────
+# 기존 DB 스키마 보충 (ai_usage 컬럼)
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_init_adds_ai_usage_column_to_existing_reports_table():
+    """ai_usage 컬럼이 없던 기존 reports 테이블에 컬럼을 추가해 리포트 조회가 동작한다 (재실행해도 안전)"""
+    from sqlalchemy import select, text
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.core.database import add_missing_columns
+    from app.models.base import Base
+    from app.models.report import Report
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("ALTER TABLE reports DROP COLUMN ai_usage"))  # 이전 스키마 재현
+
+        assert await conn.run_sync(add_missing_columns) == 1
+        assert await conn.run_sync(add_missing_columns) == 0
+
+    async with async_sessionmaker(engine)() as session:
+        assert (await session.execute(select(Report))).scalars().all() == []
+    await engine.dispose()
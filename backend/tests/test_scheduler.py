@@ -2,10 +2,11 @@
 APScheduler 자동 리포트 생성 테스트
 - generate_reports_by_frequency: frequency별 사용자만 선별 처리
 - generate_all_due_reports: 날짜 조건에 따른 frequency 필터링
+- prewarm_indicators: 리포트 전 지표 사전 갱신
 """
 import pytest
 from datetime import date
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock, ANY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, ReportFrequency, ReportLevel
@@ -54,7 +55,7 @@ async def test_generate_reports_by_frequency_daily_only():
         count = await generate_reports_by_frequency(mock_db, ReportFrequency.DAILY)
 
     assert count == 1
-    mock_gen.assert_called_once_with(daily_user, mock_db)
+    mock_gen.assert_called_once_with(daily_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -75,7 +76,7 @@ async def test_generate_reports_by_frequency_weekly_only():
         count = await generate_reports_by_frequency(mock_db, ReportFrequency.WEEKLY)
 
     assert count == 1
-    mock_gen.assert_called_once_with(weekly_user, mock_db)
+    mock_gen.assert_called_once_with(weekly_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -96,7 +97,7 @@ async def test_generate_reports_by_frequency_monthly_only():
         count = await generate_reports_by_frequency(mock_db, ReportFrequency.MONTHLY)
 
     assert count == 1
-    mock_gen.assert_called_once_with(monthly_user, mock_db)
+    mock_gen.assert_called_once_with(monthly_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -131,7 +132,7 @@ async def test_generate_reports_by_frequency_error_handling():
 
     call_count = 0
 
-    async def _side_effect(user, db):
+    async def _side_effect(user, db, snapshot=None, batch_results=None):
         nonlocal call_count
         call_count += 1
         if user.id == 1:
@@ -198,7 +199,7 @@ async def test_daily_user_always_gets_report():
         mock_gen.return_value = MagicMock()
         await generate_all_due_reports(mock_db)
 
-    mock_gen.assert_called_once_with(daily_user, mock_db)
+    mock_gen.assert_called_once_with(daily_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -216,7 +217,7 @@ async def test_weekly_user_gets_report_on_monday():
         mock_gen.return_value = MagicMock()
         await generate_all_due_reports(mock_db)
 
-    mock_gen.assert_called_once_with(weekly_user, mock_db)
+    mock_gen.assert_called_once_with(weekly_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -251,7 +252,7 @@ async def test_monthly_user_gets_report_on_first_day():
         mock_gen.return_value = MagicMock()
         await generate_all_due_reports(mock_db)
 
-    mock_gen.assert_called_once_with(monthly_user, mock_db)
+    mock_gen.assert_called_once_with(monthly_user, mock_db, snapshot=ANY, batch_results=None)
 
 
 @pytest.mark.asyncio
@@ -308,7 +309,192 @@ async def test_inactive_users_excluded():
         mock_gen.return_value = MagicMock()
         await generate_all_due_reports(mock_db)
 
-    mock_gen.assert_called_once_with(active_user, mock_db)
+    mock_gen.assert_called_once_with(active_user, mock_db, snapshot=ANY, batch_results=None)
+
+
+# ──────────────────────────────────────────────
+# 배치 지표 스냅샷 테스트
+# ──────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_batch_fetches_indicator_union_once(mock_data_service):
+    """배치 실행 시 사용자 선택 지표의 합집합을 한 번만 수집한다"""
+    from app.services.report_service import DEFAULT_INDICATORS
+
+    user1 = _make_user(1, ReportFrequency.DAILY)
+    user1.selected_indicators = ["sp500", "kospi"]
+    user2 = _make_user(2, ReportFrequency.DAILY)
+    user2.selected_indicators = ["kospi", "gold"]
+    mock_db = _make_db_with_users([user1, user2])
+
+    with patch(
+        "app.services.report_service.generate_user_report", new_callable=AsyncMock
+    ) as mock_gen:
+        await generate_reports_by_frequency(mock_db, ReportFrequency.DAILY)
+
+    mock_data_service.assert_called_once()
+    fetched_ids = mock_data_service.call_args[0][0]
+    assert len(fetched_ids) == len(set(fetched_ids))
+    assert set(fetched_ids) == set(DEFAULT_INDICATORS) | {"sp500", "kospi", "gold"}
+
+    snapshots = {id(call.kwargs["snapshot"]) for call in mock_gen.call_args_list}
+    assert len(snapshots) == 1
+
+
+@pytest.mark.asyncio
+async def test_user_report_reads_from_snapshot(db_session, mock_data_service):
+    """스냅샷이 주어지면 사용자 리포트는 외부 수집 없이 스냅샷 데이터를 사용한다"""
+    from app.services.data_service import IndicatorSnapshot
+    from app.services.report_service import generate_user_report
+
+    user = User(email="snap@example.com", hashed_password="hashed", is_active=True,
+                report_frequency=ReportFrequency.DAILY, report_level=ReportLevel.STANDARD,
+                selected_indicators=["sp500"])
+    db_session.add(user)
+    await db_session.commit()
+
+    snapshot = IndicatorSnapshot({
+        "sp500": {"value": 6000.0},
+        "vix": {"value": 15.0},
+    })
+    report = await generate_user_report(user, db_session, snapshot=snapshot)
+
+    mock_data_service.assert_not_called()
+    assert report.raw_data == {"sp500": {"value": 6000.0}}
+
+
+@pytest.mark.asyncio
+async def test_batch_ai_mode_prefetches_before_generation():
+    """REPORT_AI_MODE=batch이면 사용자별 생성 전에 배치 프리페치를 한 번 수행한다"""
+    users = [_make_user(1, ReportFrequency.DAILY), _make_user(2, ReportFrequency.DAILY)]
+    mock_db = _make_db_with_users(users)
+    order = []
+
+    async def _prefetch(items, configs, shared_data=None, report_date=None, results=None):
+        order.append(("prefetch", len(items)))
+        results["prompt-key"] = {"title": "배치"}
+        return len(items)
+
+    async def _report(user, db, snapshot=None, batch_results=None):
+        order.append(("report", user.id, batch_results))
+
+    with patch("app.services.report_service.settings.REPORT_AI_MODE", "batch"), \
+         patch("app.services.ai_service.prefetch_reports_batch", side_effect=_prefetch), \
+         patch("app.services.report_service.generate_user_report", side_effect=_report):
+        count = await generate_reports_by_frequency(mock_db, ReportFrequency.DAILY)
+
+    assert count == 2
+    assert order[0] == ("prefetch", 2)
+    # 배치 결과는 공용 캐시가 아니라 실행 단위 dict로 사용자별 생성에 전달된다
+    assert all(entry[2] == {"prompt-key": {"title": "배치"}} for entry in order[1:])
+
+
+# ──────────────────────────────────────────────
+# 동시 배치 실행 테스트
+# ──────────────────────────────────────────────
+
+class _FakeSessionFactory:
+    """워커마다 새 세션 mock을 돌려주는 세션 팩토리"""
+    def __init__(self, users: list[User]):
+        self.users = {u.id: u for u in users}
+        self.sessions: list[AsyncMock] = []
+
+    def __call__(self):
+        session = AsyncMock(spec=AsyncSession)
+        session.get = AsyncMock(side_effect=lambda model, user_id: self.users[user_id])
+        self.sessions.append(session)
+
+        class _Ctx:
+            async def __aenter__(self):
+                return session
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Ctx()
+
+
+@pytest.mark.asyncio
+async def test_batch_respects_max_concurrency():
+    """동시 실행 수가 max_concurrency를 넘지 않고, 워커마다 별도 세션을 사용한다"""
+    import asyncio
+    from app.services.report_service import run_report_batch
+
+    users = [_make_user(i, ReportFrequency.DAILY) for i in range(1, 7)]
+    factory = _FakeSessionFactory(users)
+    in_flight = 0
+    peak = 0
+    used_sessions = []
+
+    async def _slow_report(user, db, snapshot=None, batch_results=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        used_sessions.append(db)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    with patch("app.services.report_service.generate_user_report", side_effect=_slow_report):
+        result = await run_report_batch(
+            AsyncMock(spec=AsyncSession), users,
+            session_factory=factory, max_concurrency=2,
+        )
+
+    assert peak == 2
+    assert result.success_count == 6
+    assert len({id(s) for s in used_sessions}) == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_per_user_timeout():
+    """사용자별 타임아웃을 넘기면 실패로 집계하고 나머지는 계속 처리한다"""
+    import asyncio
+    from app.services.report_service import run_report_batch
+
+    users = [_make_user(1, ReportFrequency.DAILY), _make_user(2, ReportFrequency.DAILY)]
+
+    async def _report(user, db, snapshot=None, batch_results=None):
+        if user.id == 1:
+            await asyncio.sleep(1)
+
+    with patch("app.services.report_service.generate_user_report", side_effect=_report):
+        result = await run_report_batch(
+            AsyncMock(spec=AsyncSession), users,
+            session_factory=_FakeSessionFactory(users), max_concurrency=2, timeout=0.05,
+        )
+
+    assert result.succeeded == [2]
+    assert "timeout" in result.failed[1]
+    summary = result.summary()
+    assert summary["succeeded"] == 1
+    assert summary["failed"] == 1
+    assert set(result.durations) == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_batch_without_session_factory_runs_sequentially():
+    """session_factory가 없으면 공용 세션으로 한 명씩 순차 실행한다"""
+    import asyncio
+    from app.services.report_service import run_report_batch
+
+    users = [_make_user(i, ReportFrequency.DAILY) for i in range(1, 4)]
+    mock_db = AsyncMock(spec=AsyncSession)
+    in_flight = 0
+    peak = 0
+
+    async def _report(user, db, snapshot=None, batch_results=None):
+        nonlocal in_flight, peak
+        assert db is mock_db
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    with patch("app.services.report_service.generate_user_report", side_effect=_report):
+        result = await run_report_batch(mock_db, users, max_concurrency=10)
+
+    assert peak == 1
+    assert result.success_count == 3
 
 
 # ──────────────────────────────────────────────
@@ -316,7 +502,7 @@ async def test_inactive_users_excluded():
 # ──────────────────────────────────────────────
 
 def test_scheduler_jobs_registered():
-    """main.py _setup_scheduler가 3개의 job을 등록하는지 확인"""
+    """main.py _setup_scheduler가 리포트 3개 + 지표 사전 갱신 job을 등록하는지 확인"""
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
     from main import _setup_scheduler
 
@@ -335,6 +521,46 @@ def test_scheduler_jobs_registered():
         assert "daily_reports" in job_ids, "daily_reports job 미등록"
         assert "weekly_reports" in job_ids, "weekly_reports job 미등록"
         assert "monthly_reports" in job_ids, "monthly_reports job 미등록"
-        assert len(jobs) == 3
+        assert "prewarm_indicators" in job_ids, "prewarm_indicators job 미등록"
+        assert len(jobs) == 4
     finally:
         main_module.scheduler = original_scheduler
+
+
+def test_prewarm_job_runs_before_report_cron():
+    """지표 사전 갱신 job은 리포트 스케줄보다 설정된 분만큼 먼저 실행된다"""
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from main import _setup_scheduler
+    import main as main_module
+
+    test_scheduler = AsyncIOScheduler()
+    original_scheduler = main_module.scheduler
+    main_module.scheduler = test_scheduler
+    try:
+        with patch("app.core.config.settings.REPORT_PREWARM_LEAD_MINUTES", 15):
+            _setup_scheduler()
+        fields = {f.name: str(f) for f in test_scheduler.get_job("prewarm_indicators").trigger.fields}
+        assert fields["hour"] == "22"
+        assert fields["minute"] == "45"
+    finally:
+        main_module.scheduler = original_scheduler
+
+
+@pytest.mark.asyncio
+async def test_prewarm_refreshes_all_active_user_indicators(mock_data_service):
+    """활성 사용자 전체의 선택 지표 합집합을 캐시를 건너뛰고 한 번에 갱신한다"""
+    from app.services.report_service import DEFAULT_INDICATORS, prewarm_indicators
+
+    daily = _make_user(1, ReportFrequency.DAILY)
+    daily.selected_indicators = ["kospi"]
+    monthly = _make_user(2, ReportFrequency.MONTHLY)
+    monthly.selected_indicators = ["gold", "kospi"]
+    mock_db = _make_db_with_users([daily, monthly])
+
+    await prewarm_indicators(mock_db)
+
+    mock_data_service.assert_called_once()
+    fetched_ids = mock_data_service.call_args[0][0]
+    assert len(fetched_ids) == len(set(fetched_ids))
+    assert set(fetched_ids) == set(DEFAULT_INDICATORS) | {"kospi", "gold"}
+    assert mock_data_service.call_args.kwargs["force"] is True
@@ -81,3 +81,67 @@ async def test_invalid_report_level(client: AsyncClient):
         json={"report_level": "god_tier"},
     )
     assert resp.status_code in (400, 422)
+
+
+# ──────────────────────────────────────────────
+# 푸시 구독 (기기별 upsert)
+# ──────────────────────────────────────────────
+
+PHONE = {"endpoint": "https://fcm.googleapis.com/fcm/send/phone", "keys": {"p256dh": "a", "auth": "b"}}
+LAPTOP = {"endpoint": "https://updates.push.services.mozilla.com/wpush/v2/laptop", "keys": {"p256dh": "c", "auth": "d"}}
+
+
+async def _subscribe(client: AsyncClient, token: str, subscription, **extra):
+    return await client.post(
+        "/settings/push-subscription",
+        headers=auth_headers(token),
+        json={"subscription": subscription, **extra},
+    )
+
+
+@pytest.mark.asyncio
+async def test_push_subscription_keeps_each_device(client: AsyncClient):
+    """기기마다 구독이 추가되고, 같은 기기의 재구독은 기기 수를 늘리지 않는다"""
+    token = await create_and_login(client)
+
+    assert (await _subscribe(client, token, PHONE)).json()["devices"] == 1
+    assert (await _subscribe(client, token, LAPTOP)).json()["devices"] == 2
+    resp = await _subscribe(client, token, {**PHONE, "keys": {"p256dh": "new", "auth": "new"}})
+
+    assert resp.status_code == 200
+    assert resp.json() == {"message": "푸시 설정이 업데이트되었습니다", "push_enabled": True, "devices": 2}
+
+
+@pytest.mark.asyncio
+async def test_push_unsubscribe_single_device(client: AsyncClient):
+    """endpoint를 지정하면 그 기기만 해제하고, 마지막 기기가 해제되면 푸시가 꺼진다"""
+    token = await create_and_login(client)
+    await _subscribe(client, token, PHONE)
+    await _subscribe(client, token, LAPTOP)
+
+    resp = await _subscribe(client, token, None, endpoint=PHONE["endpoint"])
+    assert resp.json()["devices"] == 1 and resp.json()["push_enabled"] is True
+
+    resp = await _subscribe(client, token, None, endpoint=LAPTOP["endpoint"])
+    assert resp.json()["devices"] == 0 and resp.json()["push_enabled"] is False
+
+
+@pytest.mark.asyncio
+async def test_push_unsubscribe_all_devices(client: AsyncClient):
+    """endpoint 없이 해제하면 모든 기기의 구독을 해제한다"""
+    token = await create_and_login(client)
+    await _subscribe(client, token, PHONE)
+    await _subscribe(client, token, LAPTOP)
+
+    resp = await _subscribe(client, token, None, enabled=False)
+
+    assert resp.json()["devices"] == 0
+    me = await client.get("/auth/me", headers=auth_headers(token))
+    assert me.json()["push_enabled"] is False
+
+
+@pytest.mark.asyncio
+async def test_push_subscription_requires_endpoint(client: AsyncClient):
+    token = await create_and_login(client)
+    resp = await _subscribe(client, token, {"keys": {"p256dh": "a", "auth": "b"}})
+    assert resp.status_code == 400
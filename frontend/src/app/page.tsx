@@ -2,6 +2,7 @@
 import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
 import { reportsApi, authApi, clearAuthToken } from '@/lib/api'
+import { generateReportAndWait } from '@/lib/reportJobs'
 import type { Report, User } from '@/lib/types'
 import { Settings, FileText, RefreshCw, LogOut } from 'lucide-react'
 import { format } from 'date-fns'
@@ -33,7 +34,8 @@ export default function Dashboard() {
   const handleGenerate = async () => {
     setGenerating(true)
     try {
-      await reportsApi.generate()
+      // 작업 완료(succeeded/failed)까지 폴링한 뒤 목록 갱신
+      await generateReportAndWait()
       const res = await reportsApi.list()
       setReports(res.data)
     } finally {
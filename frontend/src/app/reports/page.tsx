@@ -2,6 +2,7 @@
 import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
 import { reportsApi } from '@/lib/api'
+import { generateReportAndWait } from '@/lib/reportJobs'
 import type { Report } from '@/lib/types'
 import { FileText, RefreshCw, ArrowLeft } from 'lucide-react'
 import { format } from 'date-fns'
@@ -32,7 +33,8 @@ export default function ReportsPage() {
   const handleGenerate = async () => {
     setGenerating(true)
     try {
-      await reportsApi.generate()
+      // 작업 완료(succeeded/failed)까지 폴링한 뒤 목록 갱신
+      await generateReportAndWait()
       const res = await reportsApi.list()
       setReports(res.data)
     } finally {
@@ -1,5 +1,6 @@
 <<<<<<< HEAD
 import axios from 'axios'
+import type { ReportJob } from './types'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
@@ -57,7 +58,8 @@ export const authApi = {
 export const reportsApi = {
   list: () => apiClient.get('/reports/'),
   getHtml: (id: number) => apiClient.get<string>(`/reports/${id}/html`),
-  generate: () => apiClient.post('/reports/generate'),
+  generate: () => apiClient.post<ReportJob>('/reports/generate'),
+  getJob: (jobId: string) => apiClient.get<ReportJob>(`/reports/jobs/${jobId}`),
 }
 
 export const settingsApi = {
@@ -80,6 +82,7 @@ import axios from 'axios'
 import type {
   SettingsUpdate,
   PushSubscriptionData,
+  ReportJob,
 } from './types'
 
 const BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
@@ -120,7 +123,10 @@ export const authApi = {
 // 리포트 API
 export const reportsApi = {
   list: () => client.get('/reports/'),
-  generate: () => client.post('/reports/generate'),
+  /** 리포트 생성 작업 등록 (202, 작업 id 반환) */
+  generate: () => client.post<ReportJob>('/reports/generate'),
+  /** 리포트 생성 작업 상태 조회 */
+  getJob: (jobId: string) => client.get<ReportJob>(`/reports/jobs/${jobId}`),
   getHtml: (id: number) => client.get(`/reports/${id}/html`),
 }
 
@@ -0,0 +1,24 @@
+/**
+ * 리포트 생성 작업 헬퍼
+ * POST /reports/generate는 작업만 등록하고 바로 응답하므로, 작업이 끝날 때까지 상태를 폴링합니다.
+ */
+
+import { reportsApi } from './api'
+import type { ReportJob } from './types'
+
+const POLL_INTERVAL_MS = 1500
+const MAX_WAIT_MS = 3 * 60 * 1000
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+/** 리포트 생성 작업을 등록하고 succeeded/failed가 될 때까지 대기 */
+export async function generateReportAndWait(): Promise<ReportJob> {
+  let job = (await reportsApi.generate()).data
+  const deadline = Date.now() + MAX_WAIT_MS
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() > deadline) throw new Error('리포트 생성 대기 시간이 초과되었습니다')
+    await sleep(POLL_INTERVAL_MS)
+    job = (await reportsApi.getJob(job.id)).data
+  }
+  return job
+}
@@ -25,6 +25,17 @@ export interface Report {
   created_at: string
 }
 
+export type ReportJobStatus = 'queued' | 'running' | 'succeeded' | 'failed'
+
+/** 리포트 생성 작업 (POST /reports/generate, GET /reports/jobs/{id}) */
+export interface ReportJob {
+  id: string
+  status: ReportJobStatus
+  report_id: number | null
+  error: string | null
+  created_at: string
+}
+
 export interface Indicator {
   id: string
   name_ko: string